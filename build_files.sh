@@ -3,3 +3,4 @@
 pip install -r requirements.txt
 python manage.py collectstatic --noinput --clear
 python manage.py migrate --noinput
+python manage.py rebuild_user_stats
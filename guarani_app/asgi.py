@@ -0,0 +1,14 @@
+"""
+ASGI config for guarani_app project.
+
+Serve with an ASGI server to get the non-blocking chat endpoints, e.g.
+``gunicorn guarani_app.asgi:application -k uvicorn.workers.UvicornWorker``.
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'guarani_app.settings')
+
+application = get_asgi_application()
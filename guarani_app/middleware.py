@@ -0,0 +1,111 @@
+"""
+Project-level middleware.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from . import profiling, routers
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise middleware that can also run in an async middleware chain.
+
+    Stock WhiteNoise is sync-only, which makes Django run every request under
+    ASGI through a single thread-sensitive adapter and serializes async views.
+    Static lookups are in-memory, so only file serving is offloaded.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+
+class ProfilerMiddleware:
+    """
+    Time each request, its SQL and its template rendering (see
+    ``guarani_app.profiling``). Removed from the chain unless ``PROFILER`` is on.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILER:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        profiling.install()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = profiling.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            recorder = profiling.stop(token)
+        profiling.finish(recorder, request, response)
+        return response
+
+    async def __acall__(self, request):
+        token = profiling.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            recorder = profiling.stop(token)
+        profiling.finish(recorder, request, response)
+        return response
+
+
+class ReplicaPinMiddleware:
+    """
+    Per-request read-your-writes state for the primary/replica router (see
+    ``guarani_app.routers``). Removed from the chain when no replica is configured.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not routers.replica_configured():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = routers.begin_request(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            state = routers.end_request(token)
+        return routers.pin_client(response, state)
+
+    async def __acall__(self, request):
+        token = routers.begin_request(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            state = routers.end_request(token)
+        return routers.pin_client(response, state)
@@ -0,0 +1,287 @@
+"""
+Per-request profiling.
+
+While ``PROFILER`` is on, ``ProfilerMiddleware`` records for every request
+the wall time, each SQL statement run on any database connection, repeated
+query signatures (the N+1 pattern) and the time spent rendering templates.
+The totals are sent back in a ``Server-Timing`` header, so they appear in
+the browser's network panel. Slow requests and N+1 suspects are logged, and
+a ``PROFILER_SAMPLE_RATE`` share of requests is kept in a ring buffer: an
+in-process deque plus a JSON Lines file (``PROFILER_LOG``) trimmed back to
+the last ``PROFILER_BUFFER_SIZE`` samples. ``manage.py profile_report``
+summarizes that file by endpoint.
+"""
+import contextvars
+import json
+import logging
+import math
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.base import Template
+
+logger = logging.getLogger(__name__)
+
+_current = contextvars.ContextVar('profiler_recorder', default=None)
+_install_lock = threading.Lock()
+_original_render = None
+_buffer = None
+
+IN_LIST_RE = re.compile(r'IN \((?:%s, )*%s\)')
+WHITESPACE_RE = re.compile(r'\s+')
+NAMED_GROUP_RE = re.compile(r'\(\?P<(\w+)>[^)]*\)')
+SIGNATURE_LENGTH = 300
+# Repeated signatures kept per sample
+MAX_DUPLICATES = 5
+
+
+def signature(sql):
+    """Parameterized SQL with IN lists collapsed, so N+1 queries share a key"""
+    return IN_LIST_RE.sub('IN (...)', WHITESPACE_RE.sub(' ', sql).strip())[:SIGNATURE_LENGTH]
+
+
+class Recorder:
+    """Measurements for one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.query_time = 0.0
+        self.signatures = Counter()
+        self.statements = Counter()
+        self.template_time = 0.0
+        self.template_depth = 0
+
+    def add_query(self, sql, params, duration):
+        key = signature(sql)
+        self.query_count += 1
+        self.query_time += duration
+        self.signatures[key] += 1
+        self.statements[key, repr(params)] += 1
+
+    def duplicates(self):
+        """``[(signature, count)]`` run at least PROFILER_DUPLICATE_THRESHOLD times"""
+        threshold = settings.PROFILER_DUPLICATE_THRESHOLD
+        return [
+            (key, count) for key, count in self.signatures.most_common(MAX_DUPLICATES)
+            if count >= threshold
+        ]
+
+    def repeated(self):
+        """Statements that re-ran with identical parameters"""
+        return sum(count - 1 for count in self.statements.values() if count > 1)
+
+
+def _record_query(execute, sql, params, many, context):
+    recorder = _current.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        recorder.add_query(sql, params, time.perf_counter() - started)
+
+
+def _timed_render(self, context):
+    recorder = _current.get()
+    # {% include %} and {% extends %} render nested templates: time the outermost only
+    if recorder is None or recorder.template_depth:
+        return _original_render(self, context)
+    recorder.template_depth += 1
+    started = time.perf_counter()
+    try:
+        return _original_render(self, context)
+    finally:
+        recorder.template_depth -= 1
+        recorder.template_time += time.perf_counter() - started
+
+
+def _add_wrapper(sender=None, connection=None, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def install():
+    """Hook query execution and template rendering (idempotent)"""
+    global _original_render
+    with _install_lock:
+        if _original_render is not None:
+            return
+        connection_created.connect(_add_wrapper, dispatch_uid='guarani_app.profiling')
+        for connection in connections.all(initialized_only=True):
+            _add_wrapper(connection=connection)
+        _original_render = Template._render
+        Template._render = _timed_render
+
+
+def start():
+    """Begin recording the current request; returns a token for ``stop``"""
+    return _current.set(Recorder())
+
+
+def stop(token):
+    recorder = _current.get()
+    _current.reset(token)
+    return recorder
+
+
+def endpoint(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return f'{request.method} <unmatched>'
+    # Router-generated regex routes read like path() routes
+    route = NAMED_GROUP_RE.sub(r'<\1>', match.route).lstrip('^').rstrip('$')
+    return f'{request.method} /{route}'
+
+
+def finish(recorder, request, response):
+    """Add the Server-Timing header, log and sample a finished request"""
+    total_ms = (time.perf_counter() - recorder.started) * 1000
+    db_ms = recorder.query_time * 1000
+    template_ms = recorder.template_time * 1000
+    duplicates = recorder.duplicates()
+
+    timing = (
+        f'total;dur={total_ms:.1f}, '
+        f'db;dur={db_ms:.1f};desc="{recorder.query_count} queries", '
+        f'tpl;dur={template_ms:.1f}'
+    )
+    existing = response.get('Server-Timing')
+    response['Server-Timing'] = f'{existing}, {timing}' if existing else timing
+
+    name = endpoint(request)
+    if duplicates:
+        key, count = duplicates[0]
+        logger.warning('Possible N+1 on %s (%s): %d x %s', name, request.path, count, key)
+    if total_ms >= settings.PROFILER_SLOW_MS:
+        logger.warning('Slow request %s (%s): %.0f ms, %d queries (%.0f ms), templates %.0f ms',
+                       name, request.path, total_ms, recorder.query_count, db_ms, template_ms)
+    else:
+        logger.debug('%s (%s): %.1f ms, %d queries (%.1f ms), templates %.1f ms',
+                     name, request.path, total_ms, recorder.query_count, db_ms, template_ms)
+
+    if random.random() < settings.PROFILER_SAMPLE_RATE:
+        get_buffer().add({
+            'at': round(time.time(), 3),
+            'endpoint': name,
+            'path': request.path,
+            'status': response.status_code,
+            'ms': round(total_ms, 2),
+            'db_ms': round(db_ms, 2),
+            'template_ms': round(template_ms, 2),
+            'queries': recorder.query_count,
+            'repeated': recorder.repeated(),
+            'duplicates': duplicates,
+        })
+
+
+class SampleBuffer:
+    """
+    The last ``size`` samples of this process, mirrored to a JSON Lines file
+    shared by all processes. The file is trimmed to ``size`` lines after every
+    ``size`` appends, so it stays between one and two buffers long.
+    """
+
+    def __init__(self, path, size):
+        self.path = path
+        self.size = size
+        self.recent = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self._appended = 0
+
+    def add(self, sample):
+        self.recent.append(sample)
+        if not self.path:
+            return
+        line = json.dumps(sample, separators=(',', ':')) + '\n'
+        with self._lock:
+            try:
+                with open(self.path, 'a', encoding='utf-8') as handle:
+                    handle.write(line)
+                self._appended += 1
+                if self._appended >= self.size:
+                    self._appended = 0
+                    self._trim()
+            except OSError as exc:
+                logger.warning('Could not write profiler sample to %s: %s', self.path, exc)
+
+    def _trim(self):
+        with open(self.path, encoding='utf-8') as handle:
+            lines = deque(handle, maxlen=self.size)
+        temp = f'{self.path}.{os.getpid()}.tmp'
+        with open(temp, 'w', encoding='utf-8') as handle:
+            handle.writelines(lines)
+        os.replace(temp, self.path)
+
+
+def get_buffer():
+    global _buffer
+    if _buffer is None:
+        _buffer = SampleBuffer(settings.PROFILER_LOG, settings.PROFILER_BUFFER_SIZE)
+    return _buffer
+
+
+def load_samples(path=None, limit=None):
+    """The most recent samples in the profiler log (oldest first)"""
+    path = path or settings.PROFILER_LOG
+    limit = limit or settings.PROFILER_BUFFER_SIZE
+    samples = deque(maxlen=limit)
+    try:
+        with open(path, encoding='utf-8') as handle:
+            for line in handle:
+                try:
+                    samples.append(json.loads(line))
+                except ValueError:
+                    # A line cut short by a concurrent trim
+                    continue
+    except FileNotFoundError:
+        pass
+    return list(samples)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a sorted, non-empty list"""
+    return values[max(0, math.ceil(pct / 100 * len(values)) - 1)]
+
+
+def summarize(samples):
+    """Per-endpoint timing and query statistics"""
+    groups = {}
+    for sample in samples:
+        groups.setdefault(sample['endpoint'], []).append(sample)
+    rows = []
+    for name, items in groups.items():
+        times = sorted(item['ms'] for item in items)
+        queries = sorted(item['queries'] for item in items)
+        rows.append({
+            'endpoint': name,
+            'count': len(items),
+            'p50': percentile(times, 50),
+            'p95': percentile(times, 95),
+            'max': times[-1],
+            'db_ms': sum(item['db_ms'] for item in items) / len(items),
+            'template_ms': sum(item['template_ms'] for item in items) / len(items),
+            'queries': sum(queries) / len(queries),
+            'queries_p95': percentile(queries, 95),
+            'n_plus_one': sum(1 for item in items if item['duplicates']),
+        })
+    return rows
+
+
+def duplicate_signatures(samples):
+    """``{(endpoint, signature): [requests, worst count]}`` across samples"""
+    found = {}
+    for sample in samples:
+        for key, count in sample['duplicates']:
+            entry = found.setdefault((sample['endpoint'], key), [0, 0])
+            entry[0] += 1
+            entry[1] = max(entry[1], count)
+    return found
@@ -0,0 +1,121 @@
+"""
+Primary/replica database routing.
+
+Content models (glossary terms, lessons and their blocks, exercises,
+questions, answer choices) change rarely and are read on nearly every page,
+so when a ``replica`` database is configured (``DATABASE_REPLICA_NAME``)
+their reads go there. Everything else, user activity in particular, and every
+write stays on ``default``.
+
+Reads fall back to the primary, for read-your-writes consistency:
+
+* for the rest of a request once it has written a content model;
+* for whole unsafe (POST, PUT, PATCH, DELETE) requests;
+* inside ``atomic()`` blocks on the primary;
+* for ``DATABASE_REPLICA_PIN_SECONDS`` after a content write, through a
+  cookie, so the page a form redirects to shows the change even while the
+  replica lags.
+
+Locally, the replica can be a second SQLite file refreshed with
+``manage.py sync_replica``, or a second Postgres database.
+"""
+import contextvars
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_DB_ALIAS = 'replica'
+PIN_COOKIE = 'db_primary'
+
+REPLICA_MODELS = frozenset([
+    'learning.glossaryterm',
+    'learning.lesson',
+    'learning.lessoncontent',
+    'learning.exercise',
+    'learning.question',
+    'learning.answerchoice',
+])
+
+
+class PinState:
+    """Per-request routing state, shared with threads the request hands work to"""
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+_state = contextvars.ContextVar('replica_pin_state', default=None)
+
+
+def replica_configured():
+    return REPLICA_DB_ALIAS in settings.DATABASES
+
+
+def is_replica_model(model):
+    # Auto-created m2m tables (LessonContent.vocabulary_terms) follow their owner
+    owner = model._meta.auto_created or model
+    return owner._meta.label_lower in REPLICA_MODELS
+
+
+def pin_primary():
+    """Send content reads to the primary for the rest of the current request"""
+    state = _state.get()
+    if state is None:
+        state = PinState()
+        _state.set(state)
+    state.pinned = True
+    state.wrote = True
+
+
+def is_pinned():
+    state = _state.get()
+    return (state is not None and state.pinned) or connections[DEFAULT_DB_ALIAS].in_atomic_block
+
+
+def begin_request(request):
+    """Start routing state for ``request``; returns a token for ``end_request``"""
+    pinned = request.method not in ('GET', 'HEAD', 'OPTIONS') or PIN_COOKIE in request.COOKIES
+    return _state.set(PinState(pinned))
+
+
+def end_request(token):
+    """Drop the request's state and return it"""
+    state = _state.get()
+    _state.reset(token)
+    return state
+
+
+def pin_client(response, state):
+    """Keep a client that wrote content on the primary for a few seconds"""
+    if state.wrote and settings.DATABASE_REPLICA_PIN_SECONDS:
+        response.set_cookie(PIN_COOKIE, '1', max_age=settings.DATABASE_REPLICA_PIN_SECONDS,
+                            httponly=True, samesite='Lax')
+    return response
+
+
+class PrimaryReplicaRouter:
+    """Content reads to the replica (unless pinned), all else to the primary"""
+
+    def db_for_read(self, model, **hints):
+        if is_replica_model(model) and replica_configured() and not is_pinned():
+            return REPLICA_DB_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        if is_replica_model(model):
+            pin_primary()
+        # Explicit, or Django would write an instance back to the database it was read from
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, REPLICA_DB_ALIAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is a copy of the primary, schema included
+        if db == REPLICA_DB_ALIAS:
+            return False
+        return None
@@ -31,7 +31,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'guarani_app.middleware.AsyncWhiteNoiseMiddleware',
+    'guarani_app.middleware.ProfilerMiddleware',
+    'guarani_app.middleware.ReplicaPinMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -60,6 +62,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'guarani_app.wsgi.application'
+ASGI_APPLICATION = 'guarani_app.asgi.application'
 
 # Database
 DATABASES = {
@@ -69,6 +72,47 @@ DATABASES = {
     }
 }
 
+# SQLite tuning profile (guarani_app.sqlite_backend): WAL journal, IMMEDIATE
+# write transactions, a busy timeout instead of "database is locked", and
+# opt-in persistent connections. SQLITE_TUNING=False restores the stock setup.
+SQLITE_TUNING = os.environ.get('SQLITE_TUNING', 'True') == 'True'
+if SQLITE_TUNING:
+    DATABASES['default'].update({
+        'ENGINE': 'guarani_app.sqlite_backend',
+        # Seconds to keep a connection open between requests. The default, 0,
+        # closes it after each request, as ASGI needs (requests may run in a
+        # different thread each time, leaving persistent connections behind);
+        # WSGI deployments may opt in with e.g. DB_CONN_MAX_AGE=600.
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '0')),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'transaction_mode': os.environ.get('SQLITE_TRANSACTION_MODE', 'IMMEDIATE'),
+            'pragmas': {
+                'journal_mode': 'WAL',
+                'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+                'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', '5000')),
+                'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+                # Negative: KiB rather than pages
+                'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', '-32000')),
+                'temp_store': 'MEMORY',
+            },
+        },
+    })
+
+# Read replica (guarani_app.routers): content models are read from a copy
+# of the primary when DATABASE_REPLICA_NAME is set (a second SQLite file kept
+# fresh with `manage.py sync_replica`, or a replica database name); clients
+# read from the primary for this many seconds after writing content
+DATABASE_REPLICA_NAME = os.environ.get('DATABASE_REPLICA_NAME', '')
+DATABASE_REPLICA_PIN_SECONDS = int(os.environ.get('DATABASE_REPLICA_PIN_SECONDS', '5'))
+if DATABASE_REPLICA_NAME:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': DATABASE_REPLICA_NAME,
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['guarani_app.routers.PrimaryReplicaRouter']
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -101,6 +145,49 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Glossary autocomplete (learning.suggest): seconds between checks for glossary
+# changes made by other processes
+GLOSSARY_SUGGEST_RECHECK_SECONDS = float(os.environ.get('GLOSSARY_SUGGEST_RECHECK_SECONDS', '5'))
+
+# Dashboard content totals (learning.stats): seconds other processes may serve
+# stale counts after lessons or glossary terms change
+CONTENT_TOTALS_CACHE_TTL = int(os.environ.get('CONTENT_TOTALS_CACHE_TTL', '60'))
+
+# Background media processing threads (learning.background)
+MEDIA_WORKERS = int(os.environ.get('MEDIA_WORKERS', '2'))
+
+# Audio transcoding (learning.audio): ffmpeg is optional, WAV has a pure-Python fallback
+FFMPEG_BINARY = os.environ.get('FFMPEG_BINARY', 'ffmpeg')
+AUDIO_TRANSCODE = os.environ.get('AUDIO_TRANSCODE', 'True') == 'True'
+AUDIO_TRANSCODE_TIMEOUT = int(os.environ.get('AUDIO_TRANSCODE_TIMEOUT', '60'))
+
+# Responsive image renditions (learning.thumbnails)
+THUMBNAILS = os.environ.get('THUMBNAILS', 'True') == 'True'
+THUMBNAIL_WIDTHS = [int(width) for width in os.environ.get('THUMBNAIL_WIDTHS', '320,640,1024').split(',')]
+THUMBNAIL_CACHE_TTL = int(os.environ.get('THUMBNAIL_CACHE_TTL', '3600'))
+
+# Offline lesson packs (zip archives built by learning.packs)
+LESSON_PACK_ROOT = os.environ.get('LESSON_PACK_ROOT', str(BASE_DIR / 'lesson_packs'))
+
+# Request profiler (guarani_app.profiling): Server-Timing headers, slow/N+1
+# warnings and sampled timings for `manage.py profile_report`
+PROFILER = os.environ.get('PROFILER', str(DEBUG)) == 'True'
+PROFILER_SAMPLE_RATE = float(os.environ.get('PROFILER_SAMPLE_RATE', '1.0'))
+PROFILER_BUFFER_SIZE = int(os.environ.get('PROFILER_BUFFER_SIZE', '5000'))
+PROFILER_LOG = os.environ.get('PROFILER_LOG', str(BASE_DIR / 'profiler.jsonl'))
+PROFILER_DUPLICATE_THRESHOLD = int(os.environ.get('PROFILER_DUPLICATE_THRESHOLD', '3'))
+PROFILER_SLOW_MS = float(os.environ.get('PROFILER_SLOW_MS', '500'))
+
+# Write-behind inserts for exercise attempts and chat messages (learning.write_behind):
+# flushed every WRITE_BEHIND_BATCH_SIZE rows or WRITE_BEHIND_INTERVAL_MS, synchronous
+# past WRITE_BEHIND_MAX_ROWS queued rows; an optional spool directory keeps queued rows
+# across crashes. WRITE_BEHIND=False writes every row synchronously.
+WRITE_BEHIND = os.environ.get('WRITE_BEHIND', 'False') == 'True'
+WRITE_BEHIND_BATCH_SIZE = int(os.environ.get('WRITE_BEHIND_BATCH_SIZE', '200'))
+WRITE_BEHIND_INTERVAL_MS = int(os.environ.get('WRITE_BEHIND_INTERVAL_MS', '200'))
+WRITE_BEHIND_MAX_ROWS = int(os.environ.get('WRITE_BEHIND_MAX_ROWS', '10000'))
+WRITE_BEHIND_SPOOL_DIR = os.environ.get('WRITE_BEHIND_SPOOL_DIR', '')
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -118,3 +205,26 @@ REST_FRAMEWORK = {
 
 # OpenAI API Key
 OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY', '')
+# Optional OpenAI-compatible endpoint (e.g. a local server) and model
+OPENAI_BASE_URL = os.environ.get('OPENAI_BASE_URL', '')
+OPENAI_MODEL = os.environ.get('OPENAI_MODEL', 'gpt-3.5-turbo')
+OPENAI_TIMEOUT = float(os.environ.get('OPENAI_TIMEOUT', '30'))
+OPENAI_CONNECT_TIMEOUT = float(os.environ.get('OPENAI_CONNECT_TIMEOUT', '5'))
+# Connection pool size and cap on concurrent completions per process
+OPENAI_MAX_CONNECTIONS = int(os.environ.get('OPENAI_MAX_CONNECTIONS', '50'))
+OPENAI_MAX_CONCURRENCY = int(os.environ.get('OPENAI_MAX_CONCURRENCY', '200'))
+
+# Chatbot conversation window: recent turns within a token budget, with
+# optional rolling summarization of older turns
+CHAT_CONTEXT_TOKEN_BUDGET = int(os.environ.get('CHAT_CONTEXT_TOKEN_BUDGET', '1500'))
+CHAT_CONTEXT_MAX_MESSAGES = int(os.environ.get('CHAT_CONTEXT_MAX_MESSAGES', '20'))
+CHAT_CONTEXT_SUMMARIZE = os.environ.get('CHAT_CONTEXT_SUMMARIZE', 'True') == 'True'
+CHAT_CONTEXT_SUMMARY_TOKENS = int(os.environ.get('CHAT_CONTEXT_SUMMARY_TOKENS', '150'))
+CHAT_CONTEXT_CACHE_TTL = int(os.environ.get('CHAT_CONTEXT_CACHE_TTL', '3600'))
+
+# Chatbot reply cache: entries, TTL in seconds, and the trigram similarity
+# threshold for near-duplicate questions (empty or 0, the default, keeps the
+# cache to exact matches of the normalized question)
+CHAT_RESPONSE_CACHE_SIZE = int(os.environ.get('CHAT_RESPONSE_CACHE_SIZE', '1000'))
+CHAT_RESPONSE_CACHE_TTL = int(os.environ.get('CHAT_RESPONSE_CACHE_TTL', '86400'))
+CHAT_RESPONSE_CACHE_SIMILARITY = float(os.environ.get('CHAT_RESPONSE_CACHE_SIMILARITY') or 0)
@@ -0,0 +1,64 @@
+"""
+SQLite backend tuned for concurrent requests.
+
+Extra ``OPTIONS`` on top of the stock backend:
+
+``pragmas``
+    ``{name: value}`` applied to every new connection by a
+    ``connection_created`` hook, e.g. ``journal_mode=WAL`` so readers never
+    block the writer, ``synchronous=NORMAL`` (durable in WAL mode),
+    ``busy_timeout`` so a locked database is waited on instead of failing.
+``transaction_mode``
+    ``DEFERRED`` (SQLite's default), ``IMMEDIATE`` or ``EXCLUSIVE``; used to
+    ``BEGIN`` every ``atomic()`` block. A deferred transaction that reads and
+    then writes must upgrade its lock, and when two of them do so at once one
+    fails with "database is locked" without waiting for ``busy_timeout``.
+    ``IMMEDIATE`` takes the write lock up front, so concurrent writers queue
+    instead. The price is that every ``atomic()`` block takes the write lock,
+    including read-only ones (``ATOMIC_REQUESTS``, ``select_for_update()``
+    reads), so they wait behind writers and serialize with each other.
+    Plain reads outside ``atomic()`` run in autocommit mode and are not
+    affected. (Django 5.1 reads the same option natively.)
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.signals import connection_created
+from django.db.backends.sqlite3 import base
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    @property
+    def transaction_mode(self):
+        mode = self.settings_dict['OPTIONS'].get('transaction_mode') or 'DEFERRED'
+        if mode.upper() not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f"DATABASES['{self.alias}']['OPTIONS']['transaction_mode'] must be one of "
+                f"{', '.join(TRANSACTION_MODES)}"
+            )
+        return mode.upper()
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        # Consumed here, not by sqlite3.connect()
+        params.pop('pragmas', None)
+        params.pop('transaction_mode', None)
+        return params
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f'BEGIN {self.transaction_mode}')
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    """Run the configured PRAGMAs on a freshly opened connection"""
+    pragmas = connection.settings_dict['OPTIONS'].get('pragmas') or {}
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            # PRAGMA takes no bound parameters
+            if not name.replace('_', '').isalnum() or not str(value).lstrip('-').isalnum():
+                raise ImproperlyConfigured(f'Invalid SQLite pragma {name}={value!r}')
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+connection_created.connect(apply_pragmas, sender=DatabaseWrapper, dispatch_uid='guarani_app.sqlite_backend')
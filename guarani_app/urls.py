@@ -6,12 +6,15 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from learning.media import serve_media
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('learning.urls')),
     path('api/', include('learning.api_urls')),
+    # Media (pronunciation clips, images) with Range and cache headers
+    path(f"{settings.MEDIA_URL.strip('/')}/<path:path>", serve_media, name='media'),
 ]
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
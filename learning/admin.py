@@ -1,7 +1,7 @@
 from django.contrib import admin
 from .models import (
     GlossaryTerm, Lesson, LessonContent, Exercise, Question,
-    AnswerChoice, UserProgress, ExerciseAttempt, ChatMessage
+    AnswerChoice, UserProgress, UserStats, ReviewCard, ExerciseAttempt, ChatMessage
 )
 
 
@@ -65,6 +65,17 @@ class UserProgressAdmin(admin.ModelAdmin):
     list_filter = ['completed']
 
 
+@admin.register(UserStats)
+class UserStatsAdmin(admin.ModelAdmin):
+    list_display = ['user', 'lessons_completed', 'lessons_in_progress', 'exercises_completed', 'current_streak', 'updated_at']
+
+
+@admin.register(ReviewCard)
+class ReviewCardAdmin(admin.ModelAdmin):
+    list_display = ['user', 'term', 'question', 'due_at', 'interval_days', 'repetitions', 'ease']
+    raw_id_fields = ['term', 'question']
+
+
 @admin.register(ExerciseAttempt)
 class ExerciseAttemptAdmin(admin.ModelAdmin):
     list_display = ['user', 'exercise', 'question', 'is_correct', 'points_earned', 'attempted_at']
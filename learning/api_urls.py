@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import api_views
+from . import api_views, async_views
 
 router = DefaultRouter()
 router.register(r'glossary', api_views.GlossaryTermViewSet, basename='glossary')
@@ -10,7 +10,13 @@ router.register(r'progress', api_views.UserProgressViewSet, basename='progress')
 urlpatterns = [
     path('', include(router.urls)),
     path('chat/', api_views.ChatBotView.as_view(), name='chatbot'),
+    path('chat/stream/', api_views.ChatStreamView.as_view(), name='chatbot-stream'),
+    path('chat/async/', async_views.chat, name='chatbot-async'),
+    path('chat/async/stream/', async_views.chat_stream, name='chatbot-async-stream'),
+    path('chat/cache-stats/', api_views.ChatCacheStatsView.as_view(), name='chat-cache-stats'),
     path('chat/history/<str:session_id>/', api_views.ChatHistoryView.as_view(), name='chat-history'),
     path('exercises/<int:exercise_id>/submit/', api_views.SubmitExerciseView.as_view(), name='submit-exercise'),
+    path('review/next/', api_views.ReviewNextView.as_view(), name='review-next'),
+    path('review/grade/', api_views.ReviewGradeView.as_view(), name='review-grade'),
     path('dashboard/', api_views.DashboardStatsView.as_view(), name='dashboard'),
 ]
@@ -3,29 +3,46 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
-from django.db.models import Q, Count, Sum
+from django.db import transaction
+from django.db.models import Q, Count, Max
 from django.utils import timezone
-from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+import hashlib
+import io
+import json
 import uuid
 
 from .models import (
-    GlossaryTerm, Lesson, UserProgress, Exercise, Question,
-    ExerciseAttempt, ChatMessage
+    GlossaryTerm, Lesson, UserProgress, Exercise, ChatMessage
 )
+from . import glossary_io, intents, llm, review, stats, write_behind
+from .conditional import ConditionalGetMixin, not_modified, set_validators
+from .grading import grade_submission
+from .packs import open_pack
+from .pagination import GlossaryKeysetPagination, ProgressKeysetPagination
+from .response_cache import response_cache
+from .search import GlossarySearchFilter
+from .snapshots import get_snapshot
+from .suggest import suggestion_index, DEFAULT_LIMIT, MAX_LIMIT
 from .serializers import (
     GlossaryTermSerializer, LessonListSerializer, LessonDetailSerializer,
-    UserProgressSerializer, ExerciseAttemptSerializer, ChatMessageSerializer
+    UserProgressSerializer, ExerciseAttemptSerializer, ChatMessageSerializer,
+    ReviewCardSerializer,
+    select_fields, sparse_fieldset
 )
 
 
-class GlossaryTermViewSet(viewsets.ModelViewSet):
+class GlossaryTermViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     CRUD operations for Glossary Terms with search and filtering
     """
     queryset = GlossaryTerm.objects.all()
     serializer_class = GlossaryTermSerializer
     permission_classes = [AllowAny]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = GlossaryKeysetPagination
+    filter_backends = [GlossarySearchFilter, filters.OrderingFilter]
     search_fields = ['guarani_word', 'spanish_translation', 'english_translation', 'category']
     ordering_fields = ['guarani_word', 'created_at', 'difficulty_level']
 
@@ -42,7 +59,17 @@ class GlossaryTermViewSet(viewsets.ModelViewSet):
         if category:
             queryset = queryset.filter(category__icontains=category)
 
-        return queryset
+        return self.narrow_to_fieldset(queryset)
+
+    def narrow_to_fieldset(self, queryset):
+        """Load only the columns a sparse fieldset renders, plus sort and validator keys"""
+        fields, omit = sparse_fieldset(self.request)
+        if self.action not in ('list', 'retrieve') or not (fields or omit):
+            return queryset
+        columns = [field.name for field in GlossaryTerm._meta.concrete_fields]
+        keep = set(select_fields(columns, fields, omit))
+        keep.update(['id', 'guarani_word', 'updated_at'], self.ordering_fields)
+        return queryset.only(*keep)
 
     @action(detail=False, methods=['get'])
     def categories(self, request):
@@ -50,8 +77,50 @@ class GlossaryTermViewSet(viewsets.ModelViewSet):
         categories = GlossaryTerm.objects.values_list('category', flat=True).distinct()
         return Response({'categories': [c for c in categories if c]})
 
+    @action(detail=False, methods=['get'], url_path='export')
+    def export_terms(self, request):
+        """Stream the whole glossary as CSV (default) or JSON Lines (``?type=jsonl``)"""
+        fmt = request.query_params.get('type', 'csv')
+        if fmt not in glossary_io.FORMATS:
+            return Response({'error': f'type must be one of {", ".join(glossary_io.FORMATS)}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        response = StreamingHttpResponse(
+            (line.encode('utf-8') for line in glossary_io.export_lines(fmt=fmt)),
+            content_type=glossary_io.CONTENT_TYPES[fmt]
+        )
+        response['Content-Disposition'] = f'attachment; filename="glossary.{fmt}"'
+        return response
+
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_terms(self, request):
+        """Bulk upsert terms from an uploaded CSV or JSON Lines ``file``"""
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'Upload a CSV or JSON Lines file as "file"'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        fmt = request.query_params.get('type') or glossary_io.guess_format(upload.name)
+        if fmt not in glossary_io.FORMATS:
+            return Response({'error': f'type must be one of {", ".join(glossary_io.FORMATS)}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+        try:
+            result = glossary_io.import_stream(stream, fmt)
+        except UnicodeDecodeError:
+            return Response({'error': 'File must be UTF-8 encoded'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result.as_dict())
+
+    @action(detail=False, methods=['get'])
+    def suggest(self, request):
+        """Prefix autocomplete served from the in-memory suggestion index"""
+        query = request.query_params.get('q', '')
+        try:
+            limit = min(max(int(request.query_params.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+        except ValueError:
+            limit = DEFAULT_LIMIT
+        return Response({'query': query, 'results': suggestion_index.suggest(query, limit)})
+
 
-class LessonViewSet(viewsets.ReadOnlyModelViewSet):
+class LessonViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """
     View lessons with detailed content and exercises
     """
@@ -63,6 +132,31 @@ class LessonViewSet(viewsets.ReadOnlyModelViewSet):
             return LessonDetailSerializer
         return LessonListSerializer
 
+    def get_object_response(self, lesson):
+        """Serve the pre-rendered snapshot for the current content version"""
+        payload = get_snapshot(lesson)
+        fields, omit = sparse_fieldset(self.request)
+        if fields or omit:
+            data = json.loads(payload)
+            return Response({name: data[name] for name in select_fields(data, fields, omit)})
+        return HttpResponse(payload, content_type='application/json')
+
+    @action(detail=True, methods=['get'])
+    def pack(self, request, pk=None):
+        """Download the whole lesson (JSON, glossary, media) as one zip archive"""
+        lesson = self.get_object()
+        handle, key = open_pack(lesson)
+        etag = quote_etag(key)
+        response = not_modified(request, etag)
+        if response is not None:
+            handle.close()
+            return response
+        response = FileResponse(
+            handle, as_attachment=True,
+            filename=f'lesson-{lesson.pk}-{key[:12]}.zip', content_type='application/zip'
+        )
+        return set_validators(response, etag)
+
     def get_queryset(self):
         queryset = Lesson.objects.filter(is_published=True)
 
@@ -80,11 +174,12 @@ class UserProgressViewSet(viewsets.ModelViewSet):
     """
     serializer_class = UserProgressSerializer
     permission_classes = [AllowAny]
+    pagination_class = ProgressKeysetPagination
 
     def get_queryset(self):
         # In production, filter by request.user
         # For demo purposes, return all
-        return UserProgress.objects.all()
+        return UserProgress.objects.select_related('lesson')
 
     @action(detail=False, methods=['post'])
     def start_lesson(self, request):
@@ -109,19 +204,27 @@ class UserProgressViewSet(viewsets.ModelViewSet):
     def complete_lesson(self, request):
         """Mark a lesson as completed"""
         lesson_id = request.data.get('lesson_id')
-        score = request.data.get('score', 0)
-        total_points = request.data.get('total_points', 0)
 
         if not lesson_id:
             return Response({'error': 'lesson_id is required'}, status=status.HTTP_400_BAD_REQUEST)
 
+        # Form-encoded posts send strings; the stats signal does arithmetic on these
+        try:
+            score = int(request.data.get('score', 0))
+            total_points = int(request.data.get('total_points', 0))
+        except (TypeError, ValueError):
+            return Response({'error': 'score and total_points must be integers'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
         try:
-            progress = UserProgress.objects.get(user_id=1, lesson_id=lesson_id)
-            progress.completed = True
-            progress.completion_date = timezone.now()
-            progress.score = score
-            progress.total_points = total_points
-            progress.save()
+            # The progress row and the user's stats change together or not at all
+            with transaction.atomic():
+                progress = UserProgress.objects.get(user_id=1, lesson_id=lesson_id)
+                progress.completed = True
+                progress.completion_date = timezone.now()
+                progress.score = score
+                progress.total_points = total_points
+                progress.save()
 
             serializer = self.get_serializer(progress)
             return Response(serializer.data)
@@ -138,56 +241,60 @@ class SubmitExerciseView(APIView):
     def post(self, request, exercise_id):
         try:
             exercise = Exercise.objects.get(id=exercise_id)
-            answers = request.data.get('answers', [])
-
-            results = []
-            total_points = 0
-            earned_points = 0
-
-            for answer_data in answers:
-                question_id = answer_data.get('question_id')
-                user_answer = answer_data.get('answer', '')
-
-                try:
-                    question = Question.objects.get(id=question_id, exercise=exercise)
-                    is_correct = user_answer.strip().lower() == question.correct_answer.strip().lower()
-                    points = question.points if is_correct else 0
-
-                    # Save attempt
-                    attempt = ExerciseAttempt.objects.create(
-                        user_id=1,  # Demo user
-                        exercise=exercise,
-                        question=question,
-                        user_answer=user_answer,
-                        is_correct=is_correct,
-                        points_earned=points
-                    )
-
-                    results.append({
-                        'question_id': question_id,
-                        'is_correct': is_correct,
-                        'correct_answer': question.correct_answer,
-                        'explanation': question.explanation,
-                        'points_earned': points,
-                        'max_points': question.points
-                    })
-
-                    total_points += question.points
-                    earned_points += points
-
-                except Question.DoesNotExist:
-                    continue
-
-            return Response({
-                'results': results,
-                'total_points': total_points,
-                'earned_points': earned_points,
-                'percentage': round((earned_points / total_points * 100) if total_points > 0 else 0, 2)
-            })
-
         except Exercise.DoesNotExist:
             return Response({'error': 'Exercise not found'}, status=status.HTTP_404_NOT_FOUND)
 
+        answers = request.data.get('answers', [])
+        return Response(grade_submission(exercise, answers, user_id=1))  # Demo user
+
+
+class ReviewNextView(APIView):
+    """
+    Next due spaced-repetition cards (``?limit=``), oldest due first
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            limit = min(max(int(request.query_params.get('limit', review.DEFAULT_BATCH)), 1), review.MAX_BATCH)
+        except ValueError:
+            limit = review.DEFAULT_BATCH
+        cards = review.due_cards(user_id=1, limit=limit)  # Demo user
+        return Response({'cards': ReviewCardSerializer(cards, many=True).data})
+
+
+class ReviewGradeView(APIView):
+    """
+    Grade a batch of reviewed cards.
+
+    Body: ``{"grades": [{"card_id": 1, "quality": 4}, {"card_id": 2, "answer": "..."}]}``
+    with an SM-2 quality from 0 (blackout) to 5 (perfect), or an answer for
+    question cards.
+    """
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        grades = {}
+        for item in request.data.get('grades', []):
+            try:
+                card_id = int(item['card_id'])
+                if 'answer' in item:
+                    grades[card_id] = {'answer': item['answer']}
+                else:
+                    quality = int(item['quality'])
+                    if not 0 <= quality <= 5:
+                        raise ValueError
+                    grades[card_id] = quality
+            except (KeyError, TypeError, ValueError):
+                return Response({'error': 'Each grade needs a card_id and a quality (0-5) or an answer'},
+                                status=status.HTTP_400_BAD_REQUEST)
+        cards = review.grade_cards(user_id=1, grades=grades)  # Demo user
+        return Response({'cards': [
+            {'id': card.pk, 'due_at': card.due_at, 'interval_days': card.interval_days,
+             'repetitions': card.repetitions, 'ease': round(card.ease, 2)}
+            for card in cards
+        ]})
+
 
 class ChatBotView(APIView):
     """
@@ -203,11 +310,11 @@ class ChatBotView(APIView):
             return Response({'error': 'Message is required'}, status=status.HTTP_400_BAD_REQUEST)
 
         # Save user message
-        ChatMessage.objects.create(
+        write_behind.add([ChatMessage(
             session_id=session_id,
             role='user',
             message=message
-        )
+        )])
 
         # Generate AI response
         try:
@@ -216,11 +323,11 @@ class ChatBotView(APIView):
             assistant_response = "Mba'éichapa! I'm your Guarani teacher. How can I help you learn today?"
 
         # Save assistant message
-        ChatMessage.objects.create(
+        write_behind.add([ChatMessage(
             session_id=session_id,
             role='assistant',
             message=assistant_response
-        )
+        )])
 
         return Response({
             'session_id': session_id,
@@ -228,39 +335,110 @@ class ChatBotView(APIView):
         })
 
     def _generate_response(self, message, session_id):
-        """Generate AI response using OpenAI"""
-        if not settings.OPENAI_API_KEY:
-            return "Mba'éichapa! I'm your Guarani language teacher. I can help you practice Guarani, answer questions about grammar, vocabulary, and culture. What would you like to learn today?"
+        """Answer vocabulary questions from the glossary, anything else with OpenAI"""
+        glossary_answer = intents.answer(message)
+        if glossary_answer is not None:
+            return glossary_answer
+
+        if not llm.is_configured():
+            return llm.OFFLINE_RESPONSE
 
         try:
-            from openai import OpenAI
-            client = OpenAI(api_key=settings.OPENAI_API_KEY)
-
-            # Get conversation history
-            history = ChatMessage.objects.filter(session_id=session_id).order_by('created_at')[:10]
-            messages = [
-                {
-                    "role": "system",
-                    "content": "You are a helpful and patient Guarani language teacher. You help students learn Guarani (the indigenous language of Paraguay) through conversation, grammar explanations, vocabulary practice, and cultural insights. Be encouraging, provide examples, and correct mistakes gently. You can respond in Spanish or English when needed, but encourage Guarani practice."
-                }
-            ]
-
-            for msg in history:
-                messages.append({
-                    "role": msg.role,
-                    "content": msg.message
-                })
-
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=messages,
-                max_tokens=300,
-                temperature=0.7
-            )
+            messages = llm.build_messages(session_id)
+            cached = response_cache.get(message, messages)
+            if cached is not None:
+                return cached
+            reply = llm.complete(messages)
+            response_cache.set(message, messages, reply)
+            return reply
+        except Exception:
+            return llm.ERROR_RESPONSE
+
+
+class ChatStreamView(APIView):
+    """
+    Chatbot replies streamed token by token as Server-Sent Events
+    """
+    permission_classes = [AllowAny]
 
-            return response.choices[0].message.content
-        except Exception as e:
-            return "Mba'éichapa! I'm here to help you learn Guarani. Ask me anything about the language, grammar, vocabulary, or culture!"
+    def post(self, request):
+        message = request.data.get('message', '')
+        session_id = request.data.get('session_id') or str(uuid.uuid4())
+
+        if not message:
+            return Response({'error': 'Message is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        write_behind.add([ChatMessage(
+            session_id=session_id,
+            role='user',
+            message=message
+        )])
+
+        response = StreamingHttpResponse(
+            self._event_stream(message, session_id),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    def _event_stream(self, message, session_id):
+        yield _sse_event('session', {'session_id': session_id})
+
+        parts = []
+        try:
+            for token in self._generate_tokens(message, session_id):
+                parts.append(token)
+                yield _sse_event('token', {'token': token})
+        finally:
+            # Persist whatever was produced, even if the client went away
+            write_behind.add([ChatMessage(
+                session_id=session_id,
+                role='assistant',
+                message=''.join(parts) or llm.ERROR_RESPONSE
+            )])
+
+        yield _sse_event('done', {'session_id': session_id})
+
+    def _generate_tokens(self, message, session_id):
+        glossary_answer = intents.answer(message)
+        if glossary_answer is not None:
+            yield glossary_answer
+            return
+
+        if not llm.is_configured():
+            yield llm.OFFLINE_RESPONSE
+            return
+
+        parts = []
+        try:
+            messages = llm.build_messages(session_id)
+            cached = response_cache.get(message, messages)
+            if cached is not None:
+                yield cached
+                return
+            for token in llm.stream(messages):
+                parts.append(token)
+                yield token
+        except Exception:
+            if not parts:
+                yield llm.ERROR_RESPONSE
+            return
+        response_cache.set(message, messages, ''.join(parts))
+
+
+def _sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class ChatCacheStatsView(APIView):
+    """
+    Hit/miss counters for this process's chatbot response cache
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        return Response(response_cache.stats())
 
 
 class ChatHistoryView(APIView):
@@ -268,11 +446,50 @@ class ChatHistoryView(APIView):
     Retrieve chat conversation history
     """
     permission_classes = [AllowAny]
+    default_limit = 100
+    max_limit = 500
 
     def get(self, request, session_id):
-        messages = ChatMessage.objects.filter(session_id=session_id).order_by('created_at')
-        serializer = ChatMessageSerializer(messages, many=True)
-        return Response(serializer.data)
+        """
+        Without parameters return the whole conversation. Without ``after_id``
+        return the latest ``limit`` messages; with it, the next ``limit``
+        messages after that id. Responses carry an ETag so an unchanged window
+        is answered with 304 Not Modified.
+        """
+        windowed = 'after_id' in request.query_params or 'limit' in request.query_params
+        try:
+            after_id = int(request.query_params.get('after_id', 0))
+            limit = int(request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            return Response({'error': 'after_id and limit must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = min(max(limit, 1), self.max_limit) if windowed else None
+
+        if write_behind.pending(ChatMessage, session_id=session_id):
+            write_behind.flush()
+        messages = ChatMessage.objects.filter(session_id=session_id)
+        if after_id:
+            messages = messages.filter(id__gt=after_id)
+
+        window = messages.aggregate(last_id=Max('id'), count=Count('id'))
+        validator = f"{session_id}:{after_id}:{limit}:{window['last_id']}:{window['count']}"
+        etag = quote_etag(hashlib.sha1(validator.encode('utf-8')).hexdigest()[:24])
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+
+        if limit is None:
+            page = list(messages.order_by('id'))
+        elif after_id:
+            page = list(messages.order_by('id')[:limit])
+        else:
+            page = list(messages.order_by('-id')[:limit])[::-1]
+
+        serializer = ChatMessageSerializer(page, many=True)
+        response = Response(serializer.data)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        response['X-Has-More'] = 'true' if after_id and window['count'] > limit else 'false'
+        return response
 
 
 class DashboardStatsView(APIView):
@@ -285,36 +502,25 @@ class DashboardStatsView(APIView):
         # In production: filter by request.user
         user_id = 1  # Demo user
 
-        # Total lessons and completed
-        total_lessons = Lesson.objects.filter(is_published=True).count()
-        completed_lessons = UserProgress.objects.filter(user_id=user_id, completed=True).count()
-
-        # Total vocabulary terms
-        total_vocabulary = GlossaryTerm.objects.count()
+        # Materialized per-user totals and cached content counts
+        user_stats = stats.get_user_stats(user_id)
+        totals = stats.content_totals()
+        total_lessons = totals['total_lessons']
+        completed_lessons = user_stats.lessons_completed
 
         # Recent progress
-        recent_progress = UserProgress.objects.filter(user_id=user_id).order_by('-last_accessed')[:5]
+        recent_progress = UserProgress.objects.filter(user_id=user_id).select_related('lesson').order_by('-last_accessed')[:5]
         progress_serializer = UserProgressSerializer(recent_progress, many=True)
 
-        # Exercises completed
-        exercises_completed = ExerciseAttempt.objects.filter(user_id=user_id).values('exercise').distinct().count()
-
-        # Average score
-        avg_score = UserProgress.objects.filter(
-            user_id=user_id,
-            completed=True,
-            total_points__gt=0
-        ).aggregate(
-            avg=Sum('score') * 100.0 / Sum('total_points')
-        )['avg'] or 0
-
         return Response({
             'total_lessons': total_lessons,
             'completed_lessons': completed_lessons,
-            'lessons_in_progress': UserProgress.objects.filter(user_id=user_id, completed=False).count(),
-            'total_vocabulary': total_vocabulary,
-            'exercises_completed': exercises_completed,
-            'average_score': round(avg_score, 2),
+            'lessons_in_progress': user_stats.lessons_in_progress,
+            'total_vocabulary': totals['total_vocabulary'],
+            'exercises_completed': user_stats.exercises_completed,
+            'average_score': user_stats.average_score,
+            'current_streak': stats.current_streak(user_stats),
+            'longest_streak': user_stats.longest_streak,
             'recent_progress': progress_serializer.data,
             'completion_percentage': round((completed_lessons / total_lessons * 100) if total_lessons > 0 else 0, 2)
         })
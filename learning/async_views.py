@@ -0,0 +1,131 @@
+"""
+Async chatbot endpoints for ASGI deployments (see ``guarani_app/asgi.py``).
+
+These mirror ``ChatBotView`` and ``ChatStreamView`` but await the pooled
+AsyncOpenAI client and the async ORM, so a waiting completion never holds a
+worker thread.
+"""
+import json
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from . import intents, llm, write_behind
+from .models import ChatMessage
+from .response_cache import response_cache
+
+
+def _parse_chat_request(request):
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        data = {}
+    if not isinstance(data, dict):
+        data = {}
+    return data.get('message', ''), data.get('session_id') or str(uuid.uuid4())
+
+
+async def _generate_response(message, session_id):
+    glossary_answer = await sync_to_async(intents.answer)(message)
+    if glossary_answer is not None:
+        return glossary_answer
+
+    if not llm.is_configured():
+        return llm.OFFLINE_RESPONSE
+
+    try:
+        messages = await llm.abuild_messages(session_id)
+        cached = response_cache.get(message, messages)
+        if cached is not None:
+            return cached
+        reply = await llm.acomplete(messages)
+        response_cache.set(message, messages, reply)
+        return reply
+    except Exception:
+        return llm.ERROR_RESPONSE
+
+
+@csrf_exempt
+@require_POST
+async def chat(request):
+    """Async counterpart of ChatBotView"""
+    message, session_id = _parse_chat_request(request)
+    if not message:
+        return JsonResponse({'error': 'Message is required'}, status=400)
+
+    await write_behind.aadd([ChatMessage(session_id=session_id, role='user', message=message)])
+    assistant_response = await _generate_response(message, session_id)
+    await write_behind.aadd([ChatMessage(session_id=session_id, role='assistant', message=assistant_response)])
+
+    return JsonResponse({
+        'session_id': session_id,
+        'response': assistant_response
+    })
+
+
+@csrf_exempt
+@require_POST
+async def chat_stream(request):
+    """Async counterpart of ChatStreamView"""
+    message, session_id = _parse_chat_request(request)
+    if not message:
+        return JsonResponse({'error': 'Message is required'}, status=400)
+
+    await write_behind.aadd([ChatMessage(session_id=session_id, role='user', message=message)])
+
+    response = StreamingHttpResponse(_event_stream(message, session_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def _event_stream(message, session_id):
+    yield _sse_event('session', {'session_id': session_id})
+
+    parts = []
+    try:
+        async for token in _generate_tokens(message, session_id):
+            parts.append(token)
+            yield _sse_event('token', {'token': token})
+    finally:
+        await write_behind.aadd([ChatMessage(
+            session_id=session_id,
+            role='assistant',
+            message=''.join(parts) or llm.ERROR_RESPONSE
+        )])
+
+    yield _sse_event('done', {'session_id': session_id})
+
+
+async def _generate_tokens(message, session_id):
+    glossary_answer = await sync_to_async(intents.answer)(message)
+    if glossary_answer is not None:
+        yield glossary_answer
+        return
+
+    if not llm.is_configured():
+        yield llm.OFFLINE_RESPONSE
+        return
+
+    parts = []
+    try:
+        messages = await llm.abuild_messages(session_id)
+        cached = response_cache.get(message, messages)
+        if cached is not None:
+            yield cached
+            return
+        async for token in llm.astream(messages):
+            parts.append(token)
+            yield token
+    except Exception:
+        if not parts:
+            yield llm.ERROR_RESPONSE
+        return
+    response_cache.set(message, messages, ''.join(parts))
+
+
+def _sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
@@ -0,0 +1,192 @@
+"""
+Audio pipeline: low-bitrate variants of uploaded clips.
+
+When a term, content block or question is saved with an audio file, the clip
+is transcoded in a background thread (after the transaction commits) into a
+small set of mono, low-bitrate variants stored next to the media under
+``audio/variants/``. Variant names are derived from the source name, so they
+never go stale and can be cached forever (see ``learning.media``).
+
+ffmpeg (``FFMPEG_BINARY``) produces Opus and MP3 variants. Without it, WAV
+uploads are downsampled in pure Python to a 16 kHz mono WAV; other formats are
+served as uploaded.
+"""
+import array
+import hashlib
+import io
+import logging
+import mimetypes
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import wave
+from contextlib import contextmanager
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from .background import submit_on_commit
+
+logger = logging.getLogger(__name__)
+
+VARIANT_DIR = 'audio/variants'
+
+# (extension, MIME type for <source type=...>, ffmpeg codec arguments)
+FFMPEG_VARIANTS = [
+    ('opus', 'audio/ogg; codecs=opus', ['-c:a', 'libopus', '-b:a', '24k', '-application', 'voip']),
+    ('mp3', 'audio/mpeg', ['-c:a', 'libmp3lame', '-b:a', '48k']),
+]
+FALLBACK_VARIANTS = [
+    ('wav', 'audio/wav', None),
+]
+FALLBACK_RATE = 16000
+
+CONTENT_TYPES = {
+    '.opus': 'audio/ogg',
+    '.ogg': 'audio/ogg',
+    '.oga': 'audio/ogg',
+    '.m4a': 'audio/mp4',
+    '.mp3': 'audio/mpeg',
+    '.wav': 'audio/wav',
+    '.webm': 'audio/webm',
+}
+
+def content_type(name):
+    """MIME type of a media file, including audio types mimetypes misses"""
+    suffix = PurePosixPath(name).suffix.lower()
+    return CONTENT_TYPES.get(suffix) or mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+
+def ffmpeg_binary():
+    return shutil.which(settings.FFMPEG_BINARY)
+
+
+def variant_specs():
+    return FFMPEG_VARIANTS if ffmpeg_binary() else FALLBACK_VARIANTS
+
+
+def variant_name(source_name, extension):
+    stem = PurePosixPath(source_name).stem[:60]
+    digest = hashlib.sha1(source_name.encode('utf-8')).hexdigest()[:10]
+    return f'{VARIANT_DIR}/{stem}-{digest}.{extension}'
+
+
+def sources(field_file):
+    """
+    ``[{'url', 'type'}]`` for an audio field: existing variants, smallest
+    first, then the original upload.
+    """
+    if not field_file:
+        return []
+    result = []
+    for extension, mime, _ in FFMPEG_VARIANTS + FALLBACK_VARIANTS:
+        name = variant_name(field_file.name, extension)
+        if default_storage.exists(name):
+            result.append({'url': default_storage.url(name), 'type': mime})
+    result.append({'url': field_file.url, 'type': content_type(field_file.name)})
+    return result
+
+
+def _ffmpeg_transcode(binary, source_path, codec_args):
+    with tempfile.NamedTemporaryFile(suffix='.out') as target:
+        command = [binary, '-nostdin', '-loglevel', 'error', '-y', '-i', source_path, '-vn', '-ac', '1',
+                   *codec_args, '-f', 'ogg' if 'libopus' in codec_args else 'mp3', target.name]
+        subprocess.run(command, check=True, capture_output=True, timeout=settings.AUDIO_TRANSCODE_TIMEOUT)
+        with open(target.name, 'rb') as handle:
+            return handle.read()
+
+
+def downsample_wav(data, rate=FALLBACK_RATE):
+    """Mix a PCM WAV down to mono 16-bit at ``rate`` Hz (linear interpolation)"""
+    with wave.open(io.BytesIO(data)) as source:
+        channels, width, source_rate = source.getnchannels(), source.getsampwidth(), source.getframerate()
+        frames = source.readframes(source.getnframes())
+    if width == 1:
+        samples = array.array('h', ((sample - 128) << 8 for sample in frames))
+    elif width == 2:
+        samples = array.array('h', frames)
+        if sys.byteorder == 'big':
+            samples.byteswap()
+    else:
+        raise ValueError(f'unsupported sample width {width}')
+
+    if channels > 1:
+        samples = array.array('h', (
+            sum(samples[i:i + channels]) // channels for i in range(0, len(samples), channels)
+        ))
+    if source_rate > rate:
+        step = source_rate / rate
+        count = int(len(samples) / step)
+        resampled = array.array('h', bytes(2 * count))
+        for i in range(count):
+            position = i * step
+            index = int(position)
+            following = samples[min(index + 1, len(samples) - 1)]
+            resampled[i] = int(samples[index] + (following - samples[index]) * (position - index))
+        samples, source_rate = resampled, rate
+    if sys.byteorder == 'big':
+        samples.byteswap()
+
+    output = io.BytesIO()
+    with wave.open(output, 'wb') as target:
+        target.setnchannels(1)
+        target.setsampwidth(2)
+        target.setframerate(source_rate)
+        target.writeframes(samples.tobytes())
+    return output.getvalue()
+
+
+def transcode(source_name, force=False):
+    """Create the missing variants of ``source_name``; returns the names written"""
+    binary = ffmpeg_binary()
+    written = []
+    for extension, _, codec_args in variant_specs():
+        name = variant_name(source_name, extension)
+        if default_storage.exists(name):
+            if not force:
+                continue
+            default_storage.delete(name)
+        try:
+            if binary:
+                with _local_copy(source_name) as source_path:
+                    payload = _ffmpeg_transcode(binary, source_path, codec_args)
+            elif content_type(source_name) == 'audio/wav':
+                with default_storage.open(source_name, 'rb') as handle:
+                    payload = downsample_wav(handle.read())
+            else:
+                continue
+        except (OSError, ValueError, EOFError, wave.Error, subprocess.SubprocessError) as exc:
+            logger.warning('Could not transcode %s to %s: %s', source_name, extension, exc)
+            continue
+        written.append(default_storage.save(name, ContentFile(payload)))
+    return written
+
+
+@contextmanager
+def _local_copy(name):
+    """Filesystem path of a stored file (copied to a temp file for remote storages)"""
+    try:
+        path = default_storage.path(name)
+    except NotImplementedError:
+        path = None
+    if path is not None:
+        yield path
+        return
+    fd, temp = tempfile.mkstemp(suffix=PurePosixPath(name).suffix)
+    try:
+        with os.fdopen(fd, 'wb') as target, default_storage.open(name, 'rb') as source:
+            shutil.copyfileobj(source, target)
+        yield temp
+    finally:
+        os.unlink(temp)
+
+
+def schedule(field_file):
+    """Transcode ``field_file`` in the background once the transaction commits"""
+    if not field_file or not settings.AUDIO_TRANSCODE:
+        return
+    submit_on_commit(transcode, field_file.name)
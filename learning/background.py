@@ -0,0 +1,42 @@
+"""
+Small in-process pool for media post-processing (audio variants, image
+thumbnails) so uploads return without waiting for it.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def _executor_instance():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.MEDIA_WORKERS, thread_name_prefix='media')
+    return _executor
+
+
+def _run(func, args):
+    try:
+        func(*args)
+    except Exception:
+        logger.exception('Background task %s failed', getattr(func, '__name__', func))
+    finally:
+        close_old_connections()
+
+
+def submit_on_commit(func, *args):
+    """Run ``func(*args)`` on the media pool once the current transaction commits"""
+    transaction.on_commit(lambda: _executor_instance().submit(_run, func, args))
+
+
+def wait():
+    """Block until queued tasks have finished (management commands, scripts)"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
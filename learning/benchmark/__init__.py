@@ -0,0 +1,4 @@
+"""
+Benchmarks: synthetic data (``data``) and the endpoint suite (``suite``),
+driven by ``manage.py benchmark_data`` and ``manage.py benchmark``.
+"""
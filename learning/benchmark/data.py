@@ -0,0 +1,270 @@
+"""
+Synthetic benchmark data.
+
+``generate`` fills the database with a configurable amount of glossary
+terms, lessons (with content blocks, vocabulary links, exercises, questions
+and choices), users, lesson progress, exercise attempts and chat messages.
+Everything is written with ``bulk_create`` and generated from a seeded RNG,
+so the same arguments produce the same data set. Bulk writes skip model
+signals, so the derived state they maintain (search index, user stats,
+review cards) is rebuilt once at the end.
+
+Generated rows are tagged (term category, lesson title prefix, username and
+chat session prefixes) so ``clear`` removes them without touching real
+content. The demo user (id 1), whom the views act as, also gets progress,
+attempts and chat history on the generated lessons.
+"""
+import random
+from dataclasses import asdict, dataclass
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from .. import review, search, stats
+from ..models import (
+    AnswerChoice, ChatMessage, Exercise, ExerciseAttempt, GlossaryTerm, Lesson, LessonContent,
+    Question, UserProgress,
+)
+from ..suggest import suggestion_index
+
+CATEGORY = 'Benchmark'
+LESSON_PREFIX = '[bench] '
+USER_PREFIX = 'bench_user'
+SESSION_PREFIX = 'bench-'
+DEMO_USER_ID = 1
+
+SYLLABLES = [
+    'a', 'e', 'i', 'o', 'u', 'y', 'ka', 'ke', 'ko', 'ku', 'ma', 'me', 'mo', 'mba', 'mbo', 'nde',
+    'ña', 'ñe', 'pa', 'pe', 'po', 'py', 'ra', 're', 'ro', 'ta', 'te', 'tu', 'va', 've', 'ja', 'jo',
+    'ha', 'he', 'hu', 'gua', 'gui', 'ndu', 'mi', 'ti', 'ki', 'pu', 'ry', 'sa', 'so', 'ãi', 'ẽ',
+]
+WORDS = ['casa', 'agua', 'sol', 'luna', 'perro', 'madre', 'tierra', 'fuego', 'camino', 'pájaro',
+         'árbol', 'río', 'niño', 'día', 'noche', 'comida', 'amigo', 'palabra', 'ciudad', 'monte']
+DIFFICULTIES = ['beginner', 'intermediate', 'advanced']
+CATEGORIES = ['Greetings', 'Nature', 'Family', 'Food', 'Numbers', 'Verbs']
+QUESTION_TYPES = ['multiple_choice', 'fill_blank', 'true_false']
+CHOICES_PER_QUESTION = 4
+
+
+@dataclass
+class DataSpec:
+    terms: int = 1000
+    lessons: int = 50
+    blocks: int = 8
+    exercises: int = 4
+    questions: int = 5
+    users: int = 50
+    attempts: int = 20000
+    chat_messages: int = 5000
+    terms_per_block: int = 5
+    seed: int = 0
+
+
+def make_word(index):
+    """A unique, Guarani-looking word: ``index`` written in base len(SYLLABLES)"""
+    parts = []
+    index += len(SYLLABLES)
+    while index:
+        index, digit = divmod(index, len(SYLLABLES))
+        parts.append(SYLLABLES[digit])
+    return ''.join(reversed(parts))
+
+
+def _make_terms(spec, rng, batch_size):
+    """Insert the glossary terms with their search columns and FTS rows"""
+    batch = []
+
+    def flush():
+        GlossaryTerm.objects.bulk_create(batch)
+        search.index_terms((term.pk, term.search_text) for term in batch)
+        batch.clear()
+
+    for index in range(spec.terms):
+        word = make_word(index)
+        translation = f'{rng.choice(WORDS)} {index}'
+        term = GlossaryTerm(
+            guarani_word=word,
+            spanish_translation=translation,
+            english_translation=f'word {index}',
+            pronunciation='-'.join(word[i:i + 2] for i in range(0, len(word), 2)),
+            example_sentence_guarani=f'Che {word} porã',
+            example_sentence_spanish=f'Mi {translation} es lindo',
+            category=CATEGORY,
+            difficulty_level=rng.choice(DIFFICULTIES),
+        )
+        term.normalized_word = search.normalize_text(term.guarani_word)
+        term.search_text = search.build_search_text(term)
+        batch.append(term)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    suggestion_index.invalidate()
+
+
+def generate(spec=None, batch_size=1000, progress=None):
+    """Insert a data set described by ``spec``; returns the row counts"""
+    spec = spec or DataSpec()
+    rng = random.Random(spec.seed)
+    report = progress or (lambda message: None)
+    now = timezone.now()
+
+    with transaction.atomic():
+        report(f'{spec.terms} glossary terms')
+        _make_terms(spec, rng, batch_size)
+        term_ids = list(GlossaryTerm.objects.filter(category=CATEGORY).values_list('id', flat=True))
+
+        report(f'{spec.lessons} lessons')
+        first_order = (Lesson.objects.order_by('-order').values_list('order', flat=True).first() or 0) + 1
+        lessons = Lesson.objects.bulk_create([
+            Lesson(
+                title=f'{LESSON_PREFIX}{rng.choice(CATEGORIES)} {number}',
+                description=f'Synthetic lesson {number} for benchmarks',
+                order=first_order + number,
+                difficulty_level=DIFFICULTIES[number % len(DIFFICULTIES)],
+                estimated_duration=rng.randint(5, 30),
+            )
+            for number in range(spec.lessons)
+        ], batch_size=batch_size)
+
+        blocks = LessonContent.objects.bulk_create([
+            LessonContent(
+                lesson=lesson,
+                order=order,
+                content_type='vocabulary' if order % 2 else 'text',
+                title=f'Block {order}',
+                text_content=' '.join(rng.choices(WORDS, k=60)),
+            )
+            for lesson in lessons
+            for order in range(spec.blocks)
+        ], batch_size=batch_size)
+
+        if term_ids:
+            through = LessonContent.vocabulary_terms.through
+            through.objects.bulk_create([
+                through(lessoncontent_id=block.pk, glossaryterm_id=term_id)
+                for block in blocks if block.content_type == 'vocabulary'
+                for term_id in rng.sample(term_ids, min(spec.terms_per_block, len(term_ids)))
+            ], batch_size=batch_size)
+
+        report(f'{spec.lessons * spec.exercises} exercises')
+        exercises = Exercise.objects.bulk_create([
+            Exercise(lesson=lesson, title=f'Exercise {order}', instructions='Answer every question', order=order)
+            for lesson in lessons
+            for order in range(spec.exercises)
+        ], batch_size=batch_size)
+
+        questions = []
+        choices = []
+        for exercise in exercises:
+            for order in range(spec.questions):
+                question_type = QUESTION_TYPES[order % len(QUESTION_TYPES)]
+                options = rng.sample(WORDS, CHOICES_PER_QUESTION)
+                if question_type == 'true_false':
+                    answer = rng.choice(['true', 'false'])
+                else:
+                    answer = options[0]
+                questions.append(Question(
+                    exercise=exercise, question_type=question_type, order=order,
+                    question_text=f'¿Cómo se dice "{options[0]}"?', correct_answer=answer,
+                ))
+                choices.append(options if question_type == 'multiple_choice' else [])
+        questions = Question.objects.bulk_create(questions, batch_size=batch_size)
+        AnswerChoice.objects.bulk_create([
+            AnswerChoice(question=question, choice_text=text, order=order)
+            for question, options in zip(questions, choices)
+            for order, text in enumerate(options)
+        ], batch_size=batch_size)
+
+        report(f'{spec.users} users')
+        password = make_password(None)
+        start = User.objects.filter(username__startswith=USER_PREFIX).count()
+        users = User.objects.bulk_create([
+            User(username=f'{USER_PREFIX}{start + number}', password=password)
+            for number in range(spec.users)
+        ], batch_size=batch_size)
+        user_ids = [user.pk for user in users]
+        # On an empty database the first generated user may itself get the demo id
+        if DEMO_USER_ID not in user_ids and User.objects.filter(pk=DEMO_USER_ID).exists():
+            user_ids.append(DEMO_USER_ID)
+
+        progress_rows = []
+        started = {}
+        for user_id in user_ids:
+            taken = rng.sample(lessons, rng.randint(1, len(lessons))) if lessons else []
+            started[user_id] = taken
+            for lesson in taken:
+                completed = rng.random() < 0.5
+                progress_rows.append(UserProgress(
+                    user_id=user_id, lesson=lesson, completed=completed,
+                    completion_date=now if completed else None,
+                    score=rng.randint(0, 100) if completed else 0,
+                    total_points=100 if completed else 0,
+                ))
+        UserProgress.objects.bulk_create(progress_rows, batch_size=batch_size)
+
+        report(f'{spec.attempts} exercise attempts')
+        questions_by_lesson = {}
+        for question in questions:
+            questions_by_lesson.setdefault(question.exercise.lesson_id, []).append(question)
+        candidates = [(user_id, lesson.pk) for user_id, taken in started.items() for lesson in taken
+                      if lesson.pk in questions_by_lesson]
+        attempts = []
+        for _ in range(spec.attempts if candidates else 0):
+            user_id, lesson_id = rng.choice(candidates)
+            question = rng.choice(questions_by_lesson[lesson_id])
+            is_correct = rng.random() < 0.7
+            attempts.append(ExerciseAttempt(
+                user_id=user_id, exercise_id=question.exercise_id, question=question,
+                user_answer=question.correct_answer if is_correct else 'no sé',
+                is_correct=is_correct, points_earned=question.points if is_correct else 0,
+            ))
+            if len(attempts) >= batch_size:
+                ExerciseAttempt.objects.bulk_create(attempts)
+                attempts = []
+        ExerciseAttempt.objects.bulk_create(attempts)
+
+        report(f'{spec.chat_messages} chat messages')
+        sessions = max(1, spec.chat_messages // 20)
+        messages = []
+        for number in range(spec.chat_messages):
+            session = number % sessions
+            messages.append(ChatMessage(
+                user_id=user_ids[session % len(user_ids)] if user_ids else None,
+                session_id=f'{SESSION_PREFIX}{spec.seed}-{session}',
+                role='user' if (number // sessions) % 2 == 0 else 'assistant',
+                message=' '.join(rng.choices(WORDS, k=rng.randint(3, 25))),
+            ))
+            if len(messages) >= batch_size:
+                ChatMessage.objects.bulk_create(messages)
+                messages = []
+        ChatMessage.objects.bulk_create(messages)
+
+    report('user stats and review cards')
+    stats.rebuild(user_ids=user_ids)
+    review.rebuild(user_ids=user_ids, batch_size=batch_size)
+    stats.invalidate_content_totals()
+
+    counts = asdict(spec)
+    counts.update(
+        terms=len(term_ids), lessons=len(lessons), blocks=len(blocks), exercises=len(exercises),
+        questions=len(questions), users=len(users), progress=len(progress_rows),
+    )
+    return counts
+
+
+def clear(progress=None):
+    """Delete every generated row"""
+    report = progress or (lambda message: None)
+    report('lessons')
+    Lesson.objects.filter(title__startswith=LESSON_PREFIX).delete()
+    report('users')
+    User.objects.filter(username__startswith=USER_PREFIX).delete()
+    report('chat messages')
+    ChatMessage.objects.filter(session_id__startswith=SESSION_PREFIX).delete()
+    report('glossary terms')
+    GlossaryTerm.objects.filter(category=CATEGORY).delete()
+    stats.rebuild(user_ids=[DEMO_USER_ID])
+    stats.invalidate_content_totals()
@@ -0,0 +1,338 @@
+"""
+Endpoint benchmark suite.
+
+``build_scenarios`` returns one request per route in ``learning.urls`` and
+``learning.api_urls`` (plus variants for search, sparse fieldsets and the
+like), with ids taken from the generated benchmark data when present.
+``run`` drives each scenario through the Django test client, in process, or
+over HTTP against a running server (e.g. a local gunicorn), and reports
+throughput, latency percentiles and queries per request.
+
+Query counts come from the ``Server-Timing`` header when the server runs
+``ProfilerMiddleware`` (``PROFILER=True``); in process they are otherwise
+counted directly, over HTTP they are left out.
+"""
+import http.client
+import json
+import platform
+import re
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from urllib.parse import urlencode, urlsplit
+
+import django
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.db import connection
+from django.test import Client
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+
+from guarani_app import profiling
+
+from .. import llm
+from ..forms import GlossaryTermForm
+from ..models import ChatMessage, Exercise, GlossaryTerm, Lesson, ReviewCard
+from . import data
+
+SERVER_TIMING_QUERIES_RE = re.compile(r'db;[^,]*desc="(\d+) queries"')
+JSON = 'application/json'
+FORM = 'application/x-www-form-urlencoded'
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: str
+    body: bytes = b''
+    content_type: str = ''
+    # Calls the LLM when OPENAI_API_KEY is set
+    external: bool = False
+    # Form post that needs a CSRF token outside the test client
+    csrf: bool = False
+
+
+def _json(name, path, payload, **kwargs):
+    return Scenario(name, 'POST', path, json.dumps(payload).encode('utf-8'), JSON, **kwargs)
+
+
+class _NamedBytes(bytes):
+    """In-memory upload for ``encode_multipart``"""
+
+    def __new__(cls, name, content):
+        value = super().__new__(cls, content)
+        value.name = name
+        return value
+
+    def read(self):
+        return bytes(self)
+
+
+def build_scenarios():
+    """Scenarios for every route, or raise LookupError when the database is empty"""
+    lesson = (Lesson.objects.filter(title__startswith=data.LESSON_PREFIX).order_by('pk').first()
+              or Lesson.objects.order_by('pk').first())
+    term = (GlossaryTerm.objects.filter(category=data.CATEGORY).order_by('pk').first()
+            or GlossaryTerm.objects.order_by('pk').first())
+    if lesson is None or term is None:
+        raise LookupError('No lessons or glossary terms: run "manage.py benchmark_data" first')
+    exercise = (Exercise.objects.filter(lesson=lesson, questions__isnull=False).order_by('pk').first()
+                or Exercise.objects.filter(questions__isnull=False).order_by('pk').first())
+    session_id = (ChatMessage.objects.filter(session_id__startswith=data.SESSION_PREFIX)
+                  .values_list('session_id', flat=True).first() or 'benchmark')
+    query = term.guarani_word[:3]
+
+    form = GlossaryTermForm(instance=term)
+    form_data = {name: value for name, value in form.initial.items() if name in form.fields and value}
+    answers = []
+    if exercise is not None:
+        answers = [{'question_id': question.pk, 'answer': question.correct_answer}
+                   for question in exercise.questions.all()]
+    card_ids = list(ReviewCard.objects.filter(user_id=data.DEMO_USER_ID).values_list('pk', flat=True)[:5])
+    upload = '\n'.join(['guarani_word,spanish_translation,category'] + [
+        f'{word},{translation},{data.CATEGORY}'
+        for word, translation in GlossaryTerm.objects.filter(category=data.CATEGORY)
+        .values_list('guarani_word', 'spanish_translation')[:50]
+    ])
+
+    scenarios = [
+        # learning.urls
+        Scenario('dashboard', 'GET', '/'),
+        Scenario('glossary-list', 'GET', '/glossary/'),
+        Scenario('glossary-list-search', 'GET', f'/glossary/?{urlencode({"search": query})}'),
+        Scenario('glossary-create-form', 'GET', '/glossary/create/'),
+        Scenario('glossary-detail', 'GET', f'/glossary/{term.pk}/'),
+        Scenario('glossary-edit-form', 'GET', f'/glossary/{term.pk}/edit/'),
+        Scenario('glossary-edit', 'POST', f'/glossary/{term.pk}/edit/', urlencode(form_data).encode(), FORM,
+                 csrf=True),
+        Scenario('glossary-delete-confirm', 'GET', f'/glossary/{term.pk}/delete/'),
+        Scenario('lessons-list', 'GET', '/lessons/'),
+        Scenario('lesson-detail', 'GET', f'/lessons/{lesson.pk}/'),
+        # learning.api_urls
+        Scenario('api-root', 'GET', '/api/'),
+        Scenario('api-glossary-list', 'GET', '/api/glossary/'),
+        Scenario('api-glossary-search', 'GET', f'/api/glossary/?{urlencode({"search": query})}'),
+        Scenario('api-glossary-sparse', 'GET', '/api/glossary/?fields=id,guarani_word,spanish_translation'),
+        Scenario('api-glossary-detail', 'GET', f'/api/glossary/{term.pk}/'),
+        Scenario('api-glossary-categories', 'GET', '/api/glossary/categories/'),
+        Scenario('api-glossary-suggest', 'GET', f'/api/glossary/suggest/?{urlencode({"q": query})}'),
+        Scenario('api-glossary-export', 'GET', '/api/glossary/export/?type=jsonl'),
+        Scenario('api-glossary-import', 'POST', '/api/glossary/import/',
+                 encode_multipart(BOUNDARY, {'file': _NamedBytes('glossary.csv', upload.encode('utf-8'))}),
+                 MULTIPART_CONTENT),
+        Scenario('api-lessons-list', 'GET', '/api/lessons/'),
+        Scenario('api-lesson-detail', 'GET', f'/api/lessons/{lesson.pk}/'),
+        Scenario('api-lesson-sparse', 'GET', f'/api/lessons/{lesson.pk}/?fields=id,title,content_blocks'),
+        Scenario('api-lesson-pack', 'GET', f'/api/lessons/{lesson.pk}/pack/'),
+        Scenario('api-progress-list', 'GET', '/api/progress/'),
+        _json('api-progress-start', '/api/progress/start_lesson/', {'lesson_id': lesson.pk}),
+        _json('api-progress-complete', '/api/progress/complete_lesson/',
+              {'lesson_id': lesson.pk, 'score': 80, 'total_points': 100}),
+        _json('api-chat', '/api/chat/', {'message': 'Hola', 'session_id': session_id}, external=True),
+        _json('api-chat-stream', '/api/chat/stream/', {'message': 'Hola', 'session_id': session_id},
+              external=True),
+        _json('api-chat-async', '/api/chat/async/', {'message': 'Hola', 'session_id': session_id},
+              external=True),
+        _json('api-chat-async-stream', '/api/chat/async/stream/', {'message': 'Hola', 'session_id': session_id},
+              external=True),
+        Scenario('api-chat-cache-stats', 'GET', '/api/chat/cache-stats/'),
+        Scenario('api-chat-history', 'GET', f'/api/chat/history/{session_id}/'),
+        Scenario('api-review-next', 'GET', '/api/review/next/'),
+        _json('api-review-grade', '/api/review/grade/',
+              {'grades': [{'card_id': card_id, 'quality': 4} for card_id in card_ids]}),
+        Scenario('api-dashboard', 'GET', '/api/dashboard/'),
+    ]
+    if exercise is not None:
+        scenarios += [
+            Scenario('exercise-view', 'GET', f'/exercises/{exercise.pk}/'),
+            _json('api-exercise-submit', f'/api/exercises/{exercise.pk}/submit/', {'answers': answers}),
+        ]
+    return scenarios
+
+
+class ClientTransport:
+    """In-process requests through the Django test client"""
+
+    def __init__(self):
+        host = next((host.lstrip('.') for host in settings.ALLOWED_HOSTS if host not in ('*', '')), 'localhost')
+        # Server errors are counted like any other status, not raised
+        self.client = Client(raise_request_exception=False, HTTP_HOST=host or 'localhost')
+        profiling.install()
+
+    def request(self, scenario):
+        token = profiling.start()
+        try:
+            response = self.client.generic(scenario.method, scenario.path, scenario.body,
+                                           content_type=scenario.content_type)
+            if response.streaming and response.is_async:
+                size = async_to_sync(_consume)(response.streaming_content)
+            elif response.streaming:
+                size = sum(len(chunk) for chunk in response.streaming_content)
+            else:
+                size = len(response.content)
+            response.close()
+        finally:
+            recorder = profiling.stop(token)
+        queries = _header_queries(response.get('Server-Timing'))
+        return response.status_code, size, recorder.query_count if queries is None else queries
+
+    def close(self):
+        pass
+
+
+class HttpTransport:
+    """Requests to a running server over one keep-alive connection"""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.connection = connection_class(parts.hostname, parts.port, timeout=60)
+        self.prefix = parts.path.rstrip('/')
+
+    def request(self, scenario):
+        headers = {'Content-Type': scenario.content_type} if scenario.content_type else {}
+        self.connection.request(scenario.method, self.prefix + scenario.path,
+                                body=scenario.body or None, headers=headers)
+        response = self.connection.getresponse()
+        size = len(response.read())
+        return response.status, size, _header_queries(response.getheader('Server-Timing'))
+
+    def close(self):
+        self.connection.close()
+
+
+async def _consume(content):
+    return sum([len(chunk) async for chunk in content])
+
+
+def _header_queries(value):
+    match = SERVER_TIMING_QUERIES_RE.search(value or '')
+    return int(match.group(1)) if match else None
+
+
+@dataclass
+class ScenarioResult:
+    latencies: list = field(default_factory=list)
+    queries: list = field(default_factory=list)
+    statuses: dict = field(default_factory=dict)
+    bytes: int = 0
+    errors: int = 0
+    elapsed: float = 0.0
+
+    def add(self, status, size, queries, latency):
+        self.latencies.append(latency)
+        self.statuses[str(status)] = self.statuses.get(str(status), 0) + 1
+        self.bytes += size
+        if queries is not None:
+            self.queries.append(queries)
+        if status >= 400:
+            self.errors += 1
+
+    def as_dict(self):
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+        result = {
+            'requests': count,
+            'errors': self.errors,
+            'statuses': self.statuses,
+            'throughput_rps': round(count / self.elapsed, 1) if self.elapsed else None,
+            'latency_ms': {
+                'mean': round(sum(latencies) / count * 1000, 3),
+                'p50': round(profiling.percentile(latencies, 50) * 1000, 3),
+                'p95': round(profiling.percentile(latencies, 95) * 1000, 3),
+                'p99': round(profiling.percentile(latencies, 99) * 1000, 3),
+                'max': round(latencies[-1] * 1000, 3),
+            } if count else None,
+            'bytes_per_request': round(self.bytes / count) if count else 0,
+            'queries_per_request': None,
+        }
+        if self.queries:
+            result['queries_per_request'] = {
+                'mean': round(sum(self.queries) / len(self.queries), 2),
+                'max': max(self.queries),
+            }
+        return result
+
+
+def run(scenarios, iterations=50, warmup=5, concurrency=1, base_url=None, progress=None):
+    """Run each scenario ``warmup`` + ``iterations`` times; returns the JSON report"""
+    local = threading.local()
+    transports = []
+    lock = threading.Lock()
+
+    def transport():
+        if not hasattr(local, 'transport'):
+            local.transport = HttpTransport(base_url) if base_url else ClientTransport()
+            with lock:
+                transports.append(local.transport)
+        return local.transport
+
+    def timed(scenario):
+        started = time.perf_counter()
+        status, size, queries = transport().request(scenario)
+        return status, size, queries, time.perf_counter() - started
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='benchmark') as pool:
+        for scenario in scenarios:
+            list(pool.map(timed, [scenario] * warmup))
+            result = ScenarioResult()
+            started = time.perf_counter()
+            for outcome in pool.map(timed, [scenario] * iterations):
+                result.add(*outcome)
+            result.elapsed = time.perf_counter() - started
+            results[scenario.name] = dict(result.as_dict(), method=scenario.method, path=scenario.path)
+            if progress is not None:
+                progress(scenario, results[scenario.name])
+    for item in transports:
+        item.close()
+
+    return {'meta': _meta(iterations, warmup, concurrency, base_url), 'scenarios': results}
+
+
+def _meta(iterations, warmup, concurrency, base_url):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                                capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'target': base_url or 'test-client',
+        'iterations': iterations,
+        'warmup': warmup,
+        'concurrency': concurrency,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'llm_configured': llm.is_configured(),
+        'rows': {
+            'glossary_terms': GlossaryTerm.objects.count(),
+            'lessons': Lesson.objects.count(),
+            'exercises': Exercise.objects.count(),
+            'chat_messages': ChatMessage.objects.count(),
+        },
+    }
+
+
+def compare(baseline, current):
+    """``[(name, metric, before, after, change %)]`` for scenarios in both reports"""
+    rows = []
+    for name, after in current['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if not before or not before.get('latency_ms') or not after.get('latency_ms'):
+            continue
+        pairs = [
+            ('p95 ms', before['latency_ms']['p95'], after['latency_ms']['p95']),
+            ('rps', before['throughput_rps'], after['throughput_rps']),
+        ]
+        if before.get('queries_per_request') and after.get('queries_per_request'):
+            pairs.append(('queries', before['queries_per_request']['mean'], after['queries_per_request']['mean']))
+        for metric, old, new in pairs:
+            change = (new - old) / old * 100 if old else None
+            rows.append((name, metric, old, new, change))
+    return rows
@@ -0,0 +1,122 @@
+"""
+Conversation context assembly for the chatbot.
+
+The prompt history for a session is the most recent turns that fit in
+``CHAT_CONTEXT_TOKEN_BUDGET``. Turns that fall out of the window can be
+folded into a short rolling summary (``CHAT_CONTEXT_SUMMARIZE``). The window
+is cached per session; on a cache hit only messages newer than the last one
+seen are fetched, an indexed range query on ``(session_id, created_at)``.
+Messages of the session still queued in ``write_behind`` are flushed first.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import write_behind
+from .models import ChatMessage
+
+SUMMARY_PREFIX = "Earlier in this conversation the student asked about: "
+
+# Rough size of a token for English/Spanish/Guarani text
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _cache_key(session_id):
+    digest = hashlib.sha1(session_id.encode('utf-8')).hexdigest()
+    return f'learning:chat-context:{digest}'
+
+
+def _empty_state():
+    return {'turns': [], 'summary': '', 'last_id': 0, 'last_created': None}
+
+
+def _summarize(summary, dropped_turns):
+    """Fold dropped turns into an extractive summary of the student's questions"""
+    topics = [summary] if summary else []
+    for turn in dropped_turns:
+        content = turn['content'].strip()
+        if turn['role'] == 'user' and content:
+            topics.append(content.splitlines()[0][:80])
+    summary = '; '.join(topic for topic in topics if topic)
+    limit = settings.CHAT_CONTEXT_SUMMARY_TOKENS * CHARS_PER_TOKEN
+    if len(summary) > limit:
+        summary = '…' + summary[-limit:]
+    return summary
+
+
+def _merge(state, rows):
+    """Append new ``ChatMessage`` rows to the window and trim it to the budget"""
+    turns = state['turns']
+    for row in rows:
+        if row.id <= state['last_id']:
+            continue
+        turns.append({
+            'role': row.role,
+            'content': row.message,
+            'tokens': estimate_tokens(row.message),
+        })
+        state['last_id'] = row.id
+        state['last_created'] = row.created_at
+
+    budget = settings.CHAT_CONTEXT_TOKEN_BUDGET
+    total = sum(turn['tokens'] for turn in turns)
+    dropped = []
+    while len(turns) > 1 and (total > budget or len(turns) > settings.CHAT_CONTEXT_MAX_MESSAGES):
+        turn = turns.pop(0)
+        total -= turn['tokens']
+        dropped.append(turn)
+
+    if dropped and settings.CHAT_CONTEXT_SUMMARIZE:
+        state['summary'] = _summarize(state['summary'], dropped)
+    return state
+
+
+def _new_rows_queryset(session_id, state):
+    queryset = ChatMessage.objects.filter(session_id=session_id)
+    if state['last_created'] is None:
+        # Cold start: only the newest messages can fit in the window
+        recent = queryset.order_by('-created_at', '-id')[:settings.CHAT_CONTEXT_MAX_MESSAGES]
+        return recent, True
+    return queryset.filter(created_at__gte=state['last_created']).order_by('created_at', 'id'), False
+
+
+def _as_messages(state, system_prompt):
+    messages = [{"role": "system", "content": system_prompt}]
+    if state['summary']:
+        messages.append({"role": "system", "content": SUMMARY_PREFIX + state['summary']})
+    messages.extend({"role": turn['role'], "content": turn['content']} for turn in state['turns'])
+    return messages
+
+
+def get_context(session_id, system_prompt):
+    """Return chat-completion messages for ``session_id``"""
+    if write_behind.pending(ChatMessage, session_id=session_id):
+        write_behind.flush()
+    key = _cache_key(session_id)
+    state = cache.get(key) or _empty_state()
+    queryset, newest_first = _new_rows_queryset(session_id, state)
+    rows = list(queryset)
+    if newest_first:
+        rows.reverse()
+    state = _merge(state, rows)
+    cache.set(key, state, settings.CHAT_CONTEXT_CACHE_TTL)
+    return _as_messages(state, system_prompt)
+
+
+async def aget_context(session_id, system_prompt):
+    if write_behind.pending(ChatMessage, session_id=session_id):
+        await write_behind.aflush()
+    key = _cache_key(session_id)
+    state = await cache.aget(key) or _empty_state()
+    queryset, newest_first = _new_rows_queryset(session_id, state)
+    rows = [row async for row in queryset]
+    if newest_first:
+        rows.reverse()
+    state = _merge(state, rows)
+    await cache.aset(key, state, settings.CHAT_CONTEXT_CACHE_TTL)
+    return _as_messages(state, system_prompt)
@@ -0,0 +1,106 @@
+"""
+Conditional GET support (ETag / Last-Modified) for read views.
+
+Validators are cheap to compute: for paginated API lists, the ids and
+``updated_at`` of the rows on the page plus the page links, which come from
+the page query itself; for other lists ``max(updated_at)`` (indexed) plus a
+row count, which catches deletions; for details the row's own
+``updated_at``. Views check them before serializing or rendering and answer
+``304 Not Modified`` when the client's copy is current.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+
+def make_etag(request, *parts):
+    """Strong ETag over the request URL, negotiated format and ``parts``"""
+    key = '|'.join([request.get_full_path(), request.META.get('HTTP_ACCEPT', '')] + [str(part) for part in parts])
+    return quote_etag(hashlib.sha1(key.encode('utf-8')).hexdigest()[:24])
+
+
+def queryset_validators(request, queryset, *extra):
+    """``(etag, last_modified)`` for a list of rows with an ``updated_at`` column"""
+    summary = queryset.order_by().aggregate(last_modified=Max('updated_at'), count=Count('pk'))
+    etag = make_etag(request, summary['last_modified'], summary['count'], *extra)
+    return etag, summary['last_modified']
+
+
+def page_validators(request, rows, *extra):
+    """
+    ETag for one page of rows with an ``updated_at`` column.
+
+    There is no Last-Modified: a row deleted from the page can leave its
+    newest ``updated_at`` unchanged, which only the ETag notices.
+    """
+    return make_etag(request, *[(row.pk, row.updated_at) for row in rows], *extra)
+
+
+def object_validators(request, obj, *extra):
+    """``(etag, last_modified)`` for a single row with an ``updated_at`` column"""
+    return make_etag(request, obj.pk, obj.updated_at, *extra), obj.updated_at
+
+
+def not_modified(request, etag, last_modified=None):
+    """Return a 304 (or 412) response if the client's validators match, else None"""
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+
+def set_validators(response, etag, last_modified=None, private=False):
+    """Attach validators and require revalidation on every use"""
+    if response.status_code != 200:
+        return response
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    if private:
+        patch_cache_control(response, private=True)
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Viewset mixin adding validators to ``list`` and ``retrieve``; ``list``
+    validates the page it fetched rather than aggregating the queryset.
+
+    ``get_object_response`` builds the 200 body for ``retrieve`` and can be
+    overridden (e.g. to serve a pre-rendered snapshot).
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            etag, last_modified = queryset_validators(request, queryset)
+        else:
+            # The links (and count, for page-number pagination) change with rows off the page
+            envelope = self.get_paginated_response([]).data
+            etag, last_modified = page_validators(
+                request, page, *[value for key, value in envelope.items() if key != 'results']
+            ), None
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+        if page is None:
+            response = Response(self.get_serializer(queryset, many=True).data)
+        else:
+            response = self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return set_validators(response, etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag, last_modified = object_validators(request, instance)
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+        return set_validators(self.get_object_response(instance), etag, last_modified)
+
+    def get_object_response(self, instance):
+        return Response(self.get_serializer(instance).data)
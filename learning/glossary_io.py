@@ -0,0 +1,269 @@
+"""
+Bulk glossary import and export in CSV and JSON Lines.
+
+Both directions stream: exports iterate the table in chunks and yield encoded
+lines, imports read one row at a time and upsert in batches, each batch in
+its own transaction, so memory stays flat regardless of file size.
+
+Rows are matched on ``id`` when given, otherwise on ``guarani_word``; matched
+rows are updated and the rest inserted, via ``bulk_create(update_conflicts=
+True)`` on the primary key. A column missing from the file (or a JSON key that
+is absent or null) leaves that field of an existing term unchanged; only an
+empty value clears it. Since bulk writes bypass model signals, each
+batch maintains the normalized search columns and the FTS mirror itself, and
+lessons using updated terms are invalidated per batch; the suggestion index
+and content totals are invalidated once at the end.
+"""
+import csv
+import json
+import time
+from dataclasses import dataclass, field
+
+from django.db import transaction
+
+from . import search, stats
+from .models import GlossaryTerm, LessonContent
+from .snapshots import invalidate_lessons
+from .suggest import suggestion_index
+
+FORMATS = ('csv', 'jsonl')
+CONTENT_TYPES = {'csv': 'text/csv; charset=utf-8', 'jsonl': 'application/x-ndjson'}
+
+# Columns read on import (``id`` is optional) and written on export
+IMPORT_FIELDS = [
+    'guarani_word', 'spanish_translation', 'english_translation', 'pronunciation',
+    'audio_file', 'example_sentence_guarani', 'example_sentence_spanish',
+    'category', 'difficulty_level',
+]
+EXPORT_FIELDS = ['id'] + IMPORT_FIELDS + ['created_at', 'updated_at']
+REQUIRED_FIELDS = ('guarani_word', 'spanish_translation')
+# Written on every update besides the imported columns; created_at is kept and
+# updated_at is refreshed by auto_now
+DERIVED_FIELDS = ['normalized_word', 'search_text', 'updated_at']
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+
+def guess_format(name, default='csv'):
+    name = (name or '').lower()
+    if name.endswith(('.jsonl', '.ndjson', '.json')):
+        return 'jsonl'
+    if name.endswith('.csv'):
+        return 'csv'
+    return default
+
+
+# Export
+
+class _Echo:
+    """File-like object whose ``write`` returns the value, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def export_lines(queryset=None, fmt='csv', chunk_size=2000):
+    """Yield the glossary as CSV or JSON Lines text, one row at a time"""
+    if fmt not in FORMATS:
+        raise ValueError(f'Unsupported format: {fmt}')
+    queryset = GlossaryTerm.objects.all() if queryset is None else queryset
+    rows = queryset.order_by('id').values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+
+    if fmt == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(EXPORT_FIELDS)
+        for row in rows:
+            yield writer.writerow(['' if value is None else value for value in row])
+    else:
+        for row in rows:
+            record = dict(zip(EXPORT_FIELDS, row))
+            record['created_at'] = record['created_at'].isoformat()
+            record['updated_at'] = record['updated_at'].isoformat()
+            yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+# Import
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    updated: int = 0
+    errors: list = field(default_factory=list)
+    error_count: int = 0
+    started: float = field(default_factory=time.monotonic)
+    finished: float = None
+
+    @property
+    def rows(self):
+        return self.created + self.updated
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    def add_error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'error': message})
+
+    def as_dict(self):
+        return {
+            'created': self.created,
+            'updated': self.updated,
+            'errors': self.errors,
+            'error_count': self.error_count,
+            'seconds': round(self.elapsed, 3),
+            'rows_per_second': round(self.rows_per_second, 1),
+        }
+
+
+def read_rows(stream, fmt='csv'):
+    """Yield ``(line_number, dict)`` from a text stream"""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == 'jsonl':
+        for line_number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                yield line_number, exc
+                continue
+            yield line_number, row if isinstance(row, dict) else ValueError('Expected a JSON object')
+    else:
+        raise ValueError(f'Unsupported format: {fmt}')
+
+
+_MAX_LENGTHS = {
+    name: GlossaryTerm._meta.get_field(name).max_length
+    for name in IMPORT_FIELDS
+    if GlossaryTerm._meta.get_field(name).max_length
+}
+_DIFFICULTY_LEVELS = {value for value, _ in GlossaryTerm._meta.get_field('difficulty_level').choices}
+
+
+def clean_row(row):
+    """
+    Return ``(values, pk)`` for a raw row, raising ValueError when invalid.
+
+    ``values`` holds only the columns the row has a value for (csv.DictReader
+    gives None for cells missing from short rows).
+    """
+    if isinstance(row, Exception):
+        raise ValueError(str(row))
+    values = {
+        name: str(row[name]).strip()
+        for name in IMPORT_FIELDS if row.get(name) is not None
+    }
+    for name in REQUIRED_FIELDS:
+        if not values.get(name):
+            raise ValueError(f'{name} is required')
+    for name, max_length in _MAX_LENGTHS.items():
+        if len(values.get(name, '')) > max_length:
+            raise ValueError(f'{name} is longer than {max_length} characters')
+    if values.get('difficulty_level') == '':
+        values['difficulty_level'] = 'beginner'
+    elif values.get('difficulty_level', 'beginner') not in _DIFFICULTY_LEVELS:
+        raise ValueError(f"unknown difficulty_level {values['difficulty_level']!r}")
+
+    pk = row.get('id')
+    if pk in (None, ''):
+        return values, None
+    try:
+        return values, int(pk)
+    except (TypeError, ValueError):
+        raise ValueError(f'invalid id {pk!r}')
+
+
+def _write_batch(batch, using, result):
+    """Upsert one batch and mirror it into the search index"""
+    with transaction.atomic(using=using):
+        # Match rows without an id on guarani_word, and ids on existing rows
+        words = [values['guarani_word'] for values, pk in batch if pk is None]
+        ids = [pk for _, pk in batch if pk is not None]
+        existing = GlossaryTerm.objects.using(using)
+        by_id = existing.in_bulk(ids) if ids else {}
+        by_word = {term.guarani_word: term for term in existing.filter(guarani_word__in=words)} if words else {}
+
+        terms = {}
+        for values, pk in batch:
+            match = by_id.get(pk) if pk is not None else by_word.get(values['guarani_word'])
+            if match is not None:
+                pk = match.pk
+            key = pk if pk is not None else ('new', values['guarani_word'])
+            # Columns the row lacks keep the stored value (or an earlier row's, so
+            # later rows win), in the search text as well
+            term = terms.get(key) or match or GlossaryTerm(pk=pk)
+            for name, value in values.items():
+                setattr(term, name, value)
+            term.normalized_word = search.normalize_text(term.guarani_word)
+            term.search_text = search.build_search_text(term)
+            terms[key] = term
+
+        known_ids = set(by_id) | {term.pk for term in by_word.values()}
+        updated_ids = [pk for pk in terms if pk in known_ids]
+        present = set().union(*(values for values, _ in batch))
+        GlossaryTerm.objects.using(using).bulk_create(
+            terms.values(),
+            update_conflicts=True,
+            unique_fields=['id'],
+            update_fields=[name for name in IMPORT_FIELDS if name in present] + DERIVED_FIELDS,
+        )
+        search.index_terms(((term.pk, term.search_text) for term in terms.values()), using=using)
+
+    if updated_ids:
+        invalidate_lessons(
+            LessonContent.objects.using(using)
+            .filter(vocabulary_terms__in=updated_ids)
+            .values_list('lesson_id', flat=True)
+        )
+    result.updated += len(updated_ids)
+    result.created += len(terms) - len(updated_ids)
+
+
+def import_rows(rows, batch_size=DEFAULT_BATCH_SIZE, using='default', progress=None):
+    """
+    Upsert ``(line_number, row)`` pairs in batches of ``batch_size``.
+
+    Invalid rows are skipped and reported in the result. ``progress`` is
+    called with the running ImportResult after every batch.
+    """
+    result = ImportResult()
+    batch = []
+
+    def flush():
+        _write_batch(batch, using, result)
+        batch.clear()
+        if progress is not None:
+            progress(result)
+
+    for line_number, row in rows:
+        try:
+            batch.append(clean_row(row))
+        except ValueError as exc:
+            result.add_error(line_number, str(exc))
+            continue
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+
+    if result.rows:
+        suggestion_index.invalidate()
+        stats.invalidate_content_totals()
+    result.finished = time.monotonic()
+    return result
+
+
+def import_stream(stream, fmt='csv', **kwargs):
+    """Import a text stream of CSV or JSON Lines"""
+    return import_rows(read_rows(stream, fmt), **kwargs)
@@ -0,0 +1,153 @@
+"""
+Batch grading for exercise submissions.
+
+All questions of an exercise are loaded in one query, answers are graded in
+memory and the resulting attempts, progress update and review card schedule
+are written in a single transaction. The attempts themselves go through
+``write_behind``, which inserts them after the commit when it is enabled.
+"""
+import json
+import re
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import review, stats, write_behind
+from .models import ExerciseAttempt, ReviewCard, UserProgress
+
+TRUE_ANSWERS = {'true', 't', 'yes', 'y', '1', 'verdadero', 'v', 'si', 'sí'}
+FALSE_ANSWERS = {'false', 'f', 'no', 'n', '0', 'falso'}
+
+_PAIR_SEPARATOR_RE = re.compile(r'[,;\n]')
+_PAIR_DELIMITER_RE = re.compile(r'\s*(?:->|=>|[-:=])\s*')
+
+
+def _normalize_words(value):
+    return ' '.join(str(value).lower().split())
+
+
+def _normalize_true_false(value):
+    text = _normalize_words(value)
+    if text in TRUE_ANSWERS:
+        return 'true'
+    if text in FALSE_ANSWERS:
+        return 'false'
+    return text
+
+
+def _normalize_matching(value):
+    """
+    Reduce a matching answer to an order-independent set of pairs.
+
+    Accepts a mapping (``{"a": "1"}``), a list of pairs or a string such as
+    ``"a-1, b-2"``.
+    """
+    if isinstance(value, dict):
+        pairs = value.items()
+    elif isinstance(value, (list, tuple)):
+        pairs = [tuple(pair) for pair in value if isinstance(pair, (list, tuple)) and len(pair) == 2]
+    else:
+        pairs = []
+        for chunk in _PAIR_SEPARATOR_RE.split(str(value)):
+            parts = _PAIR_DELIMITER_RE.split(chunk.strip(), maxsplit=1)
+            if len(parts) == 2:
+                pairs.append(parts)
+    return frozenset((_normalize_words(left), _normalize_words(right)) for left, right in pairs)
+
+
+NORMALIZERS = {
+    'multiple_choice': _normalize_words,
+    'fill_blank': _normalize_words,
+    'true_false': _normalize_true_false,
+    'matching': _normalize_matching,
+}
+
+
+def normalize_answer(question_type, value):
+    return NORMALIZERS.get(question_type, _normalize_words)(value)
+
+
+def is_correct_answer(question, user_answer):
+    return normalize_answer(question.question_type, user_answer) == \
+        normalize_answer(question.question_type, question.correct_answer)
+
+
+def _stored_answer(user_answer):
+    if isinstance(user_answer, str):
+        return user_answer
+    return json.dumps(user_answer, ensure_ascii=False)
+
+
+def grade_submission(exercise, answers, user_id):
+    """Grade a list of ``{'question_id', 'answer'}`` dicts and persist the attempts"""
+    questions = {question.id: question for question in exercise.questions.all()}
+
+    results = []
+    attempts = []
+    outcomes = {}
+    total_points = 0
+    earned_points = 0
+
+    for answer_data in answers:
+        question_id = answer_data.get('question_id')
+        user_answer = answer_data.get('answer', '')
+
+        try:
+            question = questions[int(question_id)]
+        except (KeyError, TypeError, ValueError):
+            continue
+
+        is_correct = is_correct_answer(question, user_answer)
+        points = question.points if is_correct else 0
+        outcomes[question.id] = is_correct
+
+        attempts.append(ExerciseAttempt(
+            user_id=user_id,
+            exercise=exercise,
+            question=question,
+            user_answer=_stored_answer(user_answer)[:500],
+            is_correct=is_correct,
+            points_earned=points
+        ))
+
+        results.append({
+            'question_id': question_id,
+            'is_correct': is_correct,
+            'correct_answer': question.correct_answer,
+            'explanation': question.explanation,
+            'points_earned': points,
+            'max_points': question.points
+        })
+
+        total_points += question.points
+        earned_points += points
+
+    if attempts:
+        with transaction.atomic():
+            progress, _ = UserProgress.objects.get_or_create(user_id=user_id, lesson_id=exercise.lesson_id)
+            # Serializes this user's submissions for the lesson, so the first-attempt
+            # check below and the review cards that answer it are written atomically
+            progress = UserProgress.objects.select_for_update().get(pk=progress.pk)
+            # Attempts may still be queued in write_behind; the cards are written here
+            first_attempt = not ReviewCard.objects.filter(user_id=user_id, question__exercise=exercise).exists()
+            write_behind.add(attempts)
+            UserProgress.objects.filter(pk=progress.pk).update(
+                score=F('score') + earned_points,
+                total_points=F('total_points') + total_points,
+                last_accessed=timezone.now()
+            )
+            stats.progress_changed(
+                user_id,
+                (progress.completed, progress.score, progress.total_points),
+                (progress.completed, progress.score + earned_points, progress.total_points + total_points)
+            )
+            stats.record_activity(user_id, new_exercises=int(first_attempt))
+            review.record_answers(user_id, outcomes)
+
+    return {
+        'results': results,
+        'total_points': total_points,
+        'earned_points': earned_points,
+        'percentage': round((earned_points / total_points * 100) if total_points > 0 else 0, 2)
+    }
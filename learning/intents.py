@@ -0,0 +1,125 @@
+"""
+Offline intent router for the chatbot.
+
+Translation ("how do you say thank you", "¿cómo se dice gracias?") and
+definition ("what does mba'éichapa mean", "¿qué significa aguyje?") questions
+are answered straight from the glossary using the normalized search columns,
+without an LLM call. Anything else returns None and goes to the LLM.
+"""
+import re
+
+from .models import GlossaryTerm
+from .search import search_glossary, tokenize
+
+_LEADING_WORDS_RE = re.compile(r'^(?:the word|the phrase|la palabra|la frase|el termino)\s+')
+_TRANSLATION_SPLIT_RE = re.compile(r'\s*[,;/]\s*')
+
+# (intent, language, pattern) matched against the tokenized message
+PATTERNS = [
+    ('define', 'en', r'^what does (?P<term>.+?) mean(?: in (?:english|spanish))?$'),
+    ('define', 'en', r'^what is the meaning of (?P<term>.+)$'),
+    ('define', 'en', r'^(?:meaning of|define) (?P<term>.+)$'),
+    ('define', 'es', r'^que (?:significa|quiere decir) (?P<term>.+?)(?: en (?:espanol|castellano|ingles))?$'),
+    ('define', 'es', r'^significado de (?P<term>.+)$'),
+    ('translate', 'en', r'^how (?:do (?:you|i)|to|would you|can i) say (?P<term>.+?)(?: in guarani)?$'),
+    ('translate', 'en', r'^what is (?P<term>.+?) in guarani$'),
+    ('translate', 'en', r'^translate (?P<term>.+?)(?: (?:in|to|into) guarani)?$'),
+    ('translate', 'es', r'^como (?:se dice|digo|decir) (?P<term>.+?)(?: en guarani)?$'),
+    ('translate', 'es', r'^traduci[rc] (?P<term>.+?)(?: al guarani)?$'),
+    ('translate', 'es', r'^(?P<term>.+?) en guarani$'),
+    ('translate', 'en', r'^(?P<term>.+?) in guarani$'),
+]
+PATTERNS = [(intent, language, re.compile(pattern)) for intent, language, pattern in PATTERNS]
+
+
+def detect(message):
+    """Return ``(intent, language, phrase)`` for a vocabulary question, or None"""
+    text = ' '.join(tokenize(message))
+    for intent, language, pattern in PATTERNS:
+        match = pattern.match(text)
+        if match:
+            phrase = _LEADING_WORDS_RE.sub('', match.group('term')).strip()
+            if phrase:
+                return intent, language, phrase
+    return None
+
+
+def _translation_forms(term):
+    """Map each normalized translation of ``term`` to its original spelling"""
+    forms = {}
+    for value in (term.spanish_translation, term.english_translation):
+        for part in _TRANSLATION_SPLIT_RE.split(value or ''):
+            normalized = ' '.join(tokenize(part))
+            if normalized:
+                forms.setdefault(normalized, part.strip())
+    return forms
+
+
+def find_by_guarani(phrase):
+    return GlossaryTerm.objects.filter(normalized_word=phrase).first()
+
+
+def find_by_translation(phrase):
+    """Return ``(term, translation)`` for a term translated as ``phrase``"""
+    for term in search_glossary(GlossaryTerm.objects.all(), phrase)[:20]:
+        translation = _translation_forms(term).get(phrase)
+        if translation is not None:
+            return term, translation
+    return None, None
+
+
+def _details(term, language):
+    lines = []
+    if term.pronunciation:
+        label = 'Pronunciation' if language == 'en' else 'Pronunciación'
+        lines.append(f"{label}: {term.pronunciation}")
+    if term.example_sentence_guarani:
+        example = term.example_sentence_guarani
+        if term.example_sentence_spanish:
+            example = f"{example} — {term.example_sentence_spanish}"
+        label = 'Example' if language == 'en' else 'Ejemplo'
+        lines.append(f"{label}: {example}")
+    return lines
+
+
+def _format_definition(term, language):
+    if language == 'en':
+        meaning = term.english_translation or term.spanish_translation
+        line = f"“{term.guarani_word}” means “{meaning}”"
+        if term.english_translation and term.spanish_translation:
+            line += f" (Spanish: “{term.spanish_translation}”)"
+    else:
+        line = f"“{term.guarani_word}” significa “{term.spanish_translation}”"
+    return '\n'.join([line + '.'] + _details(term, language))
+
+
+def _format_translation(term, translation, language):
+    if language == 'en':
+        line = f"“{translation}” in Guarani is “{term.guarani_word}”."
+    else:
+        line = f"“{translation}” en guaraní se dice “{term.guarani_word}”."
+    return '\n'.join([line] + _details(term, language))
+
+
+def answer(message):
+    """Answer a vocabulary question from the glossary, or return None"""
+    detected = detect(message)
+    if detected is None:
+        return None
+    intent, language, phrase = detected
+
+    if intent == 'define':
+        term = find_by_guarani(phrase)
+        if term is not None:
+            return _format_definition(term, language)
+        term, translation = find_by_translation(phrase)
+        if term is not None:
+            return _format_translation(term, translation, language)
+    else:
+        term, translation = find_by_translation(phrase)
+        if term is not None:
+            return _format_translation(term, translation, language)
+        term = find_by_guarani(phrase)
+        if term is not None:
+            return _format_definition(term, language)
+    return None
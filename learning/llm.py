@@ -0,0 +1,164 @@
+"""
+Shared plumbing for the Guarani teacher chatbot: prompt assembly and
+process-wide OpenAI-compatible clients. ``OPENAI_BASE_URL`` can point the
+clients at any compatible server (including a local fake one for testing).
+
+The async client keeps a bounded connection pool and is paired with a
+semaphore capping in-flight completions, so one ASGI worker can hold many
+chat sessions without opening a connection per message.
+"""
+import asyncio
+import threading
+import weakref
+
+from django.conf import settings
+
+from . import chat_context
+
+SYSTEM_PROMPT = (
+    "You are a helpful and patient Guarani language teacher. You help students learn Guarani "
+    "(the indigenous language of Paraguay) through conversation, grammar explanations, vocabulary "
+    "practice, and cultural insights. Be encouraging, provide examples, and correct mistakes gently. "
+    "You can respond in Spanish or English when needed, but encourage Guarani practice."
+)
+
+OFFLINE_RESPONSE = (
+    "Mba'éichapa! I'm your Guarani language teacher. I can help you practice Guarani, answer "
+    "questions about grammar, vocabulary, and culture. What would you like to learn today?"
+)
+ERROR_RESPONSE = (
+    "Mba'éichapa! I'm here to help you learn Guarani. Ask me anything about the language, "
+    "grammar, vocabulary, or culture!"
+)
+
+_client = None
+_client_lock = threading.Lock()
+# (client, limiter) per running event loop
+_async_states = weakref.WeakKeyDictionary()
+
+
+def is_configured():
+    return bool(settings.OPENAI_API_KEY)
+
+
+def build_messages(session_id):
+    """System prompt followed by the session's windowed conversation history"""
+    return chat_context.get_context(session_id, SYSTEM_PROMPT)
+
+
+async def abuild_messages(session_id):
+    return await chat_context.aget_context(session_id, SYSTEM_PROMPT)
+
+
+def _http_limits():
+    import httpx
+
+    return httpx.Limits(
+        max_connections=settings.OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.OPENAI_MAX_CONNECTIONS,
+    )
+
+
+def _http_timeout():
+    import httpx
+
+    return httpx.Timeout(settings.OPENAI_TIMEOUT, connect=settings.OPENAI_CONNECT_TIMEOUT)
+
+
+def get_client():
+    """Return the process-wide synchronous client, creating it on first use"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                import httpx
+                from openai import OpenAI
+
+                _client = OpenAI(
+                    api_key=settings.OPENAI_API_KEY,
+                    base_url=settings.OPENAI_BASE_URL or None,
+                    timeout=_http_timeout(),
+                    http_client=httpx.Client(limits=_http_limits(), timeout=_http_timeout()),
+                )
+    return _client
+
+
+def _get_async_state():
+    """
+    Return ``(client, limiter)`` for the running event loop.
+
+    Under ASGI there is one loop per process, so the pool is shared by every
+    request. Async views served through WSGI run each request on a fresh loop
+    and httpx connections cannot cross loops, so each of those loops gets its
+    own pair, closed with the loop; WSGI deployments should prefer the sync
+    chat views, whose client is pooled across requests.
+    """
+    loop = asyncio.get_running_loop()
+    state = _async_states.get(loop)
+    if state is None:
+        import httpx
+        from openai import AsyncOpenAI
+
+        client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL or None,
+            timeout=_http_timeout(),
+            http_client=httpx.AsyncClient(limits=_http_limits(), timeout=_http_timeout()),
+        )
+        state = _async_states[loop] = (client, asyncio.Semaphore(settings.OPENAI_MAX_CONCURRENCY))
+        loop.create_task(_close_with_loop(client))
+    return state
+
+
+async def _close_with_loop(client):
+    """Close ``client`` when its loop shuts down"""
+    try:
+        # asyncio.run(), and so async_to_sync(), cancels pending tasks before closing the loop
+        await asyncio.Event().wait()
+    finally:
+        await client.close()
+
+
+def _completion_kwargs(messages):
+    return {
+        'model': settings.OPENAI_MODEL,
+        'messages': messages,
+        'max_tokens': 300,
+        'temperature': 0.7,
+    }
+
+
+def complete(messages):
+    """Return the full assistant reply for ``messages``"""
+    response = get_client().chat.completions.create(**_completion_kwargs(messages))
+    return response.choices[0].message.content
+
+
+async def acomplete(messages):
+    client, limiter = _get_async_state()
+    async with limiter:
+        response = await client.chat.completions.create(**_completion_kwargs(messages))
+    return response.choices[0].message.content
+
+
+async def astream(messages):
+    client, limiter = _get_async_state()
+    async with limiter:
+        chunks = await client.chat.completions.create(stream=True, **_completion_kwargs(messages))
+        try:
+            async for chunk in chunks:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await chunks.close()
+
+
+def stream(messages):
+    """Yield the assistant reply for ``messages`` as text deltas"""
+    chunks = get_client().chat.completions.create(stream=True, **_completion_kwargs(messages))
+    try:
+        for chunk in chunks:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    finally:
+        chunks.close()
@@ -0,0 +1,75 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from learning import llm
+from learning.benchmark import suite
+
+
+class Command(BaseCommand):
+    help = 'Benchmark every endpoint and report throughput, latency percentiles and queries per request as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50, help='Measured requests per scenario')
+        parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests per scenario')
+        parser.add_argument('--concurrency', type=int, default=1, help='Parallel clients')
+        parser.add_argument('--url', help='Base URL of a running server (default: in-process test client)')
+        parser.add_argument('--only', action='append', help='Run scenarios whose name starts with this (repeatable)')
+        parser.add_argument('--exclude', action='append', help='Skip scenarios whose name starts with this (repeatable)')
+        parser.add_argument('--include-external', action='store_true',
+                            help='Run chat scenarios even when they would call the configured LLM')
+        parser.add_argument('--output', help='Write the JSON report to this file (default: stdout)')
+        parser.add_argument('--compare', help='Earlier JSON report to print changes against')
+
+    def handle(self, *args, **options):
+        try:
+            scenarios = suite.build_scenarios()
+        except LookupError as exc:
+            raise CommandError(str(exc))
+
+        skipped = []
+        if llm.is_configured() and not options['include_external']:
+            skipped += [scenario for scenario in scenarios if scenario.external]
+        if options['url']:
+            skipped += [scenario for scenario in scenarios if scenario.csrf]
+        if options['only']:
+            skipped += [scenario for scenario in scenarios if not scenario.name.startswith(tuple(options['only']))]
+        if options['exclude']:
+            skipped += [scenario for scenario in scenarios if scenario.name.startswith(tuple(options['exclude']))]
+        scenarios = [scenario for scenario in scenarios if scenario not in skipped]
+        if not scenarios:
+            raise CommandError('No scenarios left to run')
+
+        def progress(scenario, result):
+            latency = result['latency_ms'] or {}
+            queries = result['queries_per_request']
+            self.stderr.write(
+                f"{scenario.name:<28} {result['throughput_rps'] or 0:>8.1f} rps "
+                f"p50 {latency.get('p50', 0):>8.2f} p95 {latency.get('p95', 0):>8.2f} p99 {latency.get('p99', 0):>8.2f} ms "
+                f"queries {queries['mean'] if queries else '-':>6} errors {result['errors']}"
+            )
+
+        report = suite.run(
+            scenarios,
+            iterations=options['iterations'],
+            warmup=options['warmup'],
+            concurrency=options['concurrency'],
+            base_url=options['url'],
+            progress=progress if options['verbosity'] >= 1 else None,
+        )
+        report['meta']['skipped'] = sorted({scenario.name for scenario in skipped})
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                handle.write(output + '\n')
+            self.stderr.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as handle:
+                baseline = json.load(handle)
+            self.stderr.write(self.style.MIGRATE_HEADING(f"Compared with {baseline['meta'].get('commit') or options['compare']}"))
+            for name, metric, old, new, change in suite.compare(baseline, report):
+                delta = f'{change:+.1f}%' if change is not None else 'n/a'
+                self.stderr.write(f'{name:<28} {metric:<8} {old:>10} -> {new:<10} {delta}')
@@ -0,0 +1,32 @@
+from dataclasses import fields
+
+from django.core.management.base import BaseCommand
+
+from learning.benchmark import data
+
+
+class Command(BaseCommand):
+    help = 'Bulk-insert a synthetic data set for benchmarks (or --clear it)'
+
+    def add_arguments(self, parser):
+        for spec_field in fields(data.DataSpec):
+            name = spec_field.name.replace('_', '-')
+            parser.add_argument(f'--{name}', type=int, default=spec_field.default,
+                                help=f'Default: {spec_field.default}')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--clear', action='store_true', help='Delete previously generated data and exit')
+
+    def handle(self, *args, **options):
+        def progress(message):
+            if options['verbosity'] >= 1:
+                self.stdout.write(f'  {message}')
+
+        if options['clear']:
+            data.clear(progress=progress)
+            self.stdout.write(self.style.SUCCESS('Removed benchmark data'))
+            return
+
+        spec = data.DataSpec(**{spec_field.name: options[spec_field.name] for spec_field in fields(data.DataSpec)})
+        counts = data.generate(spec, batch_size=options['batch_size'], progress=progress)
+        summary = ', '.join(f'{count} {name}' for name, count in counts.items() if name != 'seed')
+        self.stdout.write(self.style.SUCCESS(f'Created {summary}'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from learning import packs
+from learning.models import Lesson
+
+
+class Command(BaseCommand):
+    help = 'Build offline lesson packs (snapshot, glossary and media in one zip per lesson)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lesson', type=int, action='append', dest='lesson_ids',
+                            help='Only build this lesson id (repeatable)')
+
+    def handle(self, *args, **options):
+        lessons = Lesson.objects.filter(is_published=True).order_by('order', 'id')
+        if options['lesson_ids']:
+            lessons = lessons.filter(pk__in=options['lesson_ids'])
+
+        for lesson in lessons:
+            path, key = packs.get_pack(lesson)
+            size_kb = path.stat().st_size / 1024
+            self.stdout.write(f'{lesson.pk:>5}  {path.name}  {size_kb:.1f} KB')
+        self.stdout.write(self.style.SUCCESS(f'Built packs for {lessons.count()} lessons'))
@@ -0,0 +1,43 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from learning import glossary_io
+from learning.models import GlossaryTerm
+
+
+class Command(BaseCommand):
+    help = 'Stream the glossary to a CSV or JSON Lines file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-', help="Output file ('-' writes stdout, the default)")
+        parser.add_argument('--format', choices=glossary_io.FORMATS,
+                            help='Output format (default: from the file extension, else csv)')
+        parser.add_argument('--database', default='default', help='Database alias to export from')
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or glossary_io.guess_format(options['path'])
+        lines = glossary_io.export_lines(GlossaryTerm.objects.using(options['database']), fmt)
+
+        started = time.monotonic()
+        if options['path'] == '-':
+            self._write(lines, sys.stdout)
+        else:
+            with open(options['path'], 'w', encoding='utf-8', newline='') as stream:
+                count = self._write(lines, stream)
+            if fmt == 'csv':
+                count -= 1  # header row
+            elapsed = time.monotonic() - started
+            rate = count / elapsed if elapsed > 0 else 0
+            self.stdout.write(self.style.SUCCESS(
+                f'Exported {count} terms to {options["path"]} in {elapsed:.2f}s, {rate:.0f} rows/s'
+            ))
+
+    @staticmethod
+    def _write(lines, stream):
+        count = 0
+        for line in lines:
+            stream.write(line)
+            count += 1
+        return count
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from learning import thumbnails
+from learning.models import Lesson, LessonContent, Question
+from learning.snapshots import invalidate_lessons
+
+
+class Command(BaseCommand):
+    help = 'Create WebP/JPEG renditions for every lesson, content block and question image'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Re-create renditions that already exist')
+
+    def handle(self, *args, **options):
+        # (image name, owning lesson id) for every stored image
+        images = [
+            Lesson.objects.values_list('cover_image', 'pk'),
+            LessonContent.objects.values_list('image_file', 'lesson_id'),
+            Question.objects.values_list('image_file', 'exercise__lesson_id'),
+        ]
+        written = 0
+        touched_lessons = set()
+        for rows in images:
+            for name, lesson_id in rows.iterator():
+                if not name:
+                    continue
+                created = thumbnails.generate(name, force=options['force'])
+                if created:
+                    written += len(created)
+                    touched_lessons.add(lesson_id)
+                    self.stdout.write(f'  {name}: {len(created)} renditions')
+        invalidate_lessons(touched_lessons)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} renditions'))
@@ -0,0 +1,43 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from learning import glossary_io
+
+
+class Command(BaseCommand):
+    help = 'Bulk upsert glossary terms from a CSV or JSON Lines file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import ('-' reads stdin)")
+        parser.add_argument('--format', choices=glossary_io.FORMATS,
+                            help='Input format (default: from the file extension, else csv)')
+        parser.add_argument('--batch-size', type=int, default=glossary_io.DEFAULT_BATCH_SIZE,
+                            help='Rows per upsert transaction')
+        parser.add_argument('--database', default='default', help='Database alias to import into')
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or glossary_io.guess_format(options['path'])
+
+        def progress(result):
+            if options['verbosity'] >= 2:
+                self.stdout.write(f'{result.rows} rows, {result.rows_per_second:.0f} rows/s')
+
+        kwargs = {'batch_size': options['batch_size'], 'using': options['database'], 'progress': progress}
+        try:
+            if options['path'] == '-':
+                result = glossary_io.import_stream(sys.stdin, fmt, **kwargs)
+            else:
+                with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+                    result = glossary_io.import_stream(stream, fmt, **kwargs)
+        except OSError as exc:
+            raise CommandError(exc)
+
+        for error in result.errors:
+            self.stderr.write(f"line {error['line']}: {error['error']}")
+        if result.error_count > len(result.errors):
+            self.stderr.write(f'... {result.error_count - len(result.errors)} more errors')
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {result.rows} terms ({result.created} created, {result.updated} updated, '
+            f'{result.error_count} skipped) in {result.elapsed:.2f}s, {result.rows_per_second:.0f} rows/s'
+        ))
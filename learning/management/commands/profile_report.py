@@ -0,0 +1,56 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from guarani_app import profiling
+
+
+class Command(BaseCommand):
+    help = 'Summarize sampled request profiles: top endpoints by p95 time and by queries per request'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=10, help='Endpoints per table')
+        parser.add_argument('--min-count', type=int, default=1, help='Skip endpoints with fewer samples')
+        parser.add_argument('--clear', action='store_true', help='Delete the collected samples')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            try:
+                os.remove(settings.PROFILER_LOG)
+            except FileNotFoundError:
+                pass
+            self.stdout.write(self.style.SUCCESS(f'Cleared {settings.PROFILER_LOG}'))
+            return
+
+        samples = profiling.load_samples()
+        if not samples:
+            self.stdout.write(f'No samples in {settings.PROFILER_LOG} (is PROFILER enabled?)')
+            return
+        rows = [row for row in profiling.summarize(samples) if row['count'] >= options['min_count']]
+        limit = options['limit']
+        self.stdout.write(f'{len(samples)} samples, {len(rows)} endpoints\n')
+
+        header = f"{'endpoint':<50} {'n':>6} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'db ms':>7} {'tpl ms':>7} {'q avg':>6} {'q p95':>6} {'n+1':>5}"
+
+        def table(title, key):
+            self.stdout.write(self.style.MIGRATE_HEADING(title))
+            self.stdout.write(header)
+            for row in sorted(rows, key=key, reverse=True)[:limit]:
+                self.stdout.write(
+                    f"{row['endpoint'][:50]:<50} {row['count']:>6} {row['p50']:>8.1f} {row['p95']:>8.1f} "
+                    f"{row['max']:>8.1f} {row['db_ms']:>7.1f} {row['template_ms']:>7.1f} "
+                    f"{row['queries']:>6.1f} {row['queries_p95']:>6} {row['n_plus_one']:>5}"
+                )
+            self.stdout.write('')
+
+        table('Slowest endpoints (p95)', lambda row: row['p95'])
+        table('Most queries per request', lambda row: row['queries'])
+
+        duplicates = profiling.duplicate_signatures(samples)
+        if duplicates:
+            self.stdout.write(self.style.MIGRATE_HEADING('Repeated queries (possible N+1)'))
+            ranked = sorted(duplicates.items(), key=lambda item: (item[1][0], item[1][1]), reverse=True)
+            for (name, key), (requests, worst) in ranked[:limit]:
+                self.stdout.write(f'{name}: {requests} requests, up to {worst}x')
+                self.stdout.write(f'    {key}')
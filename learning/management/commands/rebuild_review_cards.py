@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from learning import review
+
+
+class Command(BaseCommand):
+    help = 'Recreate spaced-repetition review cards from exercise attempt and lesson progress history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids',
+                            help='Only rebuild this user id (repeatable)')
+
+    def handle(self, *args, **options):
+        count = review.rebuild(user_ids=options['user_ids'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} review cards'))
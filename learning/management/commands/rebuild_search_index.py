@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from learning import search
+
+
+class Command(BaseCommand):
+    help = 'Recompute normalized glossary search fields and rebuild the search index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='Database alias to rebuild')
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        count = search.rebuild_index(using=options['database'], batch_size=options['batch_size'])
+        backend = 'FTS5' if search.fts_available(options['database']) else 'normalized column'
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} glossary terms ({backend})'))
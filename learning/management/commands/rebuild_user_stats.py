@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from learning import stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute materialized per-user learning stats from progress and attempt history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids',
+                            help='Only rebuild this user id (repeatable)')
+
+    def handle(self, *args, **options):
+        count = stats.rebuild(user_ids=options['user_ids'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt stats for {count} users'))
@@ -0,0 +1,37 @@
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from guarani_app.routers import REPLICA_DB_ALIAS
+
+
+class Command(BaseCommand):
+    help = 'Copy the primary SQLite database into the replica file (local primary/replica setups)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--every', type=float, help='Keep copying every N seconds (simulates replication lag)')
+
+    def handle(self, *args, **options):
+        if REPLICA_DB_ALIAS not in connections.settings:
+            raise CommandError('No replica database: set DATABASE_REPLICA_NAME')
+        primary, replica = connections[DEFAULT_DB_ALIAS], connections[REPLICA_DB_ALIAS]
+        if primary.vendor != 'sqlite' or replica.vendor != 'sqlite':
+            raise CommandError('Only SQLite replicas are copied here; use the database\'s own replication')
+
+        while True:
+            started = time.monotonic()
+            # The online backup API copies a consistent snapshot while both files are in use
+            source = sqlite3.connect(primary.settings_dict['NAME'])
+            target = sqlite3.connect(replica.settings_dict['NAME'])
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+                source.close()
+            self.stdout.write(f'Copied {primary.settings_dict["NAME"]} -> {replica.settings_dict["NAME"]} '
+                              f'in {(time.monotonic() - started) * 1000:.0f} ms')
+            if not options['every']:
+                break
+            time.sleep(options['every'])
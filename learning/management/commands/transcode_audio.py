@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from learning import audio
+from learning.models import GlossaryTerm, LessonContent, Question
+
+
+class Command(BaseCommand):
+    help = 'Create low-bitrate variants for every uploaded audio clip'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Re-create variants that already exist')
+
+    def handle(self, *args, **options):
+        names = set()
+        for model in (GlossaryTerm, LessonContent, Question):
+            names.update(model.objects.exclude(audio_file='').exclude(audio_file__isnull=True)
+                         .values_list('audio_file', flat=True))
+
+        backend = 'ffmpeg' if audio.ffmpeg_binary() else 'pure-Python WAV fallback'
+        self.stdout.write(f'Transcoding {len(names)} clips with {backend}')
+        written = 0
+        for name in sorted(names):
+            created = audio.transcode(name, force=options['force'])
+            written += len(created)
+            for variant in created:
+                self.stdout.write(f'  {name} -> {variant}')
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} variants'))
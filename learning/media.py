@@ -0,0 +1,116 @@
+"""
+Media file serving with byte ranges and long-lived caching.
+
+Audio players (mobile Safari in particular) fetch clips with ``Range``
+requests and will not start or seek without ``206 Partial Content``. This
+view answers single byte ranges, honours ``If-Range``, sends ETag and
+Last-Modified validators, and marks transcoded variants, whose names never
+change content, as immutable.
+"""
+import os
+import re
+from datetime import datetime, timezone
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.views.decorators.http import require_safe
+
+from .audio import VARIANT_DIR, content_type
+from .conditional import not_modified
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+UPLOAD_MAX_AGE = 60 * 60 * 24
+VARIANT_MAX_AGE = 60 * 60 * 24 * 365
+
+
+def parse_range(header, size):
+    """
+    ``(start, end)`` (inclusive) for a single satisfiable byte range, None to
+    serve the whole file, or ``'unsatisfiable'``.
+    """
+    match = RANGE_RE.match((header or '').strip())
+    if not match or size == 0:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        suffix = int(last)
+        if suffix == 0:
+            return 'unsatisfiable'
+        return max(size - suffix, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return 'unsatisfiable'
+    return start, end
+
+
+def _if_range_matches(request, etag, mtime):
+    value = request.META.get('HTTP_IF_RANGE')
+    if not value:
+        return True
+    if value.startswith(('"', 'W/')):
+        return value == etag
+    since = parse_http_date_safe(value)
+    return since is not None and int(mtime) <= since
+
+
+def _read(path, start, length):
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        while length > 0:
+            chunk = handle.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+@require_safe
+def serve_media(request, path):
+    """Serve a file under MEDIA_ROOT with Range, validators and cache headers"""
+    try:
+        full_path = default_storage.path(path)
+    except SuspiciousFileOperation:
+        raise Http404('Not found')
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404('Not found')
+    if not os.path.isfile(full_path):
+        raise Http404('Not found')
+
+    size, mtime = stat.st_size, stat.st_mtime
+    etag = quote_etag(f'{int(mtime * 1000):x}-{size:x}')
+    max_age = VARIANT_MAX_AGE if path.startswith(VARIANT_DIR + '/') else UPLOAD_MAX_AGE
+    cache_control = f'public, max-age={max_age}' + (', immutable' if max_age == VARIANT_MAX_AGE else '')
+
+    response = not_modified(request, etag, datetime.fromtimestamp(mtime, tz=timezone.utc))
+    if response is None:
+        byte_range = None
+        if _if_range_matches(request, etag, mtime):
+            byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+
+        if byte_range == 'unsatisfiable':
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+        start, end = byte_range or (0, size - 1)
+        length = max(end - start + 1, 0)
+        body = _read(full_path, start, length) if request.method == 'GET' else iter(())
+        response = StreamingHttpResponse(body, content_type=content_type(path), status=206 if byte_range else 200)
+        response['Content-Length'] = str(length)
+        if byte_range:
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(mtime)
+    response['Cache-Control'] = cache_control
+    return response
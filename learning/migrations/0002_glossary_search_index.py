@@ -0,0 +1,85 @@
+# Generated by Django 5.0.1 on 2026-10-17 01:37
+
+import unicodedata
+
+from django.db import migrations, models
+
+# Frozen copy of learning.search as of this migration, so later changes to the
+# live normalization do not change what this migration does
+
+FTS_TABLE = 'learning_glossaryterm_fts'
+
+SEARCH_SOURCE_FIELDS = ('guarani_word', 'spanish_translation', 'english_translation', 'category')
+
+_PUSO_TABLE = str.maketrans('', '', "'’‘ʼ´`")
+
+
+def normalize_text(value):
+    if not value:
+        return ''
+    decomposed = unicodedata.normalize('NFD', value)
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(stripped.translate(_PUSO_TABLE).lower().split())
+
+
+def build_search_text(term):
+    return normalize_text(' '.join(getattr(term, field) or '' for field in SEARCH_SOURCE_FIELDS))
+
+
+def create_fts_table(connection):
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        if not cursor.fetchone()[0]:
+            return False
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            f"search_text, tokenize='unicode61', prefix='2 3')"
+        )
+    return True
+
+
+def build_search_index(apps, schema_editor):
+    GlossaryTerm = apps.get_model('learning', 'GlossaryTerm')
+    connection = schema_editor.connection
+    has_fts = create_fts_table(connection)
+    terms = list(GlossaryTerm.objects.using(connection.alias).all())
+    for term in terms:
+        term.normalized_word = normalize_text(term.guarani_word)
+        term.search_text = build_search_text(term)
+    GlossaryTerm.objects.using(connection.alias).bulk_update(terms, ['normalized_word', 'search_text'], batch_size=500)
+    if has_fts and terms:
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE}(rowid, search_text) VALUES (%s, %s)",
+                [(term.pk, term.search_text) for term in terms]
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='glossaryterm',
+            name='normalized_word',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='glossaryterm',
+            name='search_text',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(build_search_index, drop_search_index),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.1 on 2026-10-17 01:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('learning', '0004_chat_message_session_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='learning_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('lessons_completed', models.IntegerField(default=0)),
+                ('lessons_in_progress', models.IntegerField(default=0)),
+                ('exercises_completed', models.IntegerField(default=0)),
+                ('score_sum', models.IntegerField(default=0, help_text='Score over completed, scored lessons')),
+                ('points_sum', models.IntegerField(default=0, help_text='Points available over completed, scored lessons')),
+                ('current_streak', models.IntegerField(default=0, help_text='Consecutive active days')),
+                ('longest_streak', models.IntegerField(default=0)),
+                ('last_activity_date', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'User Stats',
+                'verbose_name_plural': 'User Stats',
+            },
+        ),
+    ]
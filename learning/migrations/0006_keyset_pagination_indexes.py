@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-17 01:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0005_user_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='glossaryterm',
+            index=models.Index(fields=['guarani_word', 'id'], name='glossary_word_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprogress',
+            index=models.Index(fields=['started_at', 'id'], name='progress_started_id_idx'),
+        ),
+    ]
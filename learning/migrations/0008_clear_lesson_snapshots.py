@@ -0,0 +1,21 @@
+# Generated by Django 5.0.1 on 2026-10-17 02:05
+
+from django.db import migrations
+
+
+def clear_snapshots(apps, schema_editor):
+    # Nested vocabulary switched to the compact representation; drop stored
+    # snapshots so they are re-rendered on the next read.
+    LessonSnapshot = apps.get_model('learning', 'LessonSnapshot')
+    LessonSnapshot.objects.using(schema_editor.connection.alias).all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0007_chat_message_session_id_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_snapshots, migrations.RunPython.noop),
+    ]
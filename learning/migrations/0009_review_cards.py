@@ -0,0 +1,49 @@
+# Generated by Django 5.0.1 on 2026-10-17 01:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0008_clear_lesson_snapshots'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewCard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ease', models.FloatField(default=2.5, help_text='SM-2 easiness factor')),
+                ('interval_days', models.IntegerField(default=0)),
+                ('repetitions', models.IntegerField(default=0, help_text='Successful reviews in a row')),
+                ('lapses', models.IntegerField(default=0)),
+                ('due_at', models.DateTimeField()),
+                ('last_reviewed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('question', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='learning.question')),
+                ('term', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='learning.glossaryterm')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='review_cards', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Review Card',
+                'verbose_name_plural': 'Review Cards',
+                'indexes': [models.Index(fields=['user', 'due_at'], name='review_user_due_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='reviewcard',
+            constraint=models.UniqueConstraint(fields=('user', 'term'), name='review_user_term_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='reviewcard',
+            constraint=models.UniqueConstraint(fields=('user', 'question'), name='review_user_question_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='reviewcard',
+            constraint=models.CheckConstraint(check=models.Q(models.Q(('question__isnull', True), ('term__isnull', False)), models.Q(('question__isnull', False), ('term__isnull', True)), _connector='OR'), name='review_card_single_item'),
+        ),
+    ]
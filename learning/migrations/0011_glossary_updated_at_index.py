@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-17 02:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0010_write_behind_timestamps'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='glossaryterm',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
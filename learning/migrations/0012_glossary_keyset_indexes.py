@@ -0,0 +1,21 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0011_glossary_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='glossaryterm',
+            index=models.Index(fields=['created_at', 'id'], name='glossary_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='glossaryterm',
+            index=models.Index(fields=['difficulty_level', 'id'], name='glossary_difficulty_id_idx'),
+        ),
+    ]
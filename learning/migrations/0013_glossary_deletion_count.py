@@ -0,0 +1,20 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0012_glossary_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GlossaryDeletionCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
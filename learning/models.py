@@ -1,5 +1,12 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
+
+from .search import build_search_text, normalize_text
+
+
+# Columns of the compact term representation nested inside lessons
+COMPACT_TERM_FIELDS = ('id', 'guarani_word', 'spanish_translation', 'english_translation', 'pronunciation')
 
 
 class GlossaryTerm(models.Model):
@@ -17,17 +24,80 @@ class GlossaryTerm(models.Model):
         choices=[('beginner', 'Beginner'), ('intermediate', 'Intermediate'), ('advanced', 'Advanced')],
         default='beginner'
     )
+    normalized_word = models.CharField(max_length=200, blank=True, editable=False, db_index=True)
+    search_text = models.TextField(blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    # Indexed for max(updated_at) list validators
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ['guarani_word']
+        indexes = [
+            # Keyset pagination orderings (see GlossaryTermViewSet.ordering_fields)
+            models.Index(fields=['guarani_word', 'id'], name='glossary_word_id_idx'),
+            models.Index(fields=['created_at', 'id'], name='glossary_created_id_idx'),
+            models.Index(fields=['difficulty_level', 'id'], name='glossary_difficulty_id_idx'),
+        ]
         verbose_name = 'Glossary Term'
         verbose_name_plural = 'Glossary Terms'
 
     def __str__(self):
         return f"{self.guarani_word} - {self.spanish_translation}"
 
+    def save(self, *args, **kwargs):
+        # Keep the accent-insensitive search columns in step with the source text
+        self.normalized_word = normalize_text(self.guarani_word)
+        self.search_text = build_search_text(self)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'normalized_word', 'search_text'}
+        super().save(*args, **kwargs)
+
+
+class GlossaryDeletionCount(models.Model):
+    """
+    Running count of deleted glossary terms (a single row), bumped by the
+    GlossaryTerm post_delete signal. With ``max(updated_at)`` it versions the
+    glossary table for other processes, which cannot see a deletion in the
+    remaining rows.
+    """
+    count = models.PositiveBigIntegerField(default=0)
+
+    @classmethod
+    def current(cls):
+        return cls.objects.filter(pk=1).values_list('count', flat=True).first() or 0
+
+    @classmethod
+    def increment(cls, by=1):
+        if not cls.objects.filter(pk=1).update(count=models.F('count') + by):
+            cls.objects.get_or_create(pk=1)
+            cls.objects.filter(pk=1).update(count=models.F('count') + by)
+
+
+def content_tree_lookups(include_questions=True):
+    """
+    Prefetches for the full lesson tree: content blocks with compact
+    vocabulary, and exercises annotated with ``question_count`` (plus
+    questions and choices when requested).
+    """
+    exercises = Exercise.objects.annotate(question_count=models.Count('questions'))
+    if include_questions:
+        exercises = exercises.prefetch_related(
+            models.Prefetch('questions', queryset=Question.objects.prefetch_related('choices'))
+        )
+    return [
+        models.Prefetch('content_blocks', queryset=LessonContent.objects.prefetch_related(
+            models.Prefetch('vocabulary_terms', queryset=GlossaryTerm.objects.only(*COMPACT_TERM_FIELDS))
+        )),
+        models.Prefetch('exercises', queryset=exercises),
+    ]
+
+
+class LessonQuerySet(models.QuerySet):
+    def with_content_tree(self, include_questions=True):
+        """Prefetch the full lesson tree in a fixed number of queries"""
+        return self.prefetch_related(*content_tree_lookups(include_questions))
+
 
 class Lesson(models.Model):
     """Model for structured Guarani lessons"""
@@ -42,9 +112,12 @@ class Lesson(models.Model):
     cover_image = models.ImageField(upload_to='images/lessons/', blank=True, null=True)
     estimated_duration = models.IntegerField(help_text='Duration in minutes', default=15)
     is_published = models.BooleanField(default=True)
+    content_version = models.PositiveIntegerField(default=1, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = LessonQuerySet.as_manager()
+
     class Meta:
         ordering = ['order', 'title']
 
@@ -137,6 +210,17 @@ class AnswerChoice(models.Model):
         return self.choice_text
 
 
+class LessonSnapshot(models.Model):
+    """Pre-rendered detail JSON for a lesson at a given content version"""
+    lesson = models.OneToOneField(Lesson, related_name='snapshot', on_delete=models.CASCADE, primary_key=True)
+    version = models.PositiveIntegerField()
+    payload = models.BinaryField()
+    created_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.lesson_id} v{self.version}"
+
+
 class UserProgress(models.Model):
     """Model to track user progress through lessons"""
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -150,6 +234,9 @@ class UserProgress(models.Model):
 
     class Meta:
         unique_together = ['user', 'lesson']
+        indexes = [
+            models.Index(fields=['started_at', 'id'], name='progress_started_id_idx'),
+        ]
         verbose_name = 'User Progress'
         verbose_name_plural = 'User Progress Records'
 
@@ -157,6 +244,70 @@ class UserProgress(models.Model):
         return f"{self.user.username} - {self.lesson.title}"
 
 
+class UserStats(models.Model):
+    """Per-user learning totals, maintained incrementally (see learning.stats)"""
+    user = models.OneToOneField(User, related_name='learning_stats', on_delete=models.CASCADE, primary_key=True)
+    lessons_completed = models.IntegerField(default=0)
+    lessons_in_progress = models.IntegerField(default=0)
+    exercises_completed = models.IntegerField(default=0)
+    score_sum = models.IntegerField(default=0, help_text='Score over completed, scored lessons')
+    points_sum = models.IntegerField(default=0, help_text='Points available over completed, scored lessons')
+    current_streak = models.IntegerField(default=0, help_text='Consecutive active days')
+    longest_streak = models.IntegerField(default=0)
+    last_activity_date = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'User Stats'
+        verbose_name_plural = 'User Stats'
+
+    def __str__(self):
+        return f"{self.user_id} stats"
+
+    @property
+    def average_score(self):
+        return round(self.score_sum * 100.0 / self.points_sum, 2) if self.points_sum > 0 else 0
+
+
+class ReviewCard(models.Model):
+    """Spaced-repetition (SM-2) state of one glossary term or question for one user"""
+    user = models.ForeignKey(User, related_name='review_cards', on_delete=models.CASCADE)
+    term = models.ForeignKey(GlossaryTerm, null=True, blank=True, on_delete=models.CASCADE)
+    question = models.ForeignKey(Question, null=True, blank=True, on_delete=models.CASCADE)
+    ease = models.FloatField(default=2.5, help_text='SM-2 easiness factor')
+    interval_days = models.IntegerField(default=0)
+    repetitions = models.IntegerField(default=0, help_text='Successful reviews in a row')
+    lapses = models.IntegerField(default=0)
+    due_at = models.DateTimeField()
+    last_reviewed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'due_at'], name='review_user_due_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'term'], name='review_user_term_uniq'),
+            models.UniqueConstraint(fields=['user', 'question'], name='review_user_question_uniq'),
+            models.CheckConstraint(
+                check=(
+                    models.Q(term__isnull=False, question__isnull=True)
+                    | models.Q(term__isnull=True, question__isnull=False)
+                ),
+                name='review_card_single_item',
+            ),
+        ]
+        verbose_name = 'Review Card'
+        verbose_name_plural = 'Review Cards'
+
+    def __str__(self):
+        return f"{self.user_id} - {self.term or self.question}"
+
+    @property
+    def item_type(self):
+        return 'term' if self.term_id else 'question'
+
+
 class ExerciseAttempt(models.Model):
     """Model to track individual exercise attempts"""
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -165,7 +316,8 @@ class ExerciseAttempt(models.Model):
     user_answer = models.CharField(max_length=500)
     is_correct = models.BooleanField(default=False)
     points_earned = models.IntegerField(default=0)
-    attempted_at = models.DateTimeField(auto_now_add=True)
+    # Stamped when the attempt is made, not when a write-behind flush inserts it
+    attempted_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         ordering = ['-attempted_at']
@@ -184,10 +336,14 @@ class ChatMessage(models.Model):
         default='user'
     )
     message = models.TextField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['session_id', 'created_at'], name='chatmsg_session_created_idx'),
+            models.Index(fields=['session_id', 'id'], name='chatmsg_session_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.role}: {self.message[:50]}"
@@ -0,0 +1,172 @@
+"""
+Offline lesson packs.
+
+A pack is a single zip archive holding everything a device needs to show a
+lesson without further requests: the lesson snapshot JSON, the full glossary
+entries the lesson references and every media file (cover image, block and
+question audio/images, term audio), plus a manifest mapping media URLs to
+archive paths.
+
+Packs are content addressed: the file name is a digest over the snapshot,
+the glossary payload and each media file's name, size and modification
+time, so any change produces a new pack and stale ones are never served.
+Built packs are kept under ``LESSON_PACK_ROOT`` until a newer pack of the
+same lesson replaces them. Packs written after this one, e.g. by another
+worker that saw newer content, are left alone; a pack removed between lookup
+and download is rebuilt by ``open_pack``.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from rest_framework.renderers import JSONRenderer
+
+from .models import GlossaryTerm, Question
+from .serializers import GlossaryTermSerializer
+from .snapshots import get_snapshot
+
+PACK_FORMAT = 1
+
+# Already-compressed media is stored as is; deflating it only costs CPU
+STORED_EXTENSIONS = {'.mp3', '.m4a', '.aac', '.ogg', '.oga', '.opus', '.jpg', '.jpeg', '.png', '.gif', '.webp'}
+
+
+def pack_root():
+    return Path(settings.LESSON_PACK_ROOT)
+
+
+def referenced_terms(lesson):
+    return GlossaryTerm.objects.filter(lessoncontent__lesson=lesson).distinct().order_by('id')
+
+
+def media_names(lesson, terms):
+    """Storage names of every media file the lesson references"""
+    names = set()
+    if lesson.cover_image:
+        names.add(lesson.cover_image.name)
+    for audio, image in lesson.content_blocks.values_list('audio_file', 'image_file'):
+        names.update([audio, image])
+    for audio, image in Question.objects.filter(exercise__lesson=lesson).values_list('audio_file', 'image_file'):
+        names.update([audio, image])
+    names.update(term.audio_file.name for term in terms)
+    return sorted(name for name in names if name)
+
+
+def _media_stat(name):
+    """``(size, mtime)`` of a stored file, or None when it is missing"""
+    try:
+        return default_storage.size(name), default_storage.get_modified_time(name).timestamp()
+    except (OSError, NotImplementedError):
+        return None
+
+
+def collect(lesson):
+    """Gather the pack parts and the content key identifying them"""
+    snapshot = get_snapshot(lesson)
+    terms = list(referenced_terms(lesson))
+    glossary = JSONRenderer().render(GlossaryTermSerializer(terms, many=True).data)
+
+    media = {}
+    digest = hashlib.sha256(f'pack:{PACK_FORMAT}:{lesson.pk}\n'.encode('utf-8'))
+    digest.update(hashlib.sha256(snapshot).digest())
+    digest.update(hashlib.sha256(glossary).digest())
+    for name in media_names(lesson, terms):
+        stat = _media_stat(name)
+        media[name] = stat
+        digest.update(f'{name}\0{stat}\n'.encode('utf-8'))
+
+    return {'key': digest.hexdigest(), 'snapshot': snapshot, 'glossary': glossary, 'media': media}
+
+
+def pack_path(lesson_id, key):
+    return pack_root() / f'lesson-{lesson_id}-{key[:32]}.zip'
+
+
+def _write_media(archive, name):
+    digest = hashlib.sha256()
+    info = zipfile.ZipInfo(f'media/{name}')
+    info.compress_type = zipfile.ZIP_STORED if Path(name).suffix.lower() in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+    with default_storage.open(name, 'rb') as source, archive.open(info, 'w') as target:
+        for chunk in iter(lambda: source.read(64 * 1024), b''):
+            digest.update(chunk)
+            target.write(chunk)
+    return digest.hexdigest()
+
+
+def build_pack(lesson, parts=None):
+    """Write the pack for ``lesson`` and remove packs of the same lesson built before it"""
+    parts = parts or collect(lesson)
+    path = pack_path(lesson.pk, parts['key'])
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    manifest = {
+        'format': PACK_FORMAT,
+        'lesson': lesson.pk,
+        'content_version': lesson.content_version,
+        'key': parts['key'],
+        'media': [],
+        'missing': [],
+    }
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as handle, \
+                zipfile.ZipFile(handle, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=6) as archive:
+            archive.writestr('lesson.json', parts['snapshot'])
+            archive.writestr('glossary.json', parts['glossary'])
+            for name, stat in parts['media'].items():
+                if stat is None:
+                    manifest['missing'].append(name)
+                    continue
+                manifest['media'].append({
+                    'url': default_storage.url(name),
+                    'path': f'media/{name}',
+                    'size': stat[0],
+                    'sha256': _write_media(archive, name),
+                })
+            archive.writestr('manifest.json', json.dumps(manifest, indent=2))
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+    built = path.stat().st_mtime_ns
+    for other in path.parent.glob(f'lesson-{lesson.pk}-*.zip'):
+        try:
+            if other != path and other.stat().st_mtime_ns <= built:
+                other.unlink()
+        except FileNotFoundError:
+            pass
+    return path
+
+
+def get_pack(lesson):
+    """Return ``(path, key)`` of the current pack, building it on a miss"""
+    parts = collect(lesson)
+    path = pack_path(lesson.pk, parts['key'])
+    if not path.exists():
+        path = build_pack(lesson, parts)
+    return path, parts['key']
+
+
+def open_pack(lesson):
+    """Return ``(file, key)`` of the current pack opened for reading"""
+    path, key = get_pack(lesson)
+    try:
+        return open(path, 'rb'), key
+    except FileNotFoundError:
+        # Removed by remove_packs() or another worker's build since get_pack() saw it
+        parts = collect(lesson)
+        return open(build_pack(lesson, parts), 'rb'), parts['key']
+
+
+def remove_packs(lesson_ids):
+    """Delete built packs of the given lessons"""
+    root = pack_root()
+    for lesson_id in lesson_ids:
+        for path in root.glob(f'lesson-{lesson_id}-*.zip'):
+            path.unlink(missing_ok=True)
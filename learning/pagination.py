@@ -0,0 +1,171 @@
+"""
+Keyset (seek) pagination for large API collections.
+
+Pages are addressed by an opaque cursor holding the sort key of the row at
+the page boundary, and fetched with ``WHERE (a, id) > (x, y) ORDER BY a, id
+LIMIT n``. Unlike page-number pagination there is no ``COUNT(*)`` and no
+``OFFSET`` scan, so every page costs the same regardless of depth.
+"""
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a unique, indexed ordering such as
+    ``('guarani_word', 'id')``. Set ``ordering`` on a subclass and assign it
+    as a viewset's ``pagination_class``.
+    """
+    ordering = ('id',)
+    page_size = api_settings.PAGE_SIZE or 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering_query_param = 'ordering'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_ordering(self, request, view):
+        """
+        Use ``?ordering=`` when it names one of the view's ``ordering_fields``,
+        with ``id`` as the tie-breaker; otherwise the class ordering.
+        """
+        field = request.query_params.get(self.ordering_query_param, '').strip()
+        allowed = getattr(view, 'ordering_fields', None) or ()
+        if field and field.lstrip('-') in allowed:
+            return (field, '-id' if field.startswith('-') else 'id')
+        return tuple(self.ordering)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            values, reverse = cursor['v'], bool(cursor.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self._ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    def encode_cursor(self, values, reverse):
+        payload = json.dumps({'v': [_encode_value(value) for value in values], 'r': int(reverse)})
+        encoded = base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    @staticmethod
+    def _seek(ordering, values):
+        """
+        Rows strictly after ``values`` in ``ordering`` (lexicographic).
+
+        The OR of per-column steps is ANDed with a range bound on the leading
+        column, which is what lets the database seek the (field, id) index
+        instead of scanning it.
+        """
+        lookup = 'lte' if ordering[0].startswith('-') else 'gte'
+        bound = Q(**{f'{ordering[0].lstrip("-")}__{lookup}': values[0]})
+        condition = Q()
+        for index, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            step = Q(**{f'{name}__{lookup}': values[index]})
+            for previous, value in zip(ordering[:index], values[:index]):
+                step &= Q(**{previous.lstrip('-'): value})
+            condition |= step
+        return bound & condition
+
+    @staticmethod
+    def _flip(ordering):
+        return tuple(field[1:] if field.startswith('-') else f'-{field}' for field in ordering)
+
+    def _key(self, obj):
+        return [getattr(obj, field.lstrip('-')) for field in self._ordering]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = remove_query_param(request.build_absolute_uri(), self.cursor_query_param)
+        self._ordering = self.get_ordering(request, view)
+        page_size = self.get_page_size(request)
+
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor[1])
+        ordering = self._flip(self._ordering) if reverse else self._ordering
+
+        queryset = queryset.order_by(*ordering)
+        try:
+            # Cursor values are converted when the filter is built, some only when it runs
+            if cursor is not None:
+                queryset = queryset.filter(self._seek(ordering, cursor[0]))
+            rows = list(queryset[:page_size + 1])
+        except (DjangoValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        self.has_next = True if reverse else has_more
+        self.has_previous = has_more if reverse else cursor is not None
+        self.page = rows
+        return rows
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self._key(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self._key(self.page[0]), reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class GlossaryKeysetPagination(KeysetPagination):
+    ordering = ('guarani_word', 'id')
+    max_page_size = 500
+
+
+class ProgressKeysetPagination(KeysetPagination):
+    ordering = ('started_at', 'id')
@@ -0,0 +1,157 @@
+"""
+In-process cache of chatbot replies for repeated questions.
+
+Entries are keyed on the normalized question plus a small fingerprint of the
+conversation (model and the previous assistant turn), expire after
+``CHAT_RESPONSE_CACHE_TTL`` seconds and are evicted least-recently-used past
+``CHAT_RESPONSE_CACHE_SIZE``. When ``CHAT_RESPONSE_CACHE_SIMILARITY`` is set
+(it is off by default), a miss falls back to a character-trigram Jaccard
+match, but only against entries with the same fingerprint and exactly the
+same content words, so "how would you say thank you" can reuse "how do you
+say thank you" while "hungry" / "angry" or "good morning" / "good evening"
+never share a reply. Candidates come from an index on those content words
+rather than a scan of the cache.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .search import tokenize
+
+
+def normalize_question(message):
+    return ' '.join(tokenize(message))
+
+
+# Words that may differ between two questions sharing a similar-match reply
+FUNCTION_WORDS = frozenset(
+    'a an and are can could do does how i in is it me my of please the to what would you your '
+    'como de del el en es la las los me mi por que se un una y yo'.split()
+)
+
+
+def content_words(question):
+    return frozenset(word for word in question.split() if word not in FUNCTION_WORDS)
+
+
+def trigrams(text):
+    padded = f'  {text} '
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def fingerprint(messages):
+    """Identify the conversational context a reply depends on"""
+    previous = ''
+    for msg in reversed(messages[:-1]):
+        if msg['role'] == 'assistant':
+            previous = normalize_question(msg['content'])[:200]
+            break
+    return hashlib.sha1(f'{settings.OPENAI_MODEL}\n{previous}'.encode('utf-8')).hexdigest()[:16]
+
+
+class ResponseCache:
+    def __init__(self, maxsize, ttl, similarity):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.similarity = similarity
+        self._entries = OrderedDict()
+        # (fingerprint, content words) -> keys of the entries sharing them
+        self._similar = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        bucket = self._similar.get(entry['similar_key'])
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del self._similar[entry['similar_key']]
+
+    def _lookup(self, key, question, now):
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry['expires'] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry['response']
+            self._remove(key)
+
+        if self.similarity:
+            words = content_words(question)
+            candidates = self._similar.get((key[0], words), ()) if words else ()
+            grams = trigrams(question)
+            best_key, best_score = None, self.similarity
+            for other_key in candidates:
+                other = self._entries[other_key]
+                if other['expires'] <= now:
+                    continue
+                union = len(grams | other['trigrams'])
+                score = len(grams & other['trigrams']) / union if union else 0
+                if score >= best_score:
+                    best_key, best_score = other_key, score
+            if best_key is not None:
+                self._entries.move_to_end(best_key)
+                self.similar_hits += 1
+                return self._entries[best_key]['response']
+
+        self.misses += 1
+        return None
+
+    def get(self, message, messages):
+        """Return a cached reply for ``message`` in this context, or None"""
+        question = normalize_question(message)
+        if not question or not self.maxsize:
+            return None
+        with self._lock:
+            return self._lookup((fingerprint(messages), question), question, time.monotonic())
+
+    def set(self, message, messages, response):
+        question = normalize_question(message)
+        if not question or not response or not self.maxsize:
+            return
+        key = (fingerprint(messages), question)
+        similar_key = (key[0], content_words(question))
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = {
+                'response': response,
+                'trigrams': trigrams(question),
+                'similar_key': similar_key,
+                'expires': time.monotonic() + self.ttl,
+            }
+            self._similar.setdefault(similar_key, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._similar.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.similar_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'similar_hits': self.similar_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round((self.hits + self.similar_hits) / lookups, 4) if lookups else 0,
+            }
+
+
+response_cache = ResponseCache(
+    maxsize=settings.CHAT_RESPONSE_CACHE_SIZE,
+    ttl=settings.CHAT_RESPONSE_CACHE_TTL,
+    similarity=settings.CHAT_RESPONSE_CACHE_SIMILARITY,
+)
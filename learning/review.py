@@ -0,0 +1,176 @@
+"""
+Spaced-repetition review scheduling (SM-2).
+
+Each user has a ReviewCard per glossary term and per question they have met.
+Term cards are created when the user starts a lesson (for the lesson's
+vocabulary), question cards when an exercise is graded. A card's ``due_at``
+is pushed out after every review according to SM-2, and the review queue is
+read with a single range scan over the ``(user, due_at)`` index, so fetching
+a batch costs O(batch) however long the user's history is.
+
+``rebuild`` replays ExerciseAttempt history into question cards
+(``manage.py rebuild_review_cards``).
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import grading
+from .models import ExerciseAttempt, LessonContent, ReviewCard, UserProgress
+
+DEFAULT_BATCH = 20
+MAX_BATCH = 100
+
+MIN_EASE = 1.3
+# Intervals stop growing here (and due dates stay representable)
+MAX_INTERVAL_DAYS = 36500
+# A failed card comes back after this delay instead of a whole day
+RELEARN_DELAY = timedelta(minutes=10)
+# SM-2 quality (0-5) recorded for graded exercise answers
+CORRECT_QUALITY = 4
+INCORRECT_QUALITY = 1
+
+SCHEDULE_FIELDS = ['ease', 'interval_days', 'repetitions', 'lapses', 'due_at', 'last_reviewed_at']
+
+
+def schedule(card, quality, now):
+    """Apply one SM-2 review with ``quality`` in 0..5 to ``card`` (in memory)"""
+    quality = max(0, min(5, int(quality)))
+    if quality >= 3:
+        if card.repetitions == 0:
+            card.interval_days = 1
+        elif card.repetitions == 1:
+            card.interval_days = 6
+        else:
+            card.interval_days = min(MAX_INTERVAL_DAYS, max(1, round(card.interval_days * card.ease)))
+        card.repetitions += 1
+        card.due_at = now + timedelta(days=card.interval_days)
+    else:
+        if card.last_reviewed_at is not None:
+            card.lapses += 1
+        card.repetitions = 0
+        card.interval_days = 0
+        card.due_at = now + RELEARN_DELAY
+    card.ease = max(MIN_EASE, card.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    card.last_reviewed_at = now
+    return card
+
+
+def due_cards(user_id, limit=DEFAULT_BATCH, now=None):
+    """The next ``limit`` due cards, oldest due first, with their items loaded"""
+    now = now or timezone.now()
+    return list(
+        ReviewCard.objects
+        .filter(user_id=user_id, due_at__lte=now)
+        .order_by('due_at', 'id')
+        .select_related('term', 'question')
+        .prefetch_related('question__choices')
+        [:limit]
+    )
+
+
+def enroll_lesson_terms(user_id, lesson_id, now=None):
+    """Create (due now) term cards for a lesson's vocabulary"""
+    now = now or timezone.now()
+    term_ids = (
+        LessonContent.vocabulary_terms.through.objects
+        .filter(lessoncontent__lesson_id=lesson_id)
+        .values_list('glossaryterm_id', flat=True)
+        .distinct()
+    )
+    ReviewCard.objects.bulk_create(
+        [ReviewCard(user_id=user_id, term_id=term_id, due_at=now) for term_id in term_ids],
+        ignore_conflicts=True,
+    )
+
+
+def record_answers(user_id, outcomes, now=None):
+    """
+    Schedule question cards from graded answers.
+
+    ``outcomes`` maps question id to correctness. Existing cards are loaded
+    in one query and written back with one ``bulk_update``; missing cards
+    are bulk-created.
+    """
+    if not outcomes:
+        return
+    now = now or timezone.now()
+    with transaction.atomic():
+        cards = {
+            card.question_id: card
+            for card in ReviewCard.objects.select_for_update().filter(user_id=user_id, question_id__in=outcomes)
+        }
+        new_cards = []
+        for question_id, is_correct in outcomes.items():
+            card = cards.get(question_id)
+            if card is None:
+                card = ReviewCard(user_id=user_id, question_id=question_id, due_at=now)
+                new_cards.append(card)
+            schedule(card, CORRECT_QUALITY if is_correct else INCORRECT_QUALITY, now)
+        ReviewCard.objects.bulk_update(list(cards.values()), SCHEDULE_FIELDS)
+        ReviewCard.objects.bulk_create(new_cards, ignore_conflicts=True)
+
+
+def grade_cards(user_id, grades, now=None):
+    """
+    Apply a batch of reviews and return the updated cards.
+
+    ``grades`` maps card id to either an SM-2 quality (0-5) or, for question
+    cards, ``{'answer': ...}`` which is checked like an exercise answer.
+    Unknown card ids are ignored.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        cards = list(
+            ReviewCard.objects.select_for_update()
+            .filter(user_id=user_id, pk__in=grades)
+            .select_related('question')
+        )
+        for card in cards:
+            grade = grades[card.pk]
+            if isinstance(grade, dict):
+                if card.question is None:
+                    continue
+                correct = grading.is_correct_answer(card.question, grade.get('answer', ''))
+                grade = CORRECT_QUALITY if correct else INCORRECT_QUALITY
+            schedule(card, grade, now)
+        ReviewCard.objects.bulk_update(cards, SCHEDULE_FIELDS)
+    return cards
+
+
+def rebuild(user_ids=None, batch_size=1000):
+    """
+    Recreate review cards from history: question cards by replaying
+    ExerciseAttempt in order, term cards for the vocabulary of started lessons.
+    """
+    attempts = ExerciseAttempt.objects.all()
+    progress = UserProgress.objects.all()
+    stale = ReviewCard.objects.all()
+    if user_ids is not None:
+        attempts = attempts.filter(user_id__in=user_ids)
+        progress = progress.filter(user_id__in=user_ids)
+        stale = stale.filter(user_id__in=user_ids)
+
+    cards = {}
+    rows = attempts.order_by('attempted_at', 'id').values_list('user_id', 'question_id', 'is_correct', 'attempted_at')
+    for user_id, question_id, is_correct, attempted_at in rows.iterator(chunk_size=batch_size):
+        card = cards.get((user_id, question_id))
+        if card is None:
+            card = cards[user_id, question_id] = ReviewCard(user_id=user_id, question_id=question_id, due_at=attempted_at)
+        schedule(card, CORRECT_QUALITY if is_correct else INCORRECT_QUALITY, attempted_at)
+
+    now = timezone.now()
+    vocabulary = LessonContent.vocabulary_terms.through.objects.values_list('lessoncontent__lesson_id', 'glossaryterm_id')
+    terms_by_lesson = {}
+    for lesson_id, term_id in vocabulary.iterator(chunk_size=batch_size):
+        terms_by_lesson.setdefault(lesson_id, set()).add(term_id)
+    term_cards = {}
+    for user_id, lesson_id in progress.values_list('user_id', 'lesson_id').iterator(chunk_size=batch_size):
+        for term_id in terms_by_lesson.get(lesson_id, ()):
+            term_cards.setdefault((user_id, term_id), ReviewCard(user_id=user_id, term_id=term_id, due_at=now))
+
+    with transaction.atomic():
+        stale.delete()
+        ReviewCard.objects.bulk_create(list(cards.values()) + list(term_cards.values()), batch_size=batch_size)
+    return len(cards) + len(term_cards)
@@ -0,0 +1,160 @@
+"""
+Accent- and puso-insensitive search over the glossary.
+
+Every GlossaryTerm stores normalized copies of its searchable text
+(``normalized_word`` and ``search_text``). On SQLite those copies are also
+mirrored into an FTS5 table so lookups are an index probe instead of a
+``LIKE '%...%'`` scan; other databases fall back to matching the normalized
+column directly.
+"""
+import re
+import unicodedata
+
+from django.db import connections
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+FTS_TABLE = 'learning_glossaryterm_fts'
+
+# Fields whose normalized text is searchable
+SEARCH_SOURCE_FIELDS = ('guarani_word', 'spanish_translation', 'english_translation', 'category')
+
+# Apostrophe variants used for the puso (glottal stop) in written Guarani
+_PUSO_TABLE = str.maketrans('', '', "'’‘ʼ´`")
+_TOKEN_RE = re.compile(r'\w+')
+
+_fts_tables = {}
+
+
+def normalize_text(value):
+    """Lowercase, strip diacritics and fold the puso: "Ñe'ẽ" -> "nee"."""
+    if not value:
+        return ''
+    decomposed = unicodedata.normalize('NFD', value)
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(stripped.translate(_PUSO_TABLE).lower().split())
+
+
+def tokenize(value):
+    """Split text into normalized search tokens"""
+    return _TOKEN_RE.findall(normalize_text(value))
+
+
+def build_search_text(term):
+    """Normalized text indexed for a glossary term"""
+    return normalize_text(' '.join(getattr(term, field) or '' for field in SEARCH_SOURCE_FIELDS))
+
+
+def fts_available(using='default'):
+    """Whether the FTS5 mirror exists on the given database"""
+    if using not in _fts_tables:
+        connection = connections[using]
+        _fts_tables[using] = (
+            connection.vendor == 'sqlite' and
+            FTS_TABLE in connection.introspection.table_names()
+        )
+    return _fts_tables[using]
+
+
+def create_fts_table(connection):
+    """Create the FTS5 mirror table, returning False if SQLite lacks FTS5"""
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        if not cursor.fetchone()[0]:
+            return False
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            f"search_text, tokenize='unicode61', prefix='2 3')"
+        )
+    _fts_tables.pop(connection.alias, None)
+    return True
+
+
+def index_terms(rows, using='default'):
+    """Write ``(id, search_text)`` pairs into the FTS mirror"""
+    if not fts_available(using):
+        return
+    rows = list(rows)
+    if not rows:
+        return
+    with connections[using].cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(pk,) for pk, _ in rows])
+        cursor.executemany(f"INSERT INTO {FTS_TABLE}(rowid, search_text) VALUES (%s, %s)", rows)
+
+
+def unindex_terms(ids, using='default'):
+    """Remove glossary term ids from the FTS mirror"""
+    if not fts_available(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(pk,) for pk in ids])
+
+
+def rebuild_index(using='default', batch_size=2000):
+    """
+    Recompute normalized columns and repopulate the FTS mirror from scratch,
+    creating the mirror if the database lacks it
+    """
+    from .models import GlossaryTerm
+
+    create_fts_table(connections[using])
+    if fts_available(using):
+        with connections[using].cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+
+    count = 0
+    batch = []
+    for term in GlossaryTerm.objects.using(using).order_by('id').iterator(chunk_size=batch_size):
+        term.normalized_word = normalize_text(term.guarani_word)
+        term.search_text = build_search_text(term)
+        batch.append(term)
+        if len(batch) >= batch_size:
+            count += _flush_rebuild_batch(batch, using)
+            batch = []
+    if batch:
+        count += _flush_rebuild_batch(batch, using)
+    return count
+
+
+def _flush_rebuild_batch(batch, using):
+    from .models import GlossaryTerm
+
+    GlossaryTerm.objects.using(using).bulk_update(batch, ['normalized_word', 'search_text'])
+    index_terms(((term.pk, term.search_text) for term in batch), using=using)
+    return len(batch)
+
+
+def search_glossary(queryset, query):
+    """
+    Filter a GlossaryTerm queryset by a free-text query.
+
+    Each query token must prefix-match a word of the term's normalized text,
+    so "nee" finds "Ñe'ẽ" and "agu" finds "Aguyje". When no term matches that
+    way, tokens are matched anywhere in the text, as the old ``icontains``
+    search did, so "guyje" still finds "Aguyje"; only those misses pay for
+    the scan.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return queryset
+
+    if fts_available(queryset.db):
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        matches = queryset.filter(id__in=RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match]
+        ))
+        if matches.exists():
+            return matches
+
+    for token in tokens:
+        queryset = queryset.filter(search_text__contains=token)
+    return queryset
+
+
+class GlossarySearchFilter(filters.SearchFilter):
+    """DRF ``?search=`` backend that queries the glossary search index"""
+
+    def filter_queryset(self, request, queryset, view):
+        return search_glossary(queryset, request.query_params.get(self.search_param, ''))
@@ -1,14 +1,88 @@
 from rest_framework import serializers
+
+from . import thumbnails
 from .models import (
     GlossaryTerm, Lesson, LessonContent, Exercise, Question,
-    AnswerChoice, UserProgress, ExerciseAttempt, ChatMessage
+    AnswerChoice, UserProgress, ReviewCard, ExerciseAttempt, ChatMessage,
+    COMPACT_TERM_FIELDS
 )
 
 
-class GlossaryTermSerializer(serializers.ModelSerializer):
+def parse_field_list(value):
+    """Split a ``?fields=a,b`` style parameter into a set of names"""
+    return {name.strip() for name in (value or '').split(',') if name.strip()}
+
+
+def sparse_fieldset(request):
+    """``(fields, omit)`` requested with ``?fields=`` / ``?omit=`` on a read"""
+    if request is None or request.method not in ('GET', 'HEAD'):
+        return set(), set()
+    return (
+        parse_field_list(request.query_params.get('fields')),
+        parse_field_list(request.query_params.get('omit')),
+    )
+
+
+def select_fields(names, fields, omit):
+    """Names kept from ``names`` by a sparse fieldset (unknown names are ignored)"""
+    return [name for name in names if (not fields or name in fields) and name not in omit]
+
+
+class SparseFieldsetMixin:
+    """
+    Trim a top-level serializer to ``?fields=a,b`` and/or drop ``?omit=c``.
+
+    The field lists can also be passed as ``fields=``/``omit=`` keyword
+    arguments. Nested serializers are left alone.
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        omit = kwargs.pop('omit', None)
+        super().__init__(*args, **kwargs)
+
+        if fields is None and omit is None:
+            fields, omit = sparse_fieldset(self.context.get('request'))
+        fields, omit = set(fields or ()), set(omit or ())
+        if not fields and not omit:
+            return
+        kept = set(select_fields(self.fields, fields, omit))
+        for name in list(self.fields):
+            if name not in kept:
+                self.fields.pop(name)
+
+
+class RenditionsField(serializers.Field):
+    """Read-only WebP/JPEG renditions of an image field (see learning.thumbnails)"""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        result = thumbnails.renditions(value)
+        request = self.context.get('request')
+        if request is None:
+            return result
+        return {
+            key: [{'url': request.build_absolute_uri(item['url']), 'width': item['width']} for item in items]
+            for key, items in result.items()
+        }
+
+
+class GlossaryTermSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    class Meta:
+        model = GlossaryTerm
+        exclude = ['normalized_word', 'search_text']
+
+
+class CompactGlossaryTermSerializer(serializers.ModelSerializer):
+    """Vocabulary reference nested inside lessons"""
+
     class Meta:
         model = GlossaryTerm
-        fields = '__all__'
+        fields = list(COMPACT_TERM_FIELDS)
+        read_only_fields = fields
 
 
 class AnswerChoiceSerializer(serializers.ModelSerializer):
@@ -19,12 +93,13 @@ class AnswerChoiceSerializer(serializers.ModelSerializer):
 
 class QuestionSerializer(serializers.ModelSerializer):
     choices = AnswerChoiceSerializer(many=True, read_only=True)
+    image_renditions = RenditionsField(source='image_file')
 
     class Meta:
         model = Question
         fields = [
             'id', 'question_type', 'question_text', 'audio_file',
-            'image_file', 'correct_answer', 'explanation', 'points',
+            'image_file', 'image_renditions', 'correct_answer', 'explanation', 'points',
             'order', 'choices'
         ]
 
@@ -38,35 +113,42 @@ class ExerciseSerializer(serializers.ModelSerializer):
 
 
 class LessonContentSerializer(serializers.ModelSerializer):
-    vocabulary_terms = GlossaryTermSerializer(many=True, read_only=True)
+    vocabulary_terms = CompactGlossaryTermSerializer(many=True, read_only=True)
+    image_renditions = RenditionsField(source='image_file')
 
     class Meta:
         model = LessonContent
         fields = [
             'id', 'order', 'content_type', 'title', 'text_content',
-            'audio_file', 'image_file', 'video_url', 'vocabulary_terms'
+            'audio_file', 'image_file', 'image_renditions', 'video_url', 'vocabulary_terms'
         ]
 
 
-class LessonDetailSerializer(serializers.ModelSerializer):
+class LessonDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     content_blocks = LessonContentSerializer(many=True, read_only=True)
     exercises = ExerciseSerializer(many=True, read_only=True)
+    cover_image_renditions = RenditionsField(source='cover_image')
 
     class Meta:
         model = Lesson
         fields = [
             'id', 'title', 'description', 'difficulty_level',
-            'cover_image', 'estimated_duration', 'content_blocks', 'exercises'
+            'cover_image', 'cover_image_renditions', 'estimated_duration', 'content_blocks', 'exercises'
         ]
 
 
-class LessonListSerializer(serializers.ModelSerializer):
+class LessonListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    cover_image_renditions = RenditionsField(source='cover_image')
+
     class Meta:
         model = Lesson
-        fields = ['id', 'title', 'description', 'difficulty_level', 'cover_image', 'estimated_duration', 'order']
+        fields = [
+            'id', 'title', 'description', 'difficulty_level', 'cover_image',
+            'cover_image_renditions', 'estimated_duration', 'order'
+        ]
 
 
-class UserProgressSerializer(serializers.ModelSerializer):
+class UserProgressSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     lesson_title = serializers.CharField(source='lesson.title', read_only=True)
 
     class Meta:
@@ -77,13 +159,26 @@ class UserProgressSerializer(serializers.ModelSerializer):
         ]
 
 
+class ReviewCardSerializer(serializers.ModelSerializer):
+    item_type = serializers.CharField(read_only=True)
+    term = CompactGlossaryTermSerializer(read_only=True)
+    question = QuestionSerializer(read_only=True)
+
+    class Meta:
+        model = ReviewCard
+        fields = [
+            'id', 'item_type', 'term', 'question', 'due_at', 'interval_days',
+            'repetitions', 'lapses', 'ease', 'last_reviewed_at'
+        ]
+
+
 class ExerciseAttemptSerializer(serializers.ModelSerializer):
     class Meta:
         model = ExerciseAttempt
         fields = ['id', 'exercise', 'question', 'user_answer', 'is_correct', 'points_earned', 'attempted_at']
 
 
-class ChatMessageSerializer(serializers.ModelSerializer):
+class ChatMessageSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = ChatMessage
         fields = ['id', 'session_id', 'role', 'message', 'created_at']
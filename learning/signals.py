@@ -0,0 +1,156 @@
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import audio, packs, review, search, stats, thumbnails
+from .models import (
+    AnswerChoice, Exercise, GlossaryDeletionCount, GlossaryTerm, Lesson, LessonContent, Question, UserProgress,
+)
+from .snapshots import invalidate_lessons
+from .suggest import suggestion_index
+
+
+@receiver(post_save, sender=GlossaryTerm)
+def index_glossary_term(sender, instance, using, **kwargs):
+    """Mirror a saved term into the glossary search index"""
+    search.index_terms([(instance.pk, instance.search_text)], using=using)
+    suggestion_index.invalidate()
+
+
+@receiver(post_delete, sender=GlossaryTerm)
+def unindex_glossary_term(sender, instance, using, **kwargs):
+    """Drop a deleted term from the glossary search index"""
+    search.unindex_terms([instance.pk], using=using)
+    GlossaryDeletionCount.increment()
+    suggestion_index.invalidate()
+
+
+@receiver(post_save, sender=GlossaryTerm)
+@receiver(post_save, sender=LessonContent)
+@receiver(post_save, sender=Question)
+def transcode_audio(sender, instance, **kwargs):
+    """Build low-bitrate variants of a new or replaced audio clip"""
+    audio.schedule(instance.audio_file)
+
+
+# Image renditions; lessons are invalidated once they exist so snapshots list them
+
+@receiver(post_save, sender=Lesson)
+def generate_cover_thumbnails(sender, instance, **kwargs):
+    thumbnails.schedule(instance.cover_image, lambda: invalidate_lessons([instance.pk]))
+
+
+@receiver(post_save, sender=LessonContent)
+def generate_block_thumbnails(sender, instance, **kwargs):
+    thumbnails.schedule(instance.image_file, lambda: invalidate_lessons([instance.lesson_id]))
+
+
+@receiver(post_save, sender=Question)
+def generate_question_thumbnails(sender, instance, **kwargs):
+    thumbnails.schedule(instance.image_file, lambda: invalidate_lessons(
+        Exercise.objects.filter(pk=instance.exercise_id).values_list('lesson_id', flat=True)
+    ))
+
+
+# Lesson snapshot invalidation: any change in a lesson's tree bumps its version
+
+@receiver(post_save, sender=Lesson)
+def invalidate_lesson(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_lessons([instance.pk])
+
+
+@receiver(post_delete, sender=Lesson)
+def remove_lesson_packs(sender, instance, **kwargs):
+    """Packs of live lessons are replaced on rebuild; deleted lessons leave none behind"""
+    packs.remove_packs([instance.pk])
+
+
+@receiver(post_save, sender=LessonContent)
+@receiver(post_delete, sender=LessonContent)
+@receiver(post_save, sender=Exercise)
+@receiver(post_delete, sender=Exercise)
+def invalidate_lesson_child(sender, instance, **kwargs):
+    invalidate_lessons([instance.lesson_id])
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def invalidate_question_lesson(sender, instance, **kwargs):
+    invalidate_lessons(
+        Exercise.objects.filter(pk=instance.exercise_id).values_list('lesson_id', flat=True)
+    )
+
+
+@receiver(post_save, sender=AnswerChoice)
+@receiver(post_delete, sender=AnswerChoice)
+def invalidate_choice_lesson(sender, instance, **kwargs):
+    invalidate_lessons(
+        Question.objects.filter(pk=instance.question_id).values_list('exercise__lesson_id', flat=True)
+    )
+
+
+@receiver(post_save, sender=GlossaryTerm)
+@receiver(pre_delete, sender=GlossaryTerm)
+def invalidate_vocabulary_lessons(sender, instance, **kwargs):
+    if instance.pk is None or kwargs.get('created'):
+        return
+    invalidate_lessons(
+        LessonContent.objects.filter(vocabulary_terms=instance.pk).values_list('lesson_id', flat=True)
+    )
+
+
+@receiver(m2m_changed, sender=LessonContent.vocabulary_terms.through)
+def invalidate_vocabulary_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        invalidate_lessons([instance.lesson_id])
+    elif action == 'pre_clear':
+        invalidate_lessons(
+            LessonContent.objects.filter(vocabulary_terms=instance.pk).values_list('lesson_id', flat=True)
+        )
+    else:
+        invalidate_lessons(
+            LessonContent.objects.filter(pk__in=pk_set).values_list('lesson_id', flat=True)
+        )
+
+
+# Materialized user stats
+
+def _progress_state(progress):
+    return (progress.completed, progress.score, progress.total_points)
+
+
+@receiver(post_init, sender=UserProgress)
+def remember_progress_state(sender, instance, **kwargs):
+    instance._stats_state = _progress_state(instance) if instance.pk else None
+
+
+@receiver(post_save, sender=UserProgress)
+def update_stats_for_progress(sender, instance, created, **kwargs):
+    before = None if created else getattr(instance, '_stats_state', None)
+    after = _progress_state(instance)
+    stats.progress_changed(instance.user_id, before, after)
+    if instance.completed and not (before and before[0]):
+        stats.record_activity(instance.user_id, when=instance.completion_date)
+    instance._stats_state = after
+
+
+@receiver(post_save, sender=UserProgress)
+def enroll_review_terms(sender, instance, created, **kwargs):
+    """Starting a lesson puts its vocabulary into the user's review queue"""
+    if created:
+        review.enroll_lesson_terms(instance.user_id, instance.lesson_id)
+
+
+@receiver(post_delete, sender=UserProgress)
+def update_stats_for_deleted_progress(sender, instance, **kwargs):
+    stats.progress_changed(instance.user_id, getattr(instance, '_stats_state', None), None)
+
+
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+@receiver(post_save, sender=GlossaryTerm)
+@receiver(post_delete, sender=GlossaryTerm)
+def invalidate_content_totals(sender, **kwargs):
+    stats.invalidate_content_totals()
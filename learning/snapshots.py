@@ -0,0 +1,51 @@
+"""
+Versioned, pre-rendered lesson detail snapshots.
+
+Each Lesson carries a ``content_version`` that is bumped whenever anything in
+its tree changes (see ``learning.signals``). The detail JSON is rendered once
+per version and stored in LessonSnapshot, so retrieving a published lesson is
+a single row read instead of a six-table serialization.
+"""
+from django.db.models import F
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from .models import Lesson, LessonSnapshot
+from .serializers import LessonDetailSerializer
+
+
+def render_lesson(lesson_id):
+    """Serialize a lesson tree to JSON bytes (request independent)"""
+    lesson = Lesson.objects.with_content_tree().get(pk=lesson_id)
+    return JSONRenderer().render(LessonDetailSerializer(lesson).data)
+
+
+def get_snapshot(lesson):
+    """Return the JSON bytes for ``lesson``, rendering and storing them on a miss"""
+    payload = (
+        LessonSnapshot.objects
+        .filter(lesson_id=lesson.pk, version=lesson.content_version)
+        .values_list('payload', flat=True)
+        .first()
+    )
+    if payload is not None:
+        return bytes(payload)
+
+    payload = render_lesson(lesson.pk)
+    LessonSnapshot.objects.update_or_create(
+        lesson_id=lesson.pk,
+        defaults={'version': lesson.content_version, 'payload': payload}
+    )
+    return payload
+
+
+def invalidate_lessons(lesson_ids):
+    """Bump the content version of the given lessons and drop their snapshots"""
+    lesson_ids = {pk for pk in lesson_ids if pk is not None}
+    if not lesson_ids:
+        return
+    Lesson.objects.filter(pk__in=lesson_ids).update(
+        content_version=F('content_version') + 1,
+        updated_at=timezone.now()
+    )
+    LessonSnapshot.objects.filter(lesson_id__in=lesson_ids).delete()
@@ -0,0 +1,157 @@
+"""
+Materialized learning statistics.
+
+UserStats holds each user's dashboard numbers and is updated as progress and
+attempts are written, so dashboards read a single row instead of aggregating
+over UserProgress and ExerciseAttempt. ``rebuild`` recomputes rows from
+history (``manage.py rebuild_user_stats``).
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import ExerciseAttempt, GlossaryTerm, Lesson, UserProgress, UserStats
+
+CONTENT_TOTALS_CACHE_KEY = 'learning:content-totals'
+
+
+def _contribution(state):
+    """Columns a UserProgress row in ``(completed, score, total_points)`` adds"""
+    if state is None:
+        return {'lessons_completed': 0, 'lessons_in_progress': 0, 'score_sum': 0, 'points_sum': 0}
+    completed, score, total_points = state
+    # Fields assigned from request data stay strings until the row is reloaded
+    score, total_points = int(score or 0), int(total_points or 0)
+    scored = completed and total_points > 0
+    return {
+        'lessons_completed': int(completed),
+        'lessons_in_progress': int(not completed),
+        'score_sum': score if scored else 0,
+        'points_sum': total_points if scored else 0,
+    }
+
+
+def progress_changed(user_id, before, after):
+    """
+    Apply the change of one UserProgress row to its user's stats.
+
+    ``before``/``after`` are ``(completed, score, total_points)`` tuples, or
+    None for a created/deleted row.
+    """
+    old, new = _contribution(before), _contribution(after)
+    delta = {field: F(field) + (new[field] - old[field]) for field in new if new[field] != old[field]}
+    if not delta:
+        return
+    UserStats.objects.get_or_create(user_id=user_id)
+    UserStats.objects.filter(user_id=user_id).update(**delta, updated_at=timezone.now())
+
+
+def _advance_streak(stats, day):
+    if stats.last_activity_date == day:
+        return
+    if stats.last_activity_date == day - timedelta(days=1):
+        stats.current_streak += 1
+    else:
+        stats.current_streak = 1
+    stats.longest_streak = max(stats.longest_streak, stats.current_streak)
+    stats.last_activity_date = day
+
+
+def record_activity(user_id, new_exercises=0, when=None):
+    """Count newly attempted exercises and extend the daily streak"""
+    day = timezone.localdate(when or timezone.now())
+    with transaction.atomic():
+        UserStats.objects.get_or_create(user_id=user_id)
+        stats = UserStats.objects.select_for_update().get(user_id=user_id)
+        stats.exercises_completed += new_exercises
+        _advance_streak(stats, day)
+        stats.save()
+
+
+def current_streak(stats):
+    """Streak still alive today (it lapses after a full day without activity)"""
+    if stats.last_activity_date is None:
+        return 0
+    if stats.last_activity_date < timezone.localdate() - timedelta(days=1):
+        return 0
+    return stats.current_streak
+
+
+def get_user_stats(user_id):
+    stats, _ = UserStats.objects.get_or_create(user_id=user_id)
+    return stats
+
+
+def content_totals():
+    """
+    Published lesson and glossary term counts. A change clears this process's
+    cache right away; other processes recount within ``CONTENT_TOTALS_CACHE_TTL``.
+    """
+    totals = cache.get(CONTENT_TOTALS_CACHE_KEY)
+    if totals is None:
+        totals = {
+            'total_lessons': Lesson.objects.filter(is_published=True).count(),
+            'total_vocabulary': GlossaryTerm.objects.count(),
+        }
+        cache.set(CONTENT_TOTALS_CACHE_KEY, totals, settings.CONTENT_TOTALS_CACHE_TTL)
+    return totals
+
+
+def invalidate_content_totals():
+    cache.delete(CONTENT_TOTALS_CACHE_KEY)
+
+
+def rebuild(user_ids=None):
+    """Recompute UserStats from UserProgress and ExerciseAttempt history"""
+    progress = UserProgress.objects.all()
+    attempts = ExerciseAttempt.objects.all()
+    if user_ids is not None:
+        progress = progress.filter(user_id__in=user_ids)
+        attempts = attempts.filter(user_id__in=user_ids)
+
+    rows = {}
+
+    def row(user_id):
+        if user_id not in rows:
+            rows[user_id] = UserStats(user_id=user_id)
+        return rows[user_id]
+
+    for user_id, completed, score, total_points in progress.values_list(
+            'user_id', 'completed', 'score', 'total_points').iterator():
+        stats = row(user_id)
+        for field, value in _contribution((completed, score, total_points)).items():
+            setattr(stats, field, getattr(stats, field) + value)
+
+    for user_id, exercise_count in _distinct_exercise_counts(attempts):
+        row(user_id).exercises_completed = exercise_count
+
+    activity_days = (
+        attempts.annotate(day=TruncDate('attempted_at')).values_list('user_id', 'day').distinct()
+        .order_by('user_id', 'day')
+    )
+    completion_days = (
+        progress.filter(completion_date__isnull=False)
+        .annotate(day=TruncDate('completion_date')).values_list('user_id', 'day').distinct()
+    )
+    days = sorted(set(activity_days) | set(completion_days))
+    for user_id, day in days:
+        _advance_streak(row(user_id), day)
+
+    with transaction.atomic():
+        stale = UserStats.objects.all()
+        if user_ids is not None:
+            stale = stale.filter(user_id__in=user_ids)
+        stale.delete()
+        UserStats.objects.bulk_create(rows.values(), batch_size=1000)
+    return len(rows)
+
+
+def _distinct_exercise_counts(attempts):
+    return attempts.values('user_id').annotate(
+        exercises=Count('exercise_id', distinct=True)
+    ).values_list('user_id', 'exercises').order_by()
@@ -0,0 +1,117 @@
+"""
+In-memory prefix index for glossary autocomplete.
+
+The index is a pair of parallel sorted arrays (normalized key, term id) built
+from every term's Guarani, Spanish and English forms, so a suggestion is a
+``bisect`` plus a short forward scan. It is rebuilt lazily on the first lookup
+after a GlossaryTerm changes in this process. Changes made by other worker
+processes are noticed through the table's version, ``max(updated_at)`` (an
+index seek) plus the GlossaryDeletionCount row, checked at most every
+``GLOSSARY_SUGGEST_RECHECK_SECONDS``; lookups in between never touch the
+database. Each build is published as one ``(keys, ids, terms)`` tuple, so a
+lookup never mixes arrays from two builds.
+"""
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db.models import Max
+
+from .search import tokenize
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+
+class SuggestionIndex:
+    """Sorted-array prefix index over normalized glossary forms"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = ([], array('q'), {})
+        self._version = None
+        self._checked = 0.0
+        self._stale = True
+
+    def invalidate(self):
+        """Mark the index stale in this process (others notice on their next check)"""
+        self._stale = True
+
+    def _current_version(self):
+        from .models import GlossaryDeletionCount, GlossaryTerm
+
+        last_modified = GlossaryTerm.objects.order_by().aggregate(last_modified=Max('updated_at'))['last_modified']
+        return last_modified, GlossaryDeletionCount.current()
+
+    def _ensure_fresh(self):
+        now = time.monotonic()
+        if not self._stale and now - self._checked < settings.GLOSSARY_SUGGEST_RECHECK_SECONDS:
+            return
+        version = self._current_version()
+        with self._lock:
+            if self._stale or version != self._version:
+                # Cleared first, so an invalidate() during the build is not lost
+                self._stale = False
+                try:
+                    self._build()
+                except Exception:
+                    self._stale = True
+                    raise
+                self._version = version
+            self._checked = now
+
+    def _build(self):
+        from .models import GlossaryTerm
+
+        entries = []
+        terms = {}
+        rows = GlossaryTerm.objects.values_list(
+            'id', 'guarani_word', 'spanish_translation', 'english_translation'
+        )
+        for pk, guarani, spanish, english in rows.iterator(chunk_size=2000):
+            terms[pk] = (guarani, spanish, english)
+            seen = set()
+            for form in (guarani, spanish, english):
+                tokens = tokenize(form)
+                # Index every word start so "estas" finds "¿Cómo estás?"
+                for start in range(len(tokens)):
+                    key = ' '.join(tokens[start:])
+                    if key not in seen:
+                        seen.add(key)
+                        entries.append((key, pk))
+        entries.sort()
+        keys = [key for key, _ in entries]
+        ids = array('q', (pk for _, pk in entries))
+        self._index = (keys, ids, terms)
+
+    def suggest(self, query, limit=DEFAULT_LIMIT):
+        """Return up to ``limit`` terms with a form starting with ``query``"""
+        prefix = ' '.join(tokenize(query))
+        if not prefix:
+            return []
+        self._ensure_fresh()
+
+        keys, ids, terms = self._index
+        results = []
+        seen = set()
+        position = bisect_left(keys, prefix)
+        while position < len(keys) and len(results) < limit:
+            if not keys[position].startswith(prefix):
+                break
+            pk = ids[position]
+            if pk not in seen:
+                seen.add(pk)
+                guarani, spanish, english = terms[pk]
+                results.append({
+                    'id': pk,
+                    'guarani_word': guarani,
+                    'spanish_translation': spanish,
+                    'english_translation': english,
+                })
+            position += 1
+        return results
+
+
+suggestion_index = SuggestionIndex()
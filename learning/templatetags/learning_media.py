@@ -0,0 +1,38 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from learning import audio, thumbnails
+
+register = template.Library()
+
+
+@register.filter
+def audio_sources(field_file):
+    """``<source>`` candidates for an audio field: low-bitrate variants first, then the upload"""
+    return audio.sources(field_file)
+
+
+@register.simple_tag
+def picture(field_file, alt='', sizes='100vw', css_class='', style=''):
+    """``<picture>`` with WebP/JPEG srcsets for an image field, falling back to the upload"""
+    if not field_file:
+        return ''
+    img = format_html(
+        '<img src="{}" alt="{}" loading="lazy" decoding="async"{}{}>',
+        field_file.url, alt,
+        format_html(' class="{}"', css_class) if css_class else '',
+        format_html(' style="{}"', style) if style else '',
+    )
+    available = thumbnails.renditions(field_file)
+    sources = [
+        (mime, thumbnails.srcset(available[key]), sizes)
+        for key, _, mime, *_ in thumbnails.FORMATS
+        if available[key]
+    ]
+    if not sources:
+        return img
+    return format_html(
+        '<picture>{}{}</picture>',
+        format_html_join('', '<source type="{}" srcset="{}" sizes="{}">', sources),
+        img,
+    )
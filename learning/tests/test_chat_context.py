@@ -0,0 +1,49 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from learning import chat_context
+from learning.models import ChatMessage
+
+
+@override_settings(CHAT_CONTEXT_TOKEN_BUDGET=20, CHAT_CONTEXT_MAX_MESSAGES=3, CHAT_CONTEXT_SUMMARIZE=True)
+class ChatContextTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def say(self, role, message):
+        ChatMessage.objects.create(session_id='s', role=role, message=message)
+
+    def contents(self, messages):
+        return [message['content'] for message in messages[1:]]
+
+    def test_window_keeps_the_newest_turns_and_summarizes_dropped_questions(self):
+        for number in range(3):
+            self.say('user', f'question {number}')
+            self.say('assistant', f'answer {number}')
+        messages = chat_context.get_context('s', 'prompt')
+        self.assertEqual(messages[0], {'role': 'system', 'content': 'prompt'})
+        self.assertEqual(self.contents(messages), ['answer 1', 'question 2', 'answer 2'])
+
+        self.say('user', 'question 3')
+        self.say('assistant', 'answer 3')
+        # Only the messages after the cached window are read
+        with self.assertNumQueries(1):
+            messages = chat_context.get_context('s', 'prompt')
+        self.assertEqual(self.contents(messages), [
+            chat_context.SUMMARY_PREFIX + 'question 2', 'answer 2', 'question 3', 'answer 3',
+        ])
+
+    def test_token_budget(self):
+        self.say('user', 'short')
+        self.say('user', 'x' * 100)
+        self.assertEqual(self.contents(chat_context.get_context('s', 'prompt')),
+                         [chat_context.SUMMARY_PREFIX + 'short', 'x' * 100])
+
+    def test_queued_messages_are_flushed_first(self):
+        with mock.patch.object(chat_context.write_behind, 'pending', return_value=[object()]), \
+                mock.patch.object(chat_context.write_behind, 'flush') as flush:
+            chat_context.get_context('s', 'prompt')
+        flush.assert_called_once_with()
@@ -0,0 +1,51 @@
+from django.test import TestCase
+
+from learning.models import ChatMessage
+
+
+class ChatHistoryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        ChatMessage.objects.bulk_create([
+            ChatMessage(session_id='s', message=f'message {number}') for number in range(150)
+        ])
+        cls.ids = list(ChatMessage.objects.order_by('id').values_list('id', flat=True))
+
+    def get(self, **params):
+        response = self.client.get('/api/chat/history/s/', params)
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.json()], response
+
+    def test_no_parameters_returns_the_whole_conversation(self):
+        ids, response = self.get()
+        self.assertEqual(ids, self.ids)
+        self.assertEqual(response['X-Has-More'], 'false')
+
+    def test_limit_returns_the_latest_messages(self):
+        ids, _ = self.get(limit=20)
+        self.assertEqual(ids, self.ids[-20:])
+
+    def test_after_id_pages_forward(self):
+        ids, response = self.get(after_id=self.ids[9], limit=100)
+        self.assertEqual(ids, self.ids[10:110])
+        self.assertEqual(response['X-Has-More'], 'true')
+        ids, response = self.get(after_id=ids[-1])
+        self.assertEqual(ids, self.ids[110:])
+        self.assertEqual(response['X-Has-More'], 'false')
+
+    def test_unchanged_window_is_not_modified(self):
+        _, response = self.get(limit=20)
+        self.assertEqual(
+            self.client.get('/api/chat/history/s/', {'limit': 20}, HTTP_IF_NONE_MATCH=response['ETag']).status_code,
+            304,
+        )
+        ChatMessage.objects.create(session_id='s', message='new')
+        self.assertEqual(
+            self.client.get('/api/chat/history/s/', {'limit': 20}, HTTP_IF_NONE_MATCH=response['ETag']).status_code,
+            200,
+        )
+
+    def test_invalid_parameters(self):
+        response = self.client.get('/api/chat/history/s/', {'limit': 'lots'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,71 @@
+from django.test import TestCase
+
+from learning.models import GlossaryTerm, Lesson
+
+
+class GlossaryListValidatorTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.terms = [
+            GlossaryTerm.objects.create(guarani_word=word, spanish_translation='-')
+            for word in ('aguyje', 'jajotopata', 'mbaeichapa', 'porã')
+        ]
+
+    def etag(self, **params):
+        response = self.client.get('/api/glossary/', {'page_size': 2, **params})
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def test_unchanged_page_is_304_in_one_query(self):
+        etag = self.etag()
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/glossary/', {'page_size': 2}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_edit_on_the_page_changes_the_etag(self):
+        etag = self.etag()
+        self.terms[0].spanish_translation = 'gracias'
+        self.terms[0].save()
+        self.assertNotEqual(self.etag(), etag)
+
+    def test_deletion_on_the_page_changes_the_etag(self):
+        etag = self.etag()
+        self.terms[1].delete()
+        self.assertNotEqual(self.etag(), etag)
+
+    def test_links_are_part_of_the_etag(self):
+        etag = self.etag()
+        # The page rows stay the same, but there is no next page any more
+        GlossaryTerm.objects.filter(pk__in=[term.pk for term in self.terms[2:]]).delete()
+        self.assertNotEqual(self.etag(), etag)
+
+    def test_change_off_the_page_keeps_the_etag(self):
+        etag = self.etag()
+        self.terms[3].spanish_translation = 'lindo'
+        self.terms[3].save()
+        self.assertEqual(self.etag(), etag)
+
+
+class LessonValidatorTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.lesson = Lesson.objects.create(title='Greetings', description='-')
+
+    def test_detail_304_until_the_lesson_changes(self):
+        url = f'/api/lessons/{self.lesson.pk}/'
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.lesson.description = 'Saying hello'
+        self.lesson.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_unpaginated_list_notices_deletions(self):
+        other = Lesson.objects.create(title='Numbers', description='-')
+        etag = self.client.get('/lessons/')['ETag']
+        other.delete()
+        self.assertNotEqual(self.client.get('/lessons/')['ETag'], etag)
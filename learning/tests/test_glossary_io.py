@@ -0,0 +1,114 @@
+import io
+import json
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+
+from learning import glossary_io, search
+from learning.models import GlossaryTerm, Lesson, LessonContent
+
+
+def import_csv(text, **kwargs):
+    return glossary_io.import_stream(io.StringIO(text), 'csv', **kwargs)
+
+
+class GlossaryImportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.term = GlossaryTerm.objects.create(
+            guarani_word='Aguyje', spanish_translation='Gracias', pronunciation='a-gu-yje',
+            example_sentence_guarani='Aguyje ndéve', category='Greetings', difficulty_level='intermediate',
+        )
+
+    def test_columns_missing_from_the_file_are_kept(self):
+        result = import_csv('guarani_word,spanish_translation\nAguyje,Muchas gracias\n')
+        self.assertEqual((result.created, result.updated), (0, 1))
+        self.term.refresh_from_db()
+        self.assertEqual(self.term.spanish_translation, 'Muchas gracias')
+        self.assertEqual(self.term.pronunciation, 'a-gu-yje')
+        self.assertEqual(self.term.example_sentence_guarani, 'Aguyje ndéve')
+        self.assertEqual(self.term.difficulty_level, 'intermediate')
+
+    def test_empty_cells_clear_and_null_json_keys_keep(self):
+        import_csv('guarani_word,spanish_translation,pronunciation\nAguyje,Gracias,\n')
+        self.term.refresh_from_db()
+        self.assertEqual(self.term.pronunciation, '')
+
+        lines = json.dumps({'guarani_word': 'Aguyje', 'spanish_translation': 'Gracias', 'category': None})
+        glossary_io.import_stream(io.StringIO(lines), 'jsonl')
+        self.term.refresh_from_db()
+        self.assertEqual(self.term.category, 'Greetings')
+
+    def test_match_on_id_and_insert_new_words(self):
+        text = (
+            'id,guarani_word,spanish_translation\n'
+            f'{self.term.pk},Aguyjevete,Muchísimas gracias\n'
+            ',Porã,Lindo\n'
+        )
+        result = import_csv(text)
+        self.assertEqual((result.created, result.updated), (1, 1))
+        self.term.refresh_from_db()
+        self.assertEqual(self.term.guarani_word, 'Aguyjevete')
+        self.assertEqual(self.term.normalized_word, 'aguyjevete')
+        self.assertTrue(GlossaryTerm.objects.filter(guarani_word='Porã', normalized_word='pora').exists())
+
+    def test_later_rows_win_within_a_batch(self):
+        import_csv('guarani_word,spanish_translation,category\nPorã,Lindo,Adjectives\nPorã,Bonito,\n')
+        term = GlossaryTerm.objects.get(guarani_word='Porã')
+        self.assertEqual((term.spanish_translation, term.category), ('Bonito', ''))
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        text = (
+            'guarani_word,spanish_translation,difficulty_level\n'
+            ',Sin palabra,beginner\n'
+            'Ka\'a,Yerba,expert\n'
+            'Y,Agua,\n'
+        )
+        result = import_csv(text)
+        self.assertEqual(result.created, 1)
+        self.assertEqual([error['line'] for error in result.errors], [2, 3])
+        self.assertEqual(GlossaryTerm.objects.get(guarani_word='Y').difficulty_level, 'beginner')
+
+    def test_imported_terms_are_searchable(self):
+        import_csv('guarani_word,spanish_translation\nAguyje,Muchas gracias\nKuñataĩ,Muchacha\n', batch_size=1)
+        terms = GlossaryTerm.objects.all()
+        self.assertEqual(list(search.search_glossary(terms, 'muchas')), [self.term])
+        self.assertEqual([term.guarani_word for term in search.search_glossary(terms, 'kunatai')], ['Kuñataĩ'])
+
+    def test_updating_a_term_invalidates_lessons_using_it(self):
+        lesson = Lesson.objects.create(title='Greetings', description='-')
+        block = LessonContent.objects.create(lesson=lesson, content_type='vocabulary')
+        block.vocabulary_terms.add(self.term)
+        before = Lesson.objects.get(pk=lesson.pk).updated_at
+        import_csv('guarani_word,spanish_translation\nAguyje,Muchas gracias\n')
+        self.assertGreater(Lesson.objects.get(pk=lesson.pk).updated_at, before)
+
+
+class GlossaryRoundTripTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        GlossaryTerm.objects.create(guarani_word="Ñe'ẽ", spanish_translation='Palabra, idioma',
+                                    example_sentence_guarani='Che ñe\'ẽ\n"porã"')
+        GlossaryTerm.objects.create(guarani_word='Y', spanish_translation='Agua', category='Nature')
+
+    def snapshot(self):
+        return list(GlossaryTerm.objects.order_by('id').values(*glossary_io.IMPORT_FIELDS))
+
+    def test_export_then_import_changes_nothing(self):
+        for fmt in glossary_io.FORMATS:
+            before = self.snapshot()
+            exported = ''.join(glossary_io.export_lines(fmt=fmt))
+            result = glossary_io.import_stream(io.StringIO(exported), fmt)
+            self.assertEqual((result.created, result.updated, result.error_count), (0, 2, 0))
+            self.assertEqual(self.snapshot(), before)
+
+    def test_api_export_and_import(self):
+        response = self.client.get('/api/glossary/export/', {'type': 'jsonl'})
+        body = b''.join(response.streaming_content)
+        self.assertEqual(len(body.splitlines()), 2)
+
+        upload = SimpleUploadedFile('terms.csv', 'guarani_word,spanish_translation\nKa\'a,Yerba\n'.encode())
+        response = self.client.post('/api/glossary/import/', {'file': upload})
+        self.assertEqual(response.json()['created'], 1)
@@ -0,0 +1,80 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from learning import grading
+from learning.models import Exercise, ExerciseAttempt, Lesson, Question, ReviewCard, UserProgress, UserStats
+
+DEMO_USER_ID = 1
+
+
+class NormalizeAnswerTests(TestCase):
+
+    def test_words_ignore_case_and_spacing(self):
+        self.assertEqual(grading.normalize_answer('fill_blank', '  Mba\'e  PA '), "mba'e pa")
+
+    def test_true_false_synonyms(self):
+        for answer in ('Verdadero', 'sí', 'T', '1'):
+            self.assertEqual(grading.normalize_answer('true_false', answer), 'true')
+        for answer in ('falso', 'No', '0'):
+            self.assertEqual(grading.normalize_answer('true_false', answer), 'false')
+
+    def test_matching_is_order_independent(self):
+        expected = grading.normalize_answer('matching', 'a-1, b-2')
+        self.assertEqual(grading.normalize_answer('matching', 'B = 2; a -> 1'), expected)
+        self.assertEqual(grading.normalize_answer('matching', {'b': '2', 'a': '1'}), expected)
+        self.assertEqual(grading.normalize_answer('matching', [['a', '1'], ['b', '2']]), expected)
+        self.assertNotEqual(grading.normalize_answer('matching', 'a-2, b-1'), expected)
+
+
+class GradeSubmissionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create(pk=DEMO_USER_ID, username='demo')
+        lesson = Lesson.objects.create(title='Greetings', description='-')
+        cls.exercise = Exercise.objects.create(lesson=lesson, title='Quiz', instructions='-')
+        cls.first = Question.objects.create(exercise=cls.exercise, question_text='Hello?',
+                                            correct_answer="Mba'éichapa", points=20)
+        cls.second = Question.objects.create(exercise=cls.exercise, question_type='true_false',
+                                             question_text='Aguyje means thanks', correct_answer='true', points=15)
+
+    def submit(self, answers):
+        response = self.client.post(f'/api/exercises/{self.exercise.pk}/submit/', {'answers': answers},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def progress(self):
+        return UserProgress.objects.get(user_id=DEMO_USER_ID, lesson_id=self.exercise.lesson_id)
+
+    def test_grades_and_records_every_answer(self):
+        result = self.submit([
+            {'question_id': self.first.pk, 'answer': " mba'éichapa"},
+            {'question_id': self.second.pk, 'answer': 'no'},
+            {'question_id': 999999, 'answer': 'ignored'},
+        ])
+        self.assertEqual((result['earned_points'], result['total_points'], result['percentage']), (20, 35, 57.14))
+        self.assertEqual([item['is_correct'] for item in result['results']], [True, False])
+        self.assertEqual(ExerciseAttempt.objects.filter(user_id=DEMO_USER_ID).count(), 2)
+        self.assertEqual(ReviewCard.objects.filter(user_id=DEMO_USER_ID, question__isnull=False).count(), 2)
+
+    def test_every_submission_adds_to_the_score(self):
+        correct = [
+            {'question_id': self.first.pk, 'answer': "Mba'éichapa"},
+            {'question_id': self.second.pk, 'answer': 'sí'},
+        ]
+        self.submit(correct)
+        self.submit(correct)
+        progress = self.progress()
+        self.assertEqual((progress.score, progress.total_points), (70, 70))
+        self.assertEqual(ExerciseAttempt.objects.filter(user_id=DEMO_USER_ID).count(), 4)
+        self.assertEqual(UserStats.objects.get(user_id=DEMO_USER_ID).exercises_completed, 1)
+
+    @override_settings(WRITE_BEHIND=True)
+    def test_exercise_counted_once_while_attempts_are_still_queued(self):
+        answers = [{'question_id': self.first.pk, 'answer': 'no'}]
+        self.submit(answers)
+        self.submit(answers)
+        # The test transaction never commits, so no attempt row was written
+        self.assertFalse(ExerciseAttempt.objects.exists())
+        self.assertEqual(UserStats.objects.get(user_id=DEMO_USER_ID).exercises_completed, 1)
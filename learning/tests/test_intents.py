@@ -0,0 +1,32 @@
+from django.test import TestCase, override_settings
+
+from learning import intents
+from learning.models import ChatMessage, GlossaryTerm
+
+
+class IntentTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        GlossaryTerm.objects.create(guarani_word='Aguyje', spanish_translation='Gracias',
+                                    english_translation='Thank you, thanks', pronunciation='a-gu-yje')
+
+    def test_detect(self):
+        self.assertEqual(intents.detect('How do you say "thank you"?'), ('translate', 'en', 'thank you'))
+        self.assertEqual(intents.detect('¿Cómo se dice gracias en guaraní?'), ('translate', 'es', 'gracias'))
+        self.assertEqual(intents.detect('What does the word aguyje mean?'), ('define', 'en', 'aguyje'))
+        self.assertIsNone(intents.detect('Tell me about Paraguay'))
+
+    def test_answers_from_the_glossary(self):
+        self.assertEqual(intents.answer('how do you say thanks'),
+                         '“thanks” in Guarani is “Aguyje”.\nPronunciation: a-gu-yje')
+        self.assertIn('“Aguyje” significa “Gracias”', intents.answer('¿Qué significa aguyje?'))
+        self.assertIsNone(intents.answer('how do you say goodbye'))
+
+    @override_settings(OPENAI_API_KEY='')
+    def test_chat_view_answers_without_the_llm(self):
+        response = self.client.post('/api/chat/', {'message': '¿cómo se dice gracias?', 'session_id': 'intent'},
+                                    content_type='application/json')
+        self.assertIn('Aguyje', response.json()['response'])
+        self.assertEqual(list(ChatMessage.objects.filter(session_id='intent').values_list('role', flat=True)
+                              .order_by('id')), ['user', 'assistant'])
@@ -0,0 +1,110 @@
+"""
+Query budgets for the lesson detail views: the whole lesson tree is loaded
+in a fixed number of queries, however many blocks, exercises and questions
+the lesson has.
+"""
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from learning.models import (
+    AnswerChoice, Exercise, GlossaryTerm, Lesson, LessonContent, Question, UserProgress,
+)
+
+DEMO_USER_ID = 1
+
+
+def build_lesson(title, size):
+    """A lesson with ``size`` vocabulary blocks of ``size`` terms and ``size``
+    exercises of ``size`` questions with four choices each"""
+    lesson = Lesson.objects.create(title=title, description='Test lesson')
+    terms = [
+        GlossaryTerm.objects.create(guarani_word=f'{title} {number}', spanish_translation='palabra')
+        for number in range(size * size)
+    ]
+    for order in range(size):
+        block = LessonContent.objects.create(lesson=lesson, order=order, content_type='vocabulary')
+        block.vocabulary_terms.set(terms[order * size:(order + 1) * size])
+    for order in range(size):
+        exercise = Exercise.objects.create(lesson=lesson, title=f'Exercise {order}', instructions='-', order=order)
+        for number in range(size):
+            question = Question.objects.create(
+                exercise=exercise, question_text='?', correct_answer='a', order=number,
+            )
+            AnswerChoice.objects.bulk_create([
+                AnswerChoice(question=question, choice_text=text, order=index)
+                for index, text in enumerate('abcd')
+            ])
+    return lesson
+
+
+class LessonDetailQueryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create(pk=DEMO_USER_ID, username='demo')
+        cls.small = build_lesson('Small', 2)
+        cls.large = build_lesson('Large', 5)
+
+    def test_api_detail_renders_snapshot_in_constant_queries(self):
+        for lesson in (self.small, self.large):
+            # lesson, snapshot lookup, lesson tree (lesson, blocks, terms,
+            # exercises, questions, choices) and the snapshot upsert with its savepoints
+            with self.assertNumQueries(14):
+                response = self.client.get(f'/api/lessons/{lesson.pk}/')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.json()['exercises']), len(lesson.exercises.all()))
+
+    def test_api_detail_serves_stored_snapshot(self):
+        for lesson in (self.small, self.large):
+            self.client.get(f'/api/lessons/{lesson.pk}/')
+            with self.assertNumQueries(2):
+                response = self.client.get(f'/api/lessons/{lesson.pk}/')
+            self.assertEqual(response.status_code, 200)
+
+    def test_html_detail_in_constant_queries(self):
+        for lesson in (self.small, self.large):
+            UserProgress.objects.create(user_id=DEMO_USER_ID, lesson=lesson)
+            # lesson, progress, blocks, terms, exercises
+            with self.assertNumQueries(5):
+                response = self.client.get(f'/lessons/{lesson.pk}/')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.context['exercises']), len(lesson.exercises.all()))
+
+
+class LessonSnapshotTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create(pk=DEMO_USER_ID, username='demo')
+        cls.lesson = build_lesson('Snapshot', 2)
+
+    def detail(self):
+        response = self.client.get(f'/api/lessons/{self.lesson.pk}/')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_changes_anywhere_in_the_tree_rerender_the_snapshot(self):
+        self.detail()
+        question = Question.objects.filter(exercise__lesson=self.lesson).first()
+        question.question_text = 'Mba’éichapa?'
+        question.save()
+        texts = [item['question_text'] for exercise in self.detail()['exercises'] for item in exercise['questions']]
+        self.assertIn('Mba’éichapa?', texts)
+
+        term = GlossaryTerm.objects.filter(lessoncontent__lesson=self.lesson).first()
+        term.spanish_translation = 'cambiado'
+        term.save()
+        translations = [
+            item['spanish_translation']
+            for block in self.detail()['content_blocks'] for item in block['vocabulary_terms']
+        ]
+        self.assertIn('cambiado', translations)
+
+    def test_unrelated_changes_keep_the_snapshot(self):
+        self.detail()
+        version = Lesson.objects.get(pk=self.lesson.pk).content_version
+        build_lesson('Other', 1)
+        GlossaryTerm.objects.create(guarani_word='Y', spanish_translation='Agua')
+        self.assertEqual(Lesson.objects.get(pk=self.lesson.pk).content_version, version)
+        with self.assertNumQueries(2):
+            self.detail()
@@ -0,0 +1,26 @@
+import asyncio
+import gc
+
+from django.test import SimpleTestCase, override_settings
+
+from learning import llm
+
+
+@override_settings(OPENAI_API_KEY='test-key')
+class AsyncClientTests(SimpleTestCase):
+
+    def test_one_client_per_loop_closed_with_its_loop(self):
+        async def clients():
+            first, limiter = llm._get_async_state()
+            second, _ = llm._get_async_state()
+            self.assertIs(first, second)
+            self.assertFalse(first.is_closed())
+            return first
+
+        first = asyncio.run(clients())
+        second = asyncio.run(clients())
+        self.assertIsNot(first, second)
+        self.assertTrue(first.is_closed())
+        self.assertTrue(second.is_closed())
+        gc.collect()
+        self.assertEqual(len(llm._async_states), 0)
@@ -0,0 +1,98 @@
+import io
+import math
+import os
+import struct
+import tempfile
+import wave
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import SimpleTestCase, override_settings
+
+from learning import audio
+from learning.media import parse_range
+from learning.models import GlossaryTerm
+
+
+class TemporaryMediaMixin:
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        override = override_settings(MEDIA_ROOT=directory.name, LESSON_PACK_ROOT=os.path.join(directory.name, 'packs'))
+        override.enable()
+        self.addCleanup(override.disable)
+
+
+def wav(rate=44100, channels=2, seconds=0.1):
+    output = io.BytesIO()
+    with wave.open(output, 'wb') as target:
+        target.setnchannels(channels)
+        target.setsampwidth(2)
+        target.setframerate(rate)
+        frames = int(rate * seconds)
+        target.writeframes(b''.join(
+            struct.pack('<h', int(10000 * math.sin(i / 10))) * channels for i in range(frames)
+        ))
+    return output.getvalue()
+
+
+class ParseRangeTests(SimpleTestCase):
+
+    def test_ranges(self):
+        self.assertEqual(parse_range('bytes=0-99', 1000), (0, 99))
+        self.assertEqual(parse_range('bytes=900-', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=-100', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=500-5000', 1000), (500, 999))
+        self.assertEqual(parse_range('bytes=1000-', 1000), 'unsatisfiable')
+        self.assertIsNone(parse_range('bytes=0-1,5-6', 1000))
+        self.assertIsNone(parse_range(None, 1000))
+
+
+class ServeMediaTests(TemporaryMediaMixin, SimpleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        default_storage.save('audio/clip.mp3', ContentFile(bytes(range(256)) * 4))
+
+    def test_byte_ranges(self):
+        response = self.client.get('/media/audio/clip.mp3', HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/1024')
+        self.assertEqual(b''.join(response.streaming_content), bytes(range(10, 20)))
+        self.assertEqual(response['Content-Type'], 'audio/mpeg')
+
+        response = self.client.get('/media/audio/clip.mp3', HTTP_RANGE='bytes=2000-')
+        self.assertEqual(response.status_code, 416)
+
+    def test_stale_if_range_serves_the_whole_file(self):
+        response = self.client.get('/media/audio/clip.mp3', HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"old"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Length'], '1024')
+
+    def test_validators_and_missing_files(self):
+        etag = self.client.get('/media/audio/clip.mp3')['ETag']
+        self.assertEqual(self.client.get('/media/audio/clip.mp3', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get('/media/audio/missing.mp3').status_code, 404)
+        self.assertEqual(self.client.get('/media/../settings.py').status_code, 404)
+
+
+@override_settings(FFMPEG_BINARY='no-such-ffmpeg')
+class AudioFallbackTests(TemporaryMediaMixin, SimpleTestCase):
+
+    def test_downsample_wav_to_mono_16k(self):
+        with wave.open(io.BytesIO(audio.downsample_wav(wav()))) as result:
+            self.assertEqual((result.getnchannels(), result.getframerate(), result.getsampwidth()), (1, 16000, 2))
+            self.assertAlmostEqual(result.getnframes(), 1600, delta=1)
+
+    def test_transcode_without_ffmpeg(self):
+        name = default_storage.save('audio/hello.wav', ContentFile(wav()))
+        self.assertEqual(audio.transcode(name), [audio.variant_name(name, 'wav')])
+        self.assertEqual(audio.transcode(name), [])
+
+        field_file = GlossaryTerm(audio_file=name).audio_file
+        self.assertEqual([source['type'] for source in audio.sources(field_file)], ['audio/wav', 'audio/wav'])
+
+        mp3 = default_storage.save('audio/hello.mp3', ContentFile(b'ID3'))
+        self.assertEqual(audio.transcode(mp3), [])
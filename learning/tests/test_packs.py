@@ -0,0 +1,85 @@
+import os
+import tempfile
+import zipfile
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+
+from learning import packs
+from learning.models import GlossaryTerm, Lesson, LessonContent
+
+
+class TemporaryMediaMixin:
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        override = override_settings(MEDIA_ROOT=directory.name, LESSON_PACK_ROOT=os.path.join(directory.name, 'packs'))
+        override.enable()
+        self.addCleanup(override.disable)
+
+
+class LessonPackTests(TemporaryMediaMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.lesson = Lesson.objects.create(title='Greetings', description='-')
+        self.term = GlossaryTerm.objects.create(
+            guarani_word='Aguyje', spanish_translation='Gracias',
+            audio_file=default_storage.save('audio/glossary/aguyje.mp3', ContentFile(b'audio')),
+        )
+        block = LessonContent.objects.create(lesson=self.lesson, content_type='vocabulary')
+        block.vocabulary_terms.add(self.term)
+
+    def test_pack_contents(self):
+        path, key = packs.get_pack(self.lesson)
+        with zipfile.ZipFile(path) as archive:
+            self.assertEqual(sorted(archive.namelist()), [
+                'glossary.json', 'lesson.json', 'manifest.json', 'media/audio/glossary/aguyje.mp3',
+            ])
+            self.assertEqual(archive.read('media/audio/glossary/aguyje.mp3'), b'audio')
+            self.assertIn(b'Aguyje', archive.read('glossary.json'))
+
+    def test_content_changes_give_a_new_pack(self):
+        path, key = packs.get_pack(self.lesson)
+        self.assertEqual(packs.get_pack(self.lesson), (path, key))
+
+        self.term.spanish_translation = 'Muchas gracias'
+        self.term.save()
+        self.lesson.refresh_from_db()
+        new_path, new_key = packs.get_pack(self.lesson)
+        self.assertNotEqual(new_key, key)
+        self.assertFalse(path.exists())
+
+    def test_packs_built_later_are_kept(self):
+        path, key = packs.get_pack(self.lesson)
+        # As written by another worker that saw newer content meanwhile
+        newer = packs.pack_path(self.lesson.pk, 'f' * 64)
+        newer.write_bytes(b'zip')
+        os.utime(newer, ns=(path.stat().st_mtime_ns + 10 ** 9,) * 2)
+        packs.build_pack(self.lesson)
+        self.assertTrue(newer.exists())
+        self.assertTrue(path.exists())
+
+    def test_open_rebuilds_a_pack_removed_after_lookup(self):
+        path, key = packs.get_pack(self.lesson)
+        with mock.patch('learning.packs.get_pack', return_value=(path, key)):
+            path.unlink()
+            handle, opened_key = packs.open_pack(self.lesson)
+        with handle:
+            self.assertEqual(opened_key, key)
+            self.assertEqual(handle.name, str(path))
+            self.assertTrue(zipfile.is_zipfile(handle))
+
+    def test_download_endpoint(self):
+        response = self.client.get(f'/api/lessons/{self.lesson.pk}/pack/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        response.close()
+        self.assertEqual(
+            self.client.get(f'/api/lessons/{self.lesson.pk}/pack/', HTTP_IF_NONE_MATCH=response['ETag']).status_code,
+            304,
+        )
@@ -0,0 +1,98 @@
+import base64
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+
+from learning.models import GlossaryTerm
+from learning.pagination import KeysetPagination
+
+
+class GlossaryKeysetPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        # Duplicate words so the id tie-breaker decides the order within them
+        GlossaryTerm.objects.bulk_create([
+            GlossaryTerm(guarani_word=word, spanish_translation='-', difficulty_level=level)
+            for word, level in [
+                ('ka', 'beginner'), ('ko', 'advanced'), ('aka', 'beginner'), ('ka', 'intermediate'),
+                ('mbo', 'beginner'), ('aka', 'advanced'), ('pe', 'beginner'),
+            ]
+        ])
+        cls.expected = list(GlossaryTerm.objects.order_by('guarani_word', 'id').values_list('id', flat=True))
+
+    def get(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def walk_forward(self, **params):
+        ids, data = [], self.get('/api/glossary/', page_size=3, **params)
+        pages = [data]
+        ids += [row['id'] for row in data['results']]
+        while data['next']:
+            data = self.client.get(data['next']).json()
+            pages.append(data)
+            ids += [row['id'] for row in data['results']]
+        return ids, pages
+
+    def test_forward_walk_visits_every_row_once_in_order(self):
+        ids, pages = self.walk_forward()
+        self.assertEqual(ids, self.expected)
+        self.assertEqual([len(page['results']) for page in pages], [3, 3, 1])
+        self.assertIsNone(pages[0]['previous'])
+        self.assertNotIn('count', pages[0])
+
+    def test_previous_links_walk_back(self):
+        _, pages = self.walk_forward()
+        data = pages[-1]
+        back = []
+        while data['previous']:
+            data = self.client.get(data['previous']).json()
+            back.append([row['id'] for row in data['results']])
+        self.assertEqual(back, [self.expected[3:6], self.expected[0:3]])
+        self.assertIsNone(data['previous'])
+        self.assertIsNotNone(data['next'])
+
+    def test_descending_ordering_parameter(self):
+        ids, _ = self.walk_forward(ordering='-guarani_word')
+        expected = list(GlossaryTerm.objects.order_by('-guarani_word', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_every_ordering_walks_in_order(self):
+        for field in ('created_at', '-difficulty_level'):
+            ids, _ = self.walk_forward(ordering=field)
+            tie_breaker = '-id' if field.startswith('-') else 'id'
+            expected = list(GlossaryTerm.objects.order_by(field, tie_breaker).values_list('id', flat=True))
+            self.assertEqual(ids, expected, field)
+
+    @skipUnless(connection.vendor == 'sqlite', 'checks the SQLite query plan')
+    def test_seek_uses_the_ordering_index(self):
+        term = GlossaryTerm.objects.first()
+        for field, index in [('guarani_word', 'glossary_word_id_idx'), ('-created_at', 'glossary_created_id_idx'),
+                             ('difficulty_level', 'glossary_difficulty_id_idx')]:
+            ordering = (field, '-id' if field.startswith('-') else 'id')
+            seek = KeysetPagination._seek(ordering, [getattr(term, field.lstrip('-')), term.pk])
+            plan = GlossaryTerm.objects.order_by(*ordering).filter(seek)[:10].explain()
+            self.assertIn(f'SEARCH learning_glossaryterm USING INDEX {index}', plan)
+
+    def test_unknown_ordering_falls_back_to_the_default(self):
+        ids, _ = self.walk_forward(ordering='spanish_translation')
+        self.assertEqual(ids, self.expected)
+
+    def test_rows_inserted_before_the_cursor_do_not_shift_the_page(self):
+        first = self.get('/api/glossary/', page_size=3)
+        GlossaryTerm.objects.create(guarani_word='a', spanish_translation='-')
+        second = self.client.get(first['next']).json()
+        self.assertEqual([row['id'] for row in second['results']], self.expected[3:6])
+
+    def test_invalid_cursor_is_404(self):
+        for cursor in ('garbage', base64.urlsafe_b64encode(b'{"v": [1]}').decode(),
+                       base64.urlsafe_b64encode(b'{"v": ["ka", "not-an-id"]}').decode()):
+            response = self.client.get('/api/glossary/', {'cursor': cursor})
+            self.assertEqual(response.status_code, 404, cursor)
+
+    def test_page_size_is_capped(self):
+        data = self.get('/api/glossary/', page_size=0)
+        self.assertEqual(len(data['results']), 1)
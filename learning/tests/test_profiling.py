@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from guarani_app import profiling
+from guarani_app.middleware import ProfilerMiddleware
+from learning.models import GlossaryTerm
+
+
+class SignatureTests(SimpleTestCase):
+
+    def test_in_lists_and_whitespace_collapse(self):
+        self.assertEqual(
+            profiling.signature('SELECT *\n  FROM t WHERE id IN (%s, %s, %s)'),
+            profiling.signature('SELECT * FROM t WHERE id IN (%s)'),
+        )
+
+    def test_summarize(self):
+        samples = [
+            {'endpoint': 'GET /a', 'ms': ms, 'db_ms': 1, 'template_ms': 0, 'queries': 2, 'duplicates': []}
+            for ms in (10, 20, 30, 40)
+        ]
+        samples[0]['duplicates'] = [['SELECT 1', 5]]
+        [row] = profiling.summarize(samples)
+        self.assertEqual((row['count'], row['p50'], row['p95'], row['max'], row['n_plus_one']), (4, 20, 40, 40, 1))
+
+
+class ProfilerMiddlewareTests(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.log = os.path.join(directory.name, 'profiler.jsonl')
+        override = override_settings(PROFILER=True, PROFILER_LOG=self.log, PROFILER_SAMPLE_RATE=1.0,
+                                     PROFILER_DUPLICATE_THRESHOLD=3)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.addCleanup(setattr, profiling, '_buffer', None)
+        profiling._buffer = None
+
+    def test_disabled_profiler_leaves_the_chain(self):
+        from django.core.exceptions import MiddlewareNotUsed
+
+        with override_settings(PROFILER=False), self.assertRaises(MiddlewareNotUsed):
+            ProfilerMiddleware(lambda request: HttpResponse())
+
+    def test_times_queries_and_flags_n_plus_one(self):
+        terms = [GlossaryTerm.objects.create(guarani_word=f'term {number}', spanish_translation='-')
+                 for number in range(4)]
+
+        def view(request):
+            for term in terms:
+                list(GlossaryTerm.objects.filter(pk=term.pk))
+            return HttpResponse()
+
+        connection.ensure_connection()
+        with self.assertLogs('guarani_app.profiling', 'WARNING') as logs:
+            response = ProfilerMiddleware(view)(RequestFactory().get('/terms/'))
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('desc="4 queries"', response['Server-Timing'])
+        self.assertIn('Possible N+1', logs.output[0])
+
+        with open(self.log, encoding='utf-8') as handle:
+            [sample] = [json.loads(line) for line in handle]
+        self.assertEqual((sample['queries'], sample['duplicates'][0][1]), (4, 4))
+        self.assertEqual(profiling.load_samples(self.log), [sample])
+
+    def test_sample_file_is_trimmed(self):
+        buffer = profiling.SampleBuffer(self.log, size=3)
+        for number in range(7):
+            buffer.add({'n': number})
+        numbers = [sample['n'] for sample in profiling.load_samples(self.log, limit=10)]
+        self.assertEqual(numbers, [3, 4, 5, 6])
+        self.assertEqual([sample['n'] for sample in buffer.recent], [4, 5, 6])
+
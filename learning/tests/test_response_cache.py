@@ -0,0 +1,54 @@
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from learning.response_cache import ResponseCache
+
+
+class ResponseCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        self.cache = ResponseCache(maxsize=2, ttl=60, similarity=0.6)
+        self.context = [{'role': 'system', 'content': '-'}, {'role': 'user', 'content': '-'}]
+
+    def test_exact_and_similar_hits(self):
+        self.cache.set('How do you say thank you?', self.context, 'Aguyje')
+        self.assertEqual(self.cache.get('how do you say  THANK YOU', self.context), 'Aguyje')
+        self.assertEqual(self.cache.get('how do you say thank you!!', self.context), 'Aguyje')
+        self.assertEqual(self.cache.get('how would you say thank you', self.context), 'Aguyje')
+        self.assertIsNone(self.cache.get('what is the weather', self.context))
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['similar_hits'], stats['misses']), (2, 1, 1))
+
+    def test_similar_matches_need_the_same_content_words(self):
+        cache = ResponseCache(maxsize=10, ttl=60, similarity=0.1)
+        cache.set('how do you say hungry', self.context, 'Iñembyahýi')
+        cache.set('how do you say good morning', self.context, 'Mba’éichapa ndepyhareve')
+        self.assertIsNone(cache.get('how do you say angry', self.context))
+        self.assertIsNone(cache.get('how do you say good evening', self.context))
+        self.assertIsNone(cache.get('how do you say thanks', self.context))
+
+    def test_similarity_is_off_by_default(self):
+        cache = ResponseCache(maxsize=10, ttl=60, similarity=settings.CHAT_RESPONSE_CACHE_SIMILARITY)
+        cache.set('How do you say thank you?', self.context, 'Aguyje')
+        self.assertEqual(cache.get('how do you say thank you', self.context), 'Aguyje')
+        self.assertIsNone(cache.get('how would you say thank you', self.context))
+
+    def test_previous_assistant_turn_is_part_of_the_key(self):
+        self.cache.set('and in spanish?', self.context, 'Gracias')
+        other = [{'role': 'assistant', 'content': 'Mba’éichapa means how are you'}, {'role': 'user', 'content': '-'}]
+        self.assertIsNone(self.cache.get('and in spanish?', other))
+
+    def test_expiry_and_lru_eviction(self):
+        with mock.patch('learning.response_cache.time.monotonic', return_value=0):
+            self.cache.set('one', self.context, '1')
+            self.cache.set('two', self.context, '2')
+            self.cache.get('one', self.context)
+            self.cache.set('three', self.context, '3')
+            self.assertIsNone(self.cache.get('two', self.context))
+            self.assertEqual(self.cache.get('one', self.context), '1')
+        with mock.patch('learning.response_cache.time.monotonic', return_value=61):
+            self.assertIsNone(self.cache.get('one', self.context))
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+        self.assertEqual(sum(len(keys) for keys in self.cache._similar.values()), len(self.cache._entries))
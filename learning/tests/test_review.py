@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from learning import review
+from learning.models import GlossaryTerm, ReviewCard
+
+DEMO_USER_ID = 1
+
+
+class ScheduleTests(TestCase):
+
+    def setUp(self):
+        self.now = timezone.now()
+        self.card = ReviewCard(due_at=self.now)
+
+    def test_intervals_grow_1_6_then_by_ease(self):
+        intervals = []
+        for _ in range(4):
+            review.schedule(self.card, 5, self.now)
+            intervals.append(self.card.interval_days)
+        self.assertEqual(intervals[:2], [1, 6])
+        self.assertEqual(intervals[2], round(6 * 2.7))
+        self.assertEqual(intervals[3], round(intervals[2] * 2.8))
+        self.assertEqual(self.card.repetitions, 4)
+        self.assertEqual(self.card.due_at, self.now + timedelta(days=intervals[3]))
+
+    def test_ease_moves_with_quality(self):
+        review.schedule(self.card, 4, self.now)
+        self.assertAlmostEqual(self.card.ease, 2.5)
+        review.schedule(self.card, 3, self.now)
+        self.assertAlmostEqual(self.card.ease, 2.36)
+
+    def test_failure_relearns_soon_and_counts_a_lapse(self):
+        review.schedule(self.card, 0, self.now)
+        # A card never reviewed before has nothing to lapse from
+        self.assertEqual(self.card.lapses, 0)
+        review.schedule(self.card, 4, self.now)
+        review.schedule(self.card, 4, self.now)
+        review.schedule(self.card, 1, self.now)
+        self.assertEqual((self.card.repetitions, self.card.interval_days, self.card.lapses), (0, 0, 1))
+        self.assertEqual(self.card.due_at, self.now + review.RELEARN_DELAY)
+
+    def test_ease_floor_and_interval_cap(self):
+        for _ in range(10):
+            review.schedule(self.card, 0, self.now)
+        self.assertEqual(self.card.ease, review.MIN_EASE)
+
+        self.card.repetitions, self.card.interval_days, self.card.ease = 5, review.MAX_INTERVAL_DAYS - 1, 2.5
+        review.schedule(self.card, 5, self.now)
+        self.assertEqual(self.card.interval_days, review.MAX_INTERVAL_DAYS)
+
+    def test_quality_is_clamped(self):
+        review.schedule(self.card, 9, self.now)
+        self.assertAlmostEqual(self.card.ease, 2.6)
+
+
+class ReviewQueueTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create(pk=DEMO_USER_ID, username='demo')
+        now = timezone.now()
+        cls.cards = [
+            ReviewCard.objects.create(
+                user_id=DEMO_USER_ID, due_at=now + timedelta(minutes=offset),
+                term=GlossaryTerm.objects.create(guarani_word=f'term {offset}', spanish_translation='-'),
+            )
+            for offset in (-5, -30, -10, 60)
+        ]
+
+    def test_due_cards_oldest_first(self):
+        due = review.due_cards(DEMO_USER_ID)
+        self.assertEqual([card.pk for card in due], [self.cards[1].pk, self.cards[2].pk, self.cards[0].pk])
+        self.assertEqual(len(review.due_cards(DEMO_USER_ID, limit=1)), 1)
+
+    def test_grade_endpoint_reschedules(self):
+        card = self.cards[1]
+        response = self.client.post('/api/review/grade/', {'grades': [{'card_id': card.pk, 'quality': 5}]},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        card.refresh_from_db()
+        self.assertEqual((card.repetitions, card.interval_days), (1, 1))
+        self.assertGreater(card.due_at, timezone.now())
+        self.assertNotIn(card, review.due_cards(DEMO_USER_ID))
+
+    def test_grade_endpoint_rejects_bad_quality(self):
+        response = self.client.post('/api/review/grade/', {'grades': [{'card_id': self.cards[0].pk, 'quality': 7}]},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
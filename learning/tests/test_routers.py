@@ -0,0 +1,81 @@
+from unittest import mock
+
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from guarani_app import routers
+from guarani_app.middleware import ReplicaPinMiddleware
+from learning.models import ExerciseAttempt, GlossaryTerm, LessonContent, UserProgress
+
+router = routers.PrimaryReplicaRouter()
+
+
+@mock.patch('guarani_app.routers.replica_configured', return_value=True)
+class ReplicaRoutingTests(SimpleTestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def route(self, request, model):
+        token = routers.begin_request(request)
+        try:
+            return router.db_for_read(model)
+        finally:
+            routers.end_request(token)
+
+    def test_content_reads_go_to_the_replica(self, _):
+        request = self.factory.get('/')
+        self.assertEqual(self.route(request, GlossaryTerm), 'replica')
+        self.assertEqual(self.route(request, LessonContent.vocabulary_terms.through), 'replica')
+        self.assertEqual(self.route(request, UserProgress), 'default')
+        self.assertEqual(self.route(request, ExerciseAttempt), 'default')
+
+    def test_unsafe_requests_and_pinned_clients_read_the_primary(self, _):
+        self.assertEqual(self.route(self.factory.post('/'), GlossaryTerm), 'default')
+        request = self.factory.get('/')
+        request.COOKIES[routers.PIN_COOKIE] = '1'
+        self.assertEqual(self.route(request, GlossaryTerm), 'default')
+
+    def test_content_write_pins_the_rest_of_the_request(self, _):
+        token = routers.begin_request(self.factory.get('/'))
+        try:
+            self.assertEqual(router.db_for_write(UserProgress), 'default')
+            self.assertEqual(router.db_for_read(GlossaryTerm), 'replica')
+            self.assertEqual(router.db_for_write(GlossaryTerm), 'default')
+            self.assertEqual(router.db_for_read(GlossaryTerm), 'default')
+        finally:
+            state = routers.end_request(token)
+        self.assertTrue(state.wrote)
+        # The next request starts unpinned
+        self.assertEqual(self.route(self.factory.get('/'), GlossaryTerm), 'replica')
+
+    @override_settings(DATABASE_REPLICA_PIN_SECONDS=5)
+    def test_middleware_sets_the_pin_cookie_after_a_content_write(self, _):
+        def view(request):
+            router.db_for_write(GlossaryTerm)
+            return HttpResponse()
+
+        response = ReplicaPinMiddleware(view)(self.factory.post('/'))
+        self.assertEqual(response.cookies[routers.PIN_COOKIE]['max-age'], 5)
+        response = ReplicaPinMiddleware(lambda request: HttpResponse())(self.factory.post('/'))
+        self.assertNotIn(routers.PIN_COOKIE, response.cookies)
+
+    def test_replica_never_migrates(self, _):
+        self.assertIs(router.allow_migrate('replica', 'learning'), False)
+        self.assertIsNone(router.allow_migrate('default', 'learning'))
+
+
+@mock.patch('guarani_app.routers.replica_configured', return_value=True)
+class AtomicBlockRoutingTests(TestCase):
+
+    def test_reads_inside_atomic_blocks_use_the_primary(self, _):
+        with transaction.atomic():
+            self.assertEqual(router.db_for_read(GlossaryTerm), 'default')
+
+
+class NoReplicaTests(SimpleTestCase):
+
+    def test_everything_reads_the_primary(self):
+        self.assertFalse(routers.replica_configured())
+        self.assertEqual(router.db_for_read(GlossaryTerm), 'default')
@@ -0,0 +1,87 @@
+from django.db import connection
+from django.test import TestCase
+
+from learning import search
+from learning.models import GlossaryTerm
+
+
+def fts_rows():
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT rowid, search_text FROM {search.FTS_TABLE} ORDER BY rowid')
+        return cursor.fetchall()
+
+
+class NormalizeTextTests(TestCase):
+
+    def test_strips_accents_nasals_and_puso(self):
+        self.assertEqual(search.normalize_text("Ñe'ẽ"), 'nee')
+        self.assertEqual(search.normalize_text('  Mba’éichapa  Reiko '), 'mbaeichapa reiko')
+        self.assertEqual(search.normalize_text(None), '')
+
+    def test_tokenize(self):
+        self.assertEqual(search.tokenize('¿Cómo estás?'), ['como', 'estas'])
+
+
+class SearchGlossaryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.nee = GlossaryTerm.objects.create(guarani_word="Ñe'ẽ", spanish_translation='palabra')
+        cls.aguyje = GlossaryTerm.objects.create(guarani_word='Aguyje', spanish_translation='gracias')
+        cls.mba = GlossaryTerm.objects.create(guarani_word="Mba'éichapa", spanish_translation='¿Cómo estás?')
+
+    def search(self, query):
+        return set(search.search_glossary(GlossaryTerm.objects.all(), query))
+
+    def test_fts_mirror_is_used(self):
+        self.assertTrue(search.fts_available())
+
+    def test_accent_and_puso_insensitive(self):
+        self.assertEqual(self.search('nee'), {self.nee})
+        self.assertEqual(self.search("ñe'ẽ"), {self.nee})
+        self.assertEqual(self.search('mbaeichapa'), {self.mba})
+
+    def test_every_token_prefix_matches(self):
+        self.assertEqual(self.search('agu'), {self.aguyje})
+        self.assertEqual(self.search('como est'), {self.mba})
+        self.assertEqual(self.search('como gracias'), set())
+
+    def test_falls_back_to_substrings_when_no_word_starts_with_the_query(self):
+        self.assertEqual(self.search('guyje'), {self.aguyje})
+        self.assertEqual(self.search('ichapa estas'), {self.mba})
+        # A word-start match wins: "palabra" starts with "pa", "mbaeichapa" only contains it
+        self.assertEqual(self.search('pa'), {self.nee})
+        self.assertEqual(self.search('guyje nee'), set())
+
+    def test_empty_query_returns_everything(self):
+        self.assertEqual(self.search(' ¿? '), {self.nee, self.aguyje, self.mba})
+
+    def test_save_and_delete_keep_the_index_in_step(self):
+        self.aguyje.spanish_translation = 'muchas gracias'
+        self.aguyje.save()
+        self.assertEqual(self.search('muchas'), {self.aguyje})
+
+        pk = self.nee.pk
+        self.nee.delete()
+        self.assertEqual(self.search('nee'), set())
+        self.assertNotIn(pk, [rowid for rowid, _ in fts_rows()])
+
+    def test_rebuild_index(self):
+        GlossaryTerm.objects.filter(pk=self.aguyje.pk).update(spanish_translation='ndaipori', search_text='')
+        self.assertEqual(self.search('ndaipori'), set())
+        self.assertEqual(search.rebuild_index(), 3)
+        self.assertEqual(self.search('ndaipori'), {self.aguyje})
+        self.assertEqual(len(fts_rows()), 3)
+
+    def test_rebuild_index_recreates_a_missing_mirror(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE {search.FTS_TABLE}')
+        search._fts_tables.clear()
+        self.assertFalse(search.fts_available())
+        search.rebuild_index()
+        self.assertTrue(search.fts_available())
+        self.assertEqual(len(fts_rows()), 3)
+
+    def test_search_filter_on_api(self):
+        response = self.client.get('/api/glossary/', {'search': 'agu'})
+        self.assertEqual([row['guarani_word'] for row in response.json()['results']], ['Aguyje'])
@@ -0,0 +1,20 @@
+from django.db import connection
+from django.test import TestCase
+
+
+class SQLiteBackendTests(TestCase):
+
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_are_applied(self):
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
+        self.assertEqual(self.pragma('temp_store'), 2)
+
+    def test_transaction_mode(self):
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+
+    def test_connections_are_closed_after_each_request_by_default(self):
+        self.assertEqual(connection.settings_dict['CONN_MAX_AGE'], 0)
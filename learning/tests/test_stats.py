@@ -0,0 +1,68 @@
+import time
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from learning import stats
+from learning.models import GlossaryTerm, Lesson, UserProgress, UserStats
+
+DEMO_USER_ID = 1
+
+
+class UserStatsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create(pk=DEMO_USER_ID, username='demo')
+        cls.lesson = Lesson.objects.create(title='Greetings', description='-')
+
+    def user_stats(self):
+        return UserStats.objects.get(user_id=DEMO_USER_ID)
+
+    def test_progress_rows_update_the_totals(self):
+        UserProgress.objects.create(user_id=DEMO_USER_ID, lesson=self.lesson)
+        self.assertEqual((self.user_stats().lessons_in_progress, self.user_stats().lessons_completed), (1, 0))
+
+    def test_complete_lesson_with_form_encoded_scores(self):
+        UserProgress.objects.create(user_id=DEMO_USER_ID, lesson=self.lesson)
+        response = self.client.post('/api/progress/complete_lesson/',
+                                    {'lesson_id': self.lesson.pk, 'score': '80', 'total_points': '100'})
+        self.assertEqual(response.status_code, 200)
+        user_stats = self.user_stats()
+        self.assertEqual((user_stats.lessons_completed, user_stats.lessons_in_progress), (1, 0))
+        self.assertEqual((user_stats.score_sum, user_stats.points_sum), (80, 100))
+
+        stats.rebuild(user_ids=[DEMO_USER_ID])
+        rebuilt = self.user_stats()
+        self.assertEqual((rebuilt.score_sum, rebuilt.points_sum), (80, 100))
+
+    def test_complete_lesson_rejects_non_numeric_scores(self):
+        UserProgress.objects.create(user_id=DEMO_USER_ID, lesson=self.lesson)
+        response = self.client.post('/api/progress/complete_lesson/',
+                                    {'lesson_id': self.lesson.pk, 'score': 'lots', 'total_points': '100'})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(UserProgress.objects.get(lesson=self.lesson).completed)
+        self.assertEqual(self.user_stats().lessons_completed, 0)
+
+
+class ContentTotalsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    @override_settings(CONTENT_TOTALS_CACHE_TTL=60)
+    def test_changes_from_other_processes_show_after_the_ttl(self):
+        self.assertEqual(stats.content_totals()['total_vocabulary'], 0)
+        # A write elsewhere: no signal clears this process's cache
+        GlossaryTerm.objects.bulk_create([GlossaryTerm(guarani_word='Aguyje', spanish_translation='Gracias')])
+        self.assertEqual(stats.content_totals()['total_vocabulary'], 0)
+        later = time.time() + 61
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=later):
+            self.assertEqual(stats.content_totals()['total_vocabulary'], 1)
+
+    def test_local_changes_show_immediately(self):
+        stats.content_totals()
+        GlossaryTerm.objects.create(guarani_word='Aguyje', spanish_translation='Gracias')
+        self.assertEqual(stats.content_totals()['total_vocabulary'], 1)
@@ -0,0 +1,95 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from learning.models import GlossaryDeletionCount, GlossaryTerm
+from learning.suggest import SuggestionIndex
+
+
+def words(results):
+    return [result['guarani_word'] for result in results]
+
+
+@override_settings(GLOSSARY_SUGGEST_RECHECK_SECONDS=60)
+class SuggestionIndexTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        GlossaryTerm.objects.create(guarani_word='Mba\'éichapa', spanish_translation='¿Cómo estás?',
+                                    english_translation='How are you?')
+        GlossaryTerm.objects.create(guarani_word='Aguyje', spanish_translation='Gracias',
+                                    english_translation='Thanks, thank you')
+        GlossaryTerm.objects.create(guarani_word='Aguara', spanish_translation='Zorro')
+
+    def setUp(self):
+        self.index = SuggestionIndex()
+
+    def test_prefix_of_any_form_and_word(self):
+        self.assertEqual(words(self.index.suggest('agu')), ['Aguara', 'Aguyje'])
+        self.assertEqual(words(self.index.suggest('mbae')), ["Mba'éichapa"])
+        self.assertEqual(words(self.index.suggest('estas')), ["Mba'éichapa"])
+        self.assertEqual(words(self.index.suggest('HOW ARE')), ["Mba'éichapa"])
+        self.assertEqual(self.index.suggest('xyz'), [])
+        self.assertEqual(self.index.suggest('  '), [])
+
+    def test_limit_and_one_result_per_term(self):
+        self.assertEqual(len(self.index.suggest('a', limit=1)), 1)
+        # "thanks thank you" and "thank you" both match
+        self.assertEqual(words(self.index.suggest('thank')), ['Aguyje'])
+
+    def test_lookups_between_rechecks_skip_the_database(self):
+        self.index.suggest('agu')
+        with self.assertNumQueries(0):
+            self.index.suggest('agu')
+
+    def test_invalidate_rebuilds_on_next_lookup(self):
+        self.index.suggest('agu')
+        GlossaryTerm.objects.bulk_create([GlossaryTerm(guarani_word='Aguai', spanish_translation='Bola')])
+        self.assertEqual(words(self.index.suggest('agu')), ['Aguara', 'Aguyje'])
+        self.index.invalidate()
+        self.assertEqual(words(self.index.suggest('agu')), ['Aguai', 'Aguara', 'Aguyje'])
+
+    def test_changes_from_other_processes_are_noticed_after_the_recheck_interval(self):
+        self.index.suggest('agu')
+        # A bulk write elsewhere: no signal reaches this process's index
+        GlossaryTerm.objects.filter(guarani_word='Aguara').delete()
+        self.index._stale = False
+        self.assertEqual(words(self.index.suggest('agu')), ['Aguara', 'Aguyje'])
+        with mock.patch('learning.suggest.time.monotonic', return_value=self.index._checked + 61):
+            self.assertEqual(words(self.index.suggest('agu')), ['Aguyje'])
+
+    def test_version_check_reads_no_count(self):
+        self.index.suggest('agu')
+        with CaptureQueriesContext(connection) as queries:
+            self.index._current_version()
+        self.assertEqual(len(queries), 2)
+        self.assertFalse(any('COUNT(' in query['sql'].upper() for query in queries))
+
+    def test_deletions_change_the_version(self):
+        before = self.index._current_version()
+        GlossaryTerm.objects.filter(guarani_word__startswith='Agu').delete()
+        self.assertEqual(GlossaryDeletionCount.current(), 2)
+        self.assertNotEqual(self.index._current_version(), before)
+
+    def test_rebuild_publishes_a_new_index(self):
+        self.index.suggest('agu')
+        published = self.index._index
+        keys = list(published[0])
+        GlossaryTerm.objects.create(guarani_word='Aguai', spanish_translation='Bola')
+        self.index.invalidate()
+        self.assertEqual(words(self.index.suggest('agu')), ['Aguai', 'Aguara', 'Aguyje'])
+        self.assertIsNot(self.index._index, published)
+        self.assertEqual(published[0], keys)
+
+    def test_failed_build_stays_stale(self):
+        with mock.patch.object(self.index, '_build', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.index.suggest('agu')
+        self.assertEqual(words(self.index.suggest('agu')), ['Aguara', 'Aguyje'])
+
+    def test_api_endpoint(self):
+        response = self.client.get('/api/glossary/suggest/', {'q': 'agu', 'limit': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 1)
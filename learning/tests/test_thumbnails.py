@@ -0,0 +1,59 @@
+import io
+import os
+import tempfile
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile, File
+from django.core.files.storage import default_storage
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+
+from learning import thumbnails
+
+
+def png(width, height):
+    output = io.BytesIO()
+    Image.new('RGBA', (width, height), (200, 30, 30, 128)).save(output, 'PNG')
+    return ContentFile(output.getvalue())
+
+
+@override_settings(THUMBNAIL_WIDTHS=[100, 200, 400])
+class ThumbnailTests(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        override = override_settings(MEDIA_ROOT=directory.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        cache.clear()
+        self.name = default_storage.save('images/cover.png', png(300, 150))
+
+    def test_generates_smaller_widths_only(self):
+        written = thumbnails.generate(self.name)
+        self.assertEqual(sorted(written), [
+            'images/cover.100w.jpg', 'images/cover.100w.webp', 'images/cover.200w.jpg', 'images/cover.200w.webp',
+        ])
+        self.assertEqual(thumbnails.generate(self.name), [])
+        with default_storage.open('images/cover.200w.jpg') as handle:
+            self.assertEqual(Image.open(handle).size, (200, 100))
+
+    def test_renditions_narrowest_first(self):
+        thumbnails.generate(self.name)
+        field_file = File(None, self.name)
+        result = thumbnails.renditions(field_file)
+        self.assertEqual([item['width'] for item in result['webp']], [100, 200])
+        self.assertEqual(thumbnails.srcset(result['jpeg']),
+                         '/media/images/cover.100w.jpg 100w, /media/images/cover.200w.jpg 200w')
+
+    def test_replaced_source_misses_the_cached_list(self):
+        field_file = File(None, self.name)
+        self.assertEqual(thumbnails.renditions(field_file)['webp'], [])
+
+        # Renditions written by another process: this cache is never told
+        thumbnails.generate(self.name)
+        cache.set(thumbnails._cache_key(self.name), {'webp': [], 'jpeg': []})
+        path = default_storage.path(self.name)
+        stat = os.stat(path)
+        os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+        self.assertEqual(len(thumbnails.renditions(field_file)['webp']), 2)
@@ -0,0 +1,154 @@
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+
+from django.db import IntegrityError, OperationalError
+from django.test import TestCase, override_settings
+
+from learning import write_behind
+from learning.models import ChatMessage
+
+
+def messages(count, session='s'):
+    return [ChatMessage(session_id=session, message=f'message {number}') for number in range(count)]
+
+
+def idle_buffer():
+    """A queueing buffer without its worker thread, flushed by hand"""
+    buffer = write_behind.WriteBehindBuffer()
+    buffer._thread, buffer._pid = object(), os.getpid()
+    return buffer
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, '-c', ''])
+    process.wait()
+    return process.pid
+
+
+class SynchronousModeTests(TestCase):
+
+    @override_settings(WRITE_BEHIND=False)
+    def test_add_inserts_immediately(self):
+        buffer = write_behind.WriteBehindBuffer()
+        buffer.add(messages(3))
+        self.assertEqual(ChatMessage.objects.count(), 3)
+        self.assertFalse(buffer.has_pending())
+
+    @override_settings(WRITE_BEHIND=True, WRITE_BEHIND_MAX_ROWS=0)
+    def test_full_queue_falls_back_to_synchronous_inserts(self):
+        buffer = write_behind.WriteBehindBuffer()
+        buffer.add(messages(2))
+        self.assertEqual(ChatMessage.objects.count(), 2)
+
+
+@override_settings(WRITE_BEHIND=True)
+class QueuedModeTests(TestCase):
+
+    def setUp(self):
+        self.buffer = idle_buffer()
+
+    def test_rows_are_queued_after_commit_until_flushed(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.buffer.add(messages(2, session='a'))
+        self.assertFalse(self.buffer.has_pending())
+        for callback in callbacks:
+            callback()
+        self.assertEqual(len(self.buffer.pending(ChatMessage, session_id='a')), 2)
+        self.assertEqual(self.buffer.pending(ChatMessage, session_id='b'), [])
+        self.assertEqual(ChatMessage.objects.count(), 0)
+
+        self.assertEqual(self.buffer.flush(), 2)
+        self.assertEqual(ChatMessage.objects.filter(session_id='a').count(), 2)
+        self.assertFalse(self.buffer.has_pending())
+
+    def test_failed_flush_requeues_only_unwritten_rows(self):
+        self.buffer._enqueue(messages(3) + [ChatMessage(session_id='s', message='orphan')])
+        self.buffer._enqueue([ChatMessage(session_id='s', message='locked')])
+        original = ChatMessage.objects.bulk_create
+        locked = True
+
+        def bulk_create(objs, **kwargs):
+            # The orphan stands in for a row whose user was deleted meanwhile
+            if any(obj.message == 'orphan' for obj in objs):
+                raise IntegrityError('FOREIGN KEY constraint failed')
+            if locked and any(obj.message == 'locked' for obj in objs):
+                raise OperationalError('database is locked')
+            return original(objs, **kwargs)
+
+        with mock.patch.object(ChatMessage.objects, 'bulk_create', side_effect=bulk_create):
+            with self.assertLogs('learning.write_behind', 'WARNING'):
+                with self.assertRaises(OperationalError):
+                    self.buffer.flush()
+            self.assertEqual(ChatMessage.objects.count(), 3)
+            self.assertEqual([obj.message for obj in self.buffer.pending(ChatMessage)], ['locked'])
+            self.assertIsNone(self.buffer.pending(ChatMessage)[0].pk)
+
+            locked = False
+            self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(
+            sorted(ChatMessage.objects.values_list('message', flat=True)),
+            ['locked', 'message 0', 'message 1', 'message 2'],
+        )
+        self.assertFalse(self.buffer.has_pending())
+
+    def test_failed_flush_keeps_every_row_when_nothing_was_written(self):
+        self.buffer._enqueue(messages(2))
+        with mock.patch.object(ChatMessage.objects, 'bulk_create', side_effect=OperationalError('locked')):
+            with self.assertRaises(OperationalError):
+                self.buffer.flush()
+        self.assertEqual(len(self.buffer.pending(ChatMessage)), 2)
+        self.buffer.flush()
+        self.assertEqual(ChatMessage.objects.count(), 2)
+
+
+@override_settings(WRITE_BEHIND=True)
+class SpoolTests(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.spool_dir = directory.name
+        override = override_settings(WRITE_BEHIND_SPOOL_DIR=self.spool_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_queued_rows_are_spooled_until_written(self):
+        # Without a worker thread, which would replay this directory concurrently
+        buffer = idle_buffer()
+        buffer._enqueue(messages(2))
+        self.assertEqual(os.listdir(self.spool_dir), [f'{os.getpid()}.jsonl'])
+        buffer.flush()
+        self.assertEqual(os.listdir(self.spool_dir), [])
+
+    def test_spool_files_of_dead_processes_are_replayed(self):
+        pid = dead_pid()
+        for name in (f'{pid}.jsonl', f'{pid}-3.flushing'):
+            with open(os.path.join(self.spool_dir, name), 'w', encoding='utf-8') as handle:
+                handle.write(''.join(write_behind._encode(obj) for obj in messages(2, session=name)))
+        live = os.path.join(self.spool_dir, f'{os.getpid()}.jsonl')
+        open(live, 'w').close()
+
+        buffer = write_behind.WriteBehindBuffer()
+        buffer._replay_orphans()
+        self.assertEqual(ChatMessage.objects.count(), 4)
+        self.assertEqual(ChatMessage.objects.filter(session_id=f'{pid}.jsonl').count(), 2)
+        # Only this (live) process's own file is left
+        self.assertEqual(os.listdir(self.spool_dir), [os.path.basename(live)])
+
+    def test_replay_requeues_rows_the_database_rejected(self):
+        pid = dead_pid()
+        with open(os.path.join(self.spool_dir, f'{pid}.jsonl'), 'w', encoding='utf-8') as handle:
+            handle.write(''.join(write_behind._encode(obj) for obj in messages(2)))
+
+        buffer = idle_buffer()
+        with mock.patch.object(ChatMessage.objects, 'bulk_create', side_effect=OperationalError('locked')):
+            with self.assertLogs('learning.write_behind', 'WARNING'):
+                buffer._replay_orphans()
+        self.assertEqual(len(buffer.pending(ChatMessage)), 2)
+        self.assertEqual(os.listdir(self.spool_dir), [f'{os.getpid()}.jsonl'])
+        buffer.flush()
+        self.assertEqual(ChatMessage.objects.count(), 2)
+        self.assertEqual(os.listdir(self.spool_dir), [])
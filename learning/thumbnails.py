@@ -0,0 +1,145 @@
+"""
+Responsive image renditions.
+
+When a lesson cover, content block image or question image is saved, WebP
+and JPEG renditions are generated in the background at ``THUMBNAIL_WIDTHS``
+(never upscaled) and stored next to the original as
+``<stem>.<width>w.<ext>``. Templates emit them as ``<picture>`` srcsets and
+the serializers expose them, so pages download an image sized for the
+screen instead of the full upload.
+
+The list of existing renditions is cached per process, keyed on the source's
+name and modification time so a replaced image misses everywhere. Lists that
+may still be growing (the smallest rendition, written last, is missing) are
+only cached for ``PENDING_CACHE_TTL`` seconds.
+"""
+import io
+import logging
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .background import submit_on_commit
+
+logger = logging.getLogger(__name__)
+
+# (key, extension, MIME type, Pillow format, save options)
+FORMATS = [
+    ('webp', 'webp', 'image/webp', 'WEBP', {'quality': 75, 'method': 4}),
+    ('jpeg', 'jpg', 'image/jpeg', 'JPEG', {'quality': 80, 'optimize': True, 'progressive': True}),
+]
+CACHE_PREFIX = 'learning:thumbnails:'
+PENDING_CACHE_TTL = 30
+EXIF_ORIENTATION = 0x0112
+
+
+def rendition_name(source_name, width, extension):
+    path = PurePosixPath(source_name)
+    return str(path.with_name(f'{path.stem}.{width}w.{extension}'))
+
+
+def _cache_key(source_name):
+    try:
+        stamp = default_storage.get_modified_time(source_name).timestamp()
+    except (OSError, NotImplementedError):
+        stamp = ''
+    return f'{CACHE_PREFIX}{source_name}:{stamp}'
+
+
+def _flatten(image):
+    """JPEG has no alpha channel: composite onto white"""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def generate(source_name, force=False):
+    """Write missing renditions of ``source_name``; returns the names written"""
+    widths = sorted(settings.THUMBNAIL_WIDTHS, reverse=True)
+    try:
+        with default_storage.open(source_name, 'rb') as handle:
+            image = Image.open(handle)
+            width = image.height if image.getexif().get(EXIF_ORIENTATION) in (5, 6, 7, 8) else image.width
+            widths = [target for target in widths if target < width]
+            missing = [
+                rendition_name(source_name, target, extension)
+                for target in widths
+                for _, extension, *_ in FORMATS
+                if force or not default_storage.exists(rendition_name(source_name, target, extension))
+            ]
+            if not missing:
+                return []
+            image = ImageOps.exif_transpose(image)
+            image.load()
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError) as exc:
+        logger.warning('Could not open image %s: %s', source_name, exc)
+        return []
+
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+
+    written = []
+    # Largest first, each resized from the previous rendition
+    current = image
+    for width in widths:
+        height = max(1, round(image.height * width / image.width))
+        current = current.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+        for _, extension, _, pillow_format, options in FORMATS:
+            name = rendition_name(source_name, width, extension)
+            if name not in missing:
+                continue
+            if default_storage.exists(name):
+                default_storage.delete(name)
+            output = io.BytesIO()
+            (current if pillow_format == 'WEBP' else _flatten(current)).save(output, pillow_format, **options)
+            written.append(default_storage.save(name, ContentFile(output.getvalue())))
+
+    cache.delete(_cache_key(source_name))
+    return written
+
+
+def renditions(field_file):
+    """
+    ``{'webp': [{'url', 'width'}], 'jpeg': [...]}`` for the renditions that
+    exist, narrowest first (empty lists before generation has run).
+    """
+    if not field_file:
+        return {key: [] for key, *_ in FORMATS}
+    key = _cache_key(field_file.name)
+    result = cache.get(key)
+    if result is None:
+        result = {}
+        for format_key, extension, *_ in FORMATS:
+            result[format_key] = [
+                {'url': default_storage.url(name), 'width': width}
+                for width in sorted(settings.THUMBNAIL_WIDTHS)
+                for name in [rendition_name(field_file.name, width, extension)]
+                if default_storage.exists(name)
+            ]
+        smallest = min(settings.THUMBNAIL_WIDTHS)
+        complete = all(items and items[0]['width'] == smallest for items in result.values())
+        cache.set(key, result, settings.THUMBNAIL_CACHE_TTL if complete else PENDING_CACHE_TTL)
+    return result
+
+
+def srcset(items):
+    return ', '.join(f"{item['url']} {item['width']}w" for item in items)
+
+
+def schedule(field_file, on_done=None):
+    """Generate renditions in the background once the transaction commits"""
+    if not field_file or not settings.THUMBNAILS:
+        return
+
+    def task(name):
+        if generate(name) and on_done is not None:
+            on_done()
+
+    submit_on_commit(task, field_file.name)
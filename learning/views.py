@@ -1,19 +1,23 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
-from django.db.models import Q
-from .models import GlossaryTerm, Lesson, Exercise, UserProgress
+from django.db.models import prefetch_related_objects
+from .models import GlossaryTerm, Lesson, Exercise, UserProgress, content_tree_lookups
+from . import stats
+from .conditional import not_modified, object_validators, queryset_validators, set_validators
 from .forms import GlossaryTermForm
+from .search import search_glossary
 
 
 def dashboard(request):
     """Main dashboard view"""
-    total_lessons = Lesson.objects.filter(is_published=True).count()
-    total_vocabulary = GlossaryTerm.objects.count()
+    totals = stats.content_totals()
+    total_lessons = totals['total_lessons']
+    total_vocabulary = totals['total_vocabulary']
 
     # Get user progress (demo user id=1)
-    user_progress = UserProgress.objects.filter(user_id=1).select_related('lesson')
-    completed_lessons = user_progress.filter(completed=True).count()
-    in_progress_lessons = user_progress.filter(completed=False)[:5]
+    user_stats = stats.get_user_stats(1)
+    completed_lessons = user_stats.lessons_completed
+    in_progress_lessons = UserProgress.objects.filter(user_id=1, completed=False).select_related('lesson')[:5]
 
     recent_lessons = Lesson.objects.filter(is_published=True).order_by('-created_at')[:6]
 
@@ -30,16 +34,20 @@ def dashboard(request):
 
 def glossary_list(request):
     """List all glossary terms with search and filtering"""
+    # The category dropdown depends on every term, so validate the whole table
+    etag, last_modified = queryset_validators(
+        request, GlossaryTerm.objects.all(), len(messages.get_messages(request))
+    )
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        return response
+
     terms = GlossaryTerm.objects.all()
 
-    # Search functionality
+    # Search functionality (accent- and puso-insensitive, index backed)
     search_query = request.GET.get('search', '')
     if search_query:
-        terms = terms.filter(
-            Q(guarani_word__icontains=search_query) |
-            Q(spanish_translation__icontains=search_query) |
-            Q(english_translation__icontains=search_query)
-        )
+        terms = search_glossary(terms, search_query)
 
     # Filter by difficulty
     difficulty = request.GET.get('difficulty', '')
@@ -61,7 +69,8 @@ def glossary_list(request):
         'selected_category': category,
         'categories': [c for c in categories if c],
     }
-    return render(request, 'learning/glossary_list.html', context)
+    response = render(request, 'learning/glossary_list.html', context)
+    return set_validators(response, etag, last_modified, private=True)
 
 
 def glossary_detail(request, pk):
@@ -121,18 +130,22 @@ def lessons_list(request):
     if difficulty:
         lessons = lessons.filter(difficulty_level=difficulty)
 
+    etag, last_modified = queryset_validators(request, lessons, len(messages.get_messages(request)))
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        return response
+
     context = {
         'lessons': lessons,
         'selected_difficulty': difficulty,
     }
-    return render(request, 'learning/lessons_list.html', context)
+    response = render(request, 'learning/lessons_list.html', context)
+    return set_validators(response, etag, last_modified, private=True)
 
 
 def lesson_detail(request, pk):
     """View lesson with content and exercises"""
     lesson = get_object_or_404(Lesson, pk=pk, is_published=True)
-    content_blocks = lesson.content_blocks.all()
-    exercises = lesson.exercises.all()
 
     # Track progress (demo user id=1)
     progress, created = UserProgress.objects.get_or_create(
@@ -140,13 +153,24 @@ def lesson_detail(request, pk):
         lesson=lesson
     )
 
+    # updated_at is bumped whenever anything in the lesson tree changes
+    etag, last_modified = object_validators(request, lesson, len(messages.get_messages(request)))
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        return response
+
+    prefetch_related_objects([lesson], *content_tree_lookups(include_questions=False))
+    content_blocks = lesson.content_blocks.all()
+    exercises = lesson.exercises.all()
+
     context = {
         'lesson': lesson,
         'content_blocks': content_blocks,
         'exercises': exercises,
         'progress': progress,
     }
-    return render(request, 'learning/lesson_detail.html', context)
+    response = render(request, 'learning/lesson_detail.html', context)
+    return set_validators(response, etag, last_modified, private=True)
 
 
 def exercise_view(request, pk):
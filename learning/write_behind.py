@@ -0,0 +1,314 @@
+"""
+Write-behind inserts for append-only logs (ExerciseAttempt, ChatMessage).
+
+With ``WRITE_BEHIND`` on, ``add()`` queues rows in process (once the
+current transaction commits) and a background thread inserts them with
+``bulk_create`` as soon as ``WRITE_BEHIND_BATCH_SIZE`` rows are waiting or
+the oldest has waited ``WRITE_BEHIND_INTERVAL_MS``, so a burst of requests
+shares a few inserts instead of queueing on the database lock one row at a
+time. With it off (the default), or while more than ``WRITE_BEHIND_MAX_ROWS``
+rows are queued, ``add()`` inserts synchronously.
+
+Queued rows have no primary key yet. Readers that must see this process's
+rows call ``flush()`` first (chat context and history do) or check
+``pending()``; other processes see them within one interval. The queue is
+flushed at interpreter exit. With ``WRITE_BEHIND_SPOOL_DIR`` set, queued rows
+are also appended to a per-process spool file until inserted, and spool files
+left behind by dead processes are replayed when the next worker starts. A
+crash between an insert and the removal of its spool file replays those
+rows, so spooled rows are written at least once, not exactly once.
+"""
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, IntegrityError, close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+
+def _unsaved(objs):
+    # A rolled-back insert may have assigned ids that other inserts can take by now
+    for obj in objs:
+        obj.pk = None
+    return objs
+
+
+def _insert_model(model, objs):
+    """
+    Insert rows of one model in one transaction. Returns ``(unwritten rows,
+    error)``: rows kept out by a database error, to retry, and that error.
+    """
+    try:
+        with transaction.atomic():
+            model.objects.bulk_create(objs, batch_size=settings.WRITE_BEHIND_BATCH_SIZE)
+        return [], None
+    except IntegrityError:
+        _unsaved(objs)
+    except DatabaseError as exc:
+        return _unsaved(objs), exc
+    # A row whose question or user was deleted meanwhile: keep the rest
+    for index, obj in enumerate(objs):
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create([obj])
+        except IntegrityError as exc:
+            logger.warning('Dropped queued %s row: %s', model._meta.label, exc)
+        except DatabaseError as exc:
+            return _unsaved(objs[index:]), exc
+    return [], None
+
+
+def _insert(rows):
+    """Insert model instances model by model; returns ``(unwritten rows, last error)``"""
+    by_model = {}
+    for obj in rows:
+        by_model.setdefault(type(obj), []).append(obj)
+    unwritten, error = [], None
+    for model, objs in by_model.items():
+        failed, failure = _insert_model(model, objs)
+        if failure is not None:
+            unwritten.extend(failed)
+            error = failure
+    return unwritten, error
+
+
+def _write(rows):
+    """Synchronous insert, raising the database error if one kept rows out"""
+    _, error = _insert(rows)
+    if error is not None:
+        raise error
+
+
+def _encode(obj):
+    fields = {
+        field.attname: field.value_from_object(obj)
+        for field in obj._meta.concrete_fields if not field.primary_key
+    }
+    return json.dumps({'model': obj._meta.label, 'fields': fields}, cls=DjangoJSONEncoder) + '\n'
+
+
+def _decode(line):
+    data = json.loads(line)
+    model = apps.get_model(data['model'])
+    values = {}
+    for field in model._meta.concrete_fields:
+        if field.attname in data['fields']:
+            values[field.attname] = field.to_python(data['fields'][field.attname])
+    return model(**values)
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class WriteBehindBuffer:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()
+        self._rows = []
+        self._oldest = None
+        self._thread = None
+        self._pid = None
+        self._closed = False
+        # Spool file of the rows in ``_rows``, and rotated files of rows being flushed
+        self._spool = None
+        self._spool_files = []
+        self._rotations = 0
+
+    # Queueing
+
+    def add(self, objs):
+        """Queue (or, in synchronous mode, insert) model instances"""
+        objs = list(objs)
+        if not objs:
+            return
+        if not settings.WRITE_BEHIND or self._full():
+            _write(objs)
+            return
+        transaction.on_commit(lambda: self._enqueue(objs))
+
+    async def aadd(self, objs):
+        """``add()`` for async views, which never run inside a transaction"""
+        objs = list(objs)
+        if not objs:
+            return
+        if not settings.WRITE_BEHIND or self._full():
+            await sync_to_async(_write)(objs)
+            return
+        self._enqueue(objs)
+
+    def _full(self):
+        return len(self._rows) >= settings.WRITE_BEHIND_MAX_ROWS
+
+    def _enqueue(self, objs):
+        with self._lock:
+            self._ensure_worker()
+            if settings.WRITE_BEHIND_SPOOL_DIR:
+                self._spool_write(objs)
+            if not self._rows:
+                self._oldest = time.monotonic()
+            self._rows.extend(objs)
+            self._wake.notify()
+
+    def pending(self, model, **filters):
+        """Queued ``model`` instances whose attributes equal ``filters``"""
+        with self._lock:
+            return [
+                obj for obj in self._rows
+                if isinstance(obj, model) and all(getattr(obj, name) == value for name, value in filters.items())
+            ]
+
+    def has_pending(self):
+        return bool(self._rows)
+
+    # Flushing
+
+    def flush(self):
+        """Insert everything queued so far; returns the number of rows"""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+                files = self._rotate_spool()
+            if not rows:
+                return 0
+            unwritten, error = _insert(rows)
+            if error is not None:
+                # e.g. still locked after busy_timeout: retry only the rows not written
+                # (the spool files keep every row until all are in, so a crash before
+                # then replays written rows too)
+                with self._lock:
+                    self._rows[:0] = unwritten
+                    self._spool_files[:0] = files
+                    self._oldest = time.monotonic()
+                raise error
+            for path in files:
+                os.remove(path)
+            return len(rows)
+
+    async def aflush(self):
+        if self.has_pending():
+            await sync_to_async(self.flush)()
+
+    def _ensure_worker(self):
+        # After a fork (gunicorn --preload) the parent's thread does not exist here
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._rows, self._spool, self._spool_files = [], None, []
+        self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _run(self):
+        if settings.WRITE_BEHIND_SPOOL_DIR:
+            self._replay_orphans()
+        interval = settings.WRITE_BEHIND_INTERVAL_MS / 1000
+        while True:
+            with self._lock:
+                while not self._rows and not self._closed:
+                    self._wake.wait()
+                if self._closed:
+                    return
+                while len(self._rows) < settings.WRITE_BEHIND_BATCH_SIZE and not self._closed:
+                    remaining = self._oldest + interval - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._wake.wait(remaining)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Write-behind flush failed')
+                time.sleep(interval)
+            finally:
+                close_old_connections()
+
+    def close(self):
+        """Stop the worker and insert what is still queued"""
+        with self._lock:
+            self._closed = True
+            self._wake.notify()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=5)
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('Write-behind flush at shutdown failed')
+
+    # Spool files
+
+    def _spool_path(self, suffix):
+        return os.path.join(settings.WRITE_BEHIND_SPOOL_DIR, f'{os.getpid()}{suffix}')
+
+    def _spool_write(self, objs):
+        try:
+            if self._spool is None:
+                os.makedirs(settings.WRITE_BEHIND_SPOOL_DIR, exist_ok=True)
+                self._spool = open(self._spool_path('.jsonl'), 'a', encoding='utf-8')
+            self._spool.write(''.join(_encode(obj) for obj in objs))
+            self._spool.flush()
+        except OSError as exc:
+            logger.warning('Could not spool queued rows: %s', exc)
+
+    def _rotate_spool(self):
+        """Hand the current spool file over to the flush in progress"""
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+            self._rotations += 1
+            rotated = self._spool_path(f'-{self._rotations}.flushing')
+            os.replace(self._spool_path('.jsonl'), rotated)
+            self._spool_files.append(rotated)
+        files, self._spool_files = self._spool_files, []
+        return files
+
+    def _replay_orphans(self):
+        pattern = os.path.join(settings.WRITE_BEHIND_SPOOL_DIR, '*.*')
+        for path in glob.glob(pattern):
+            name = os.path.basename(path)
+            # <pid>.jsonl, <pid>-<n>.flushing, or <file>.replaying-<pid> once claimed
+            owner = name.rsplit('.replaying-', 1)[1] if '.replaying-' in name else name.split('.')[0].split('-')[0]
+            if not owner.isdigit() or int(owner) == os.getpid() or _process_alive(int(owner)):
+                continue
+            claimed = f"{path.rsplit('.replaying-', 1)[0]}.replaying-{os.getpid()}"
+            try:
+                os.replace(path, claimed)
+            except FileNotFoundError:
+                continue
+            try:
+                with open(claimed, encoding='utf-8') as handle:
+                    rows = [_decode(line) for line in handle if line.strip()]
+                unwritten, error = _insert(rows)
+                if error is not None:
+                    # Queued (and spooled) again here, so the claimed file can go
+                    logger.warning('Requeued %d spooled rows from %s: %s', len(unwritten), name, error)
+                    self._enqueue(unwritten)
+                os.remove(claimed)
+                logger.info('Replayed %d spooled rows from %s', len(rows) - len(unwritten), name)
+            except Exception:
+                logger.exception('Could not replay spool file %s', claimed)
+
+
+buffer = WriteBehindBuffer()
+add = buffer.add
+aadd = buffer.aadd
+flush = buffer.flush
+aflush = buffer.aflush
+pending = buffer.pending
+has_pending = buffer.has_pending